@@ -0,0 +1,65 @@
+"""*`ASTCompile` throughput on the test programs, scaled up*.
+
+Usage: `python benchmarks/astcompile_bench.py [scale] [repeat]`
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import ast
+import sys
+import timeit
+from pathlib import Path
+
+from quartz.astcompile import ASTCompile
+from quartz.lexer import Lexer
+from quartz.optimizer import Optimizer
+from quartz.parser import Parser
+
+TESTS: Path = Path(__file__).parent.parent / "tests"
+SOURCES: tuple[str, ...] = ("parsetest.qrtz", "op_parse_test.qrtz")
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time compiling one large module, with new and reused compilers*."""
+    scale: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+    program: str = "\n".join(
+        (TESTS / name).read_text(encoding="utf8") for name in SOURCES
+    )
+    prog = Parser(Lexer(program * scale).get_tokens()).get_program()
+    prog = Optimizer(prog, 1).get_program()
+    module: ast.Module = ASTCompile(prog).get_module()
+    nodes: int = sum(1 for _ in ast.walk(module))
+    distinct: int = len({id(node) for node in ast.walk(module)})
+
+    compiler: ASTCompile = ASTCompile()
+    results: dict[str, float] = {
+        "new": min(
+            timeit.repeat(
+                lambda: ASTCompile(prog).get_module(),
+                number=1,
+                repeat=repeat,
+            ),
+        ),
+        "reused": min(
+            timeit.repeat(
+                lambda: compiler.compile_module(prog),
+                number=1,
+                repeat=repeat,
+            ),
+        ),
+    }
+    print(f"{len(prog.statements)} statements, {nodes} Python nodes")
+    print(f"distinct node objects: {distinct} ({distinct / nodes:.0%})")
+    for name, seconds in results.items():
+        print(f"{name:<7} {seconds:.3f}s  {nodes / seconds:>12,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
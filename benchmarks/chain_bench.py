@@ -0,0 +1,49 @@
+"""*Compile time of very long `->` pipelines, by number of stages*.
+
+Usage: `python benchmarks/chain_bench.py [stages ...]`
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+import timeit
+
+from quartz.api import compile_uncached
+
+# A pipeline of `stages` calls to `inc`, printed once.
+SOURCE: str = """
+fn inc(x)
+    x + 1 <<<
+
+print(0{stages})
+"""
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time compiling pipelines of each length, uncached*."""
+    lengths: list[int] = [int(arg) for arg in sys.argv[1:]] or [
+        100,
+        1_000,
+        10_000,
+    ]
+    for stages in lengths:
+        source: str = SOURCE.format(stages=" -> inc" * stages)
+        seconds: float = min(
+            timeit.repeat(
+                lambda source=source: compile_uncached(source),
+                number=1,
+                repeat=3,
+            ),
+        )
+        per_stage: float = seconds / stages * 1e6
+        print(f"{stages:>7} stages {seconds:.3f}s  {per_stage:>6.1f} us/stage")
+
+
+if __name__ == "__main__":
+    main()
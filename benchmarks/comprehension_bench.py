@@ -0,0 +1,90 @@
+"""*Comprehensions against the loops they replace, in Quartz*.
+
+Usage: `python benchmarks/comprehension_bench.py [number] [repeat]`
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+import timeit
+from typing import Any
+
+import quartz
+
+# Each collection built with a loop, then with a comprehension.
+SOURCE: str = """
+fn list_loop(n)
+    result = []
+    for i in range(n)
+        if i % 3
+            result.append(i * 2)
+    result <<<
+
+fn list_comp(n)
+    [i * 2 for i in range(n) if i % 3] <<<
+
+fn set_loop(n)
+    result = ${}
+    for i in range(n)
+        result.add(i % 1000)
+    result <<<
+
+fn set_comp(n)
+    ${i % 1000 for i in range(n)} <<<
+
+fn dict_loop(n)
+    result = %{}
+    for i in range(n)
+        result[i] = i * 2
+    result <<<
+
+fn dict_comp(n)
+    %{i: i * 2 for i in range(n)} <<<
+
+fn sum_loop(n)
+    total = 0
+    for i in range(n)
+        total = total + i * i
+    total <<<
+
+fn sum_generator(n)
+    sum(i * i for i in range(n)) <<<
+"""
+
+CASES: tuple[str, ...] = ("list", "set", "dict")
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time each loop and its comprehension over `number` items*."""
+    number: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeat: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+    namespace: dict[str, Any] = quartz.run(SOURCE)
+    pairs: list[tuple[str, str]] = [
+        *((f"{case}_loop", f"{case}_comp") for case in CASES),
+        ("sum_loop", "sum_generator"),
+    ]
+    for loop, comp in pairs:
+        results: list[float] = [
+            min(
+                timeit.repeat(
+                    lambda func=namespace[name]: func(number),
+                    number=1,
+                    repeat=repeat,
+                ),
+            )
+            for name in (loop, comp)
+        ]
+        for name, seconds in zip((loop, comp), results, strict=True):
+            per_item: float = seconds / number * 1e9
+            print(f"{name:<14} {seconds:.3f}s  {per_item:>6.1f} ns/item")
+        print(f"speedup: {results[0] / results[1]:.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
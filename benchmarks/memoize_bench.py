@@ -0,0 +1,68 @@
+"""*Recursive functions with and without `@memoize`, in Quartz*.
+
+Usage: `python benchmarks/memoize_bench.py [n] [repeat]`
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+import timeit
+from typing import Any
+
+import quartz
+
+# The same naive recursion, plain, cached in C, and cached with a TTL.
+SOURCE: str = """
+from quartz.runtime import memoize
+
+fn fib(n)
+    n <<< if n < 2
+    fib(n - 1) + fib(n - 2) <<<
+
+@memoize
+fn fib_lru(n)
+    n <<< if n < 2
+    fib_lru(n - 1) + fib_lru(n - 2) <<<
+
+@memoize(ttl=60)
+fn fib_ttl(n)
+    n <<< if n < 2
+    fib_ttl(n - 1) + fib_ttl(n - 2) <<<
+"""
+
+NAMES: tuple[str, ...] = ("fib", "fib_lru", "fib_ttl")
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time each `fib(n)`, clearing caches so every run starts cold*."""
+    n: int = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    repeat: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+    namespace: dict[str, Any] = quartz.run(SOURCE)
+    baseline: float = 0.0
+    for name in NAMES:
+        func: Any = namespace[name]
+        clear: Any = getattr(func, "cache_clear", lambda: None)
+        seconds: float = min(
+            timeit.repeat(
+                lambda func=func, clear=clear: (clear(), func(n)),
+                number=1,
+                repeat=repeat,
+            ),
+        )
+        baseline = baseline or seconds
+        print(
+            f"{name:<8} {seconds * 1e3:>9.3f} ms  "
+            f"speedup: {baseline / seconds:.0f}x",
+        )
+        if hasattr(func, "cache_info"):
+            print(f"         {func.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""*Parser throughput on `tests/op_parse_test.qrtz`, scaled up*.
+
+Usage: `python benchmarks/parser_bench.py [scale] [repeat] [baseline]`
+
+`baseline` is a git revision, such as `e82fbbc`, the commit
+before keywords got their own tags.
+Its lexer and parser are timed on the same program in a fresh interpreter,
+and the speedup of the working tree over it is printed.
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+from pathlib import Path
+
+from quartz.lexer import Lexer
+from quartz.parser import Parser
+
+ROOT: Path = Path(__file__).parent.parent
+SOURCE: Path = ROOT / "tests" / "op_parse_test.qrtz"
+# Makes the script print its timings as JSON, for the baseline run.
+JSON_FLAG: str = "--json"
+
+##############################
+# TIMING
+##############################
+
+
+def _measure(scale: int, repeat: int) -> dict[str, float]:
+    program: str = SOURCE.read_text(encoding="utf8") * scale
+    tokens: list = list(Lexer(program).get_tokens())
+    return {
+        "lines": len(program.splitlines()),
+        "tokens": len(tokens),
+        "lex": min(
+            timeit.repeat(lambda: Lexer(program), number=1, repeat=repeat),
+        ),
+        "parse": min(
+            timeit.repeat(lambda: Parser(tokens), number=1, repeat=repeat),
+        ),
+    }
+
+
+def _measure_revision(
+    revision: str,
+    scale: int,
+    repeat: int,
+) -> dict[str, float]:
+    # Runs this script against `src/` as it was at `revision`,
+    # which comes from the person running the benchmark.
+    archive: bytes = subprocess.run(  # noqa: S603
+        ["git", "archive", revision, "src"],  # noqa: S607
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as tree:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tree, filter="data")
+        output: str = subprocess.run(  # noqa: S603
+            [sys.executable, __file__, str(scale), str(repeat), JSON_FLAG],
+            env={**os.environ, "PYTHONPATH": str(Path(tree) / "src")},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    return json.loads(output)
+
+
+def _report(label: str, timings: dict[str, float]) -> None:
+    tokens: float = timings["tokens"]
+    print(f"{label}:")
+    for phase in ("lex", "parse"):
+        seconds: float = timings[phase]
+        print(
+            f"  {phase + ':':<7}{seconds:.3f}s  "
+            f"{tokens / seconds:>12,.0f} tokens/s",
+        )
+
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time the lexer and parser separately, against a baseline if given*."""
+    args: list[str] = [arg for arg in sys.argv[1:] if arg != JSON_FLAG]
+    scale: int = int(args[0]) if args else 200
+    repeat: int = int(args[1]) if len(args) > 1 else 5
+    timings: dict[str, float] = _measure(scale, repeat)
+    if JSON_FLAG in sys.argv:
+        print(json.dumps(timings))
+        return
+    print(f"{timings['lines']} lines, {timings['tokens']} tokens")
+    _report("working tree", timings)
+    if len(args) > 2:  # noqa: PLR2004
+        baseline: dict[str, float] = _measure_revision(args[2], scale, repeat)
+        _report(args[2], baseline)
+        for phase in ("lex", "parse"):
+            print(f"{phase} speedup: {baseline[phase] / timings[phase]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
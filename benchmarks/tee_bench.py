@@ -0,0 +1,70 @@
+"""*Runtime cost of the `|>` tee lowering, against the old tuple form*.
+
+Usage: `python benchmarks/tee_bench.py [number] [repeat]`
+"""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+import timeit
+from typing import TYPE_CHECKING, Any
+
+import quartz
+
+if TYPE_CHECKING:
+    from types import CodeType
+
+# `x |> tap` inside a loop, as Quartz compiles it today.
+SOURCE: str = """
+fn tap(x)
+    None <<<
+
+fn loop(n)
+    for i in range(n)
+        i |> tap
+"""
+
+# The same loop with the old `(f(a), a)[1]` lowering.
+OLD_SOURCE: str = """
+def tap(x):
+    return None
+
+def loop(n):
+    for i in range(n):
+        (tap(i), i)[1]
+"""
+
+##############################
+# MAIN FUNCTION
+##############################
+
+
+def main() -> None:
+    """*Time a loop of tee stages under both lowerings*."""
+    number: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeat: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5  # noqa: PLR2004
+    new: dict[str, Any] = quartz.run(SOURCE)
+    old: dict[str, Any] = {}
+    old_code: CodeType = compile(OLD_SOURCE, "<old>", "exec")
+    exec(old_code, old)  # noqa: S102
+
+    results: dict[str, float] = {
+        name: min(
+            timeit.repeat(
+                lambda loop=namespace["loop"]: loop(number),
+                number=1,
+                repeat=repeat,
+            ),
+        )
+        for name, namespace in (("tuple", old), ("walrus", new))
+    }
+    for name, seconds in results.items():
+        per_tee: float = seconds / number * 1e9
+        print(f"{name:<7} {seconds:.3f}s  {per_tee:>6.1f} ns/tee")
+    print(f"speedup: {results['tuple'] / results['walrus']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
 """*The Quartz programming language*."""
 
+from .api import cache_clear, cache_info, compile_source, run, transpile
 from .quartz import main
 
-__all__ = ["main"]
+__all__ = [
+    "cache_clear",
+    "cache_info",
+    "compile_source",
+    "main",
+    "run",
+    "transpile",
+]
@@ -0,0 +1,265 @@
+"""*The embedding API for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import ast
+import threading
+from collections import OrderedDict
+from inspect import CO_COROUTINE
+from types import CodeType
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .astcompile import ASTCompile
+from .cache import source_hash
+from .lexer import Lexer
+from .optimizer import DEFAULT_LEVEL, Optimizer
+from .parser import Parser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .ast import Program
+    from .tokendef import Token
+
+##############################
+# SET CONSTANTS
+##############################
+
+DEFAULT_FILENAME: str = "<quartz>"
+DEFAULT_CACHE_SIZE: int = 1024
+# Lets a program `await` outside any `async fn`,
+# which makes its code a coroutine, see `run_code`.
+TOP_LEVEL_AWAIT: int = ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
+
+##############################
+# CODE CACHE
+##############################
+
+
+class CacheInfo(NamedTuple):
+    """*Statistics for a `CodeCache`, like `functools.lru_cache`'s*."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CodeCache:
+    """*A thread-safe LRU cache of compiled Quartz programs*."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        """*Cache code objects by source hash, filename and level*.
+
+        Compiling happens outside the lock,
+        so a source compiled by two threads at once is compiled twice
+        but cached once.
+
+        Args:
+            maxsize (int): *Most entries kept before evicting the oldest*
+
+        """
+        self._maxsize: int = maxsize
+        self._codes: OrderedDict[tuple[bytes, str, int], CodeType] = (
+            OrderedDict()
+        )
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def get(self, source: str, filename: str, optimize: int) -> CodeType:
+        """*Get the code for a program, compiling it on a miss*.
+
+        Args:
+            source (str): *Program text*
+            filename (str): *Name used in tracebacks*
+            optimize (int): *Optimization level*
+
+        Returns:
+            CodeType: *Compiled program*
+
+        """
+        key: tuple[bytes, str, int] = (source_hash(source), filename, optimize)
+        with self._lock:
+            code: CodeType | None = self._codes.get(key)
+            if code is not None:
+                self._hits += 1
+                self._codes.move_to_end(key)
+                return code
+            self._misses += 1
+        code = compile_uncached(source, filename, optimize)
+        with self._lock:
+            self._codes[key] = code
+            if len(self._codes) > self._maxsize:
+                self._codes.popitem(last=False)
+        return code
+
+    def info(self) -> CacheInfo:
+        """*Report hits, misses and size*.
+
+        Returns:
+            CacheInfo: *Current statistics*
+
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._maxsize,
+                len(self._codes),
+            )
+
+    def clear(self) -> None:
+        """*Drop every entry and reset the statistics*."""
+        with self._lock:
+            self._codes.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+CODE_CACHE: CodeCache = CodeCache()
+
+##############################
+# API
+##############################
+
+
+def _module(source: str, optimize: int) -> ast.Module:
+    tokens: Iterable[Token] = Lexer(source, lazy=True).iter_tokens()
+    prog: Program = Parser(tokens).get_program()
+    prog = Optimizer(prog, optimize).get_program()
+    return ASTCompile(prog).get_module()
+
+
+def compile_uncached(
+    source: str,
+    filename: str = DEFAULT_FILENAME,
+    optimize: int = DEFAULT_LEVEL,
+    *,
+    top_level_await: bool = False,
+) -> CodeType:
+    """*Compile a Quartz program, bypassing every cache*.
+
+    Args:
+        source (str): *Program text*
+        filename (str): *Name used in tracebacks*
+        optimize (int): *Optimization level*
+        top_level_await (bool): *Allow `await` outside `async fn`s,
+        as in a main program but not a module*
+
+    Returns:
+        CodeType: *Compiled program*
+
+    """
+    return compile(
+        _module(source, optimize),
+        filename=filename,
+        mode="exec",
+        flags=TOP_LEVEL_AWAIT if top_level_await else 0,
+    )
+
+
+def run_code(code: CodeType, namespace: dict[str, Any]) -> None:
+    """*Run compiled code, on an asyncio event loop if it awaits*.
+
+    Code that awaits at the top level runs as a coroutine,
+    like `asyncio.run(main())` around the whole program.
+
+    Args:
+        code (CodeType): *Compiled with `TOP_LEVEL_AWAIT`, or not*
+        namespace (dict[str, Any]): *Globals to run in*
+
+    """
+    result: Any = eval(code, namespace)  # noqa: S307
+    if code.co_flags & CO_COROUTINE:
+        # Only imported here, since most programs never need it.
+        import asyncio  # noqa: PLC0415
+
+        asyncio.run(result)
+
+
+def transpile(
+    source: str,
+    optimize: int = DEFAULT_LEVEL,
+    *,
+    filename: str = DEFAULT_FILENAME,
+) -> str:
+    """*Translate a Quartz program to Python source*.
+
+    The program is compiled first, so one that CPython rejects,
+    like `yield` outside a `fn`, raises instead of translating.
+
+    Args:
+        source (str): *Program text*
+        optimize (int): *Optimization level*
+        filename (str): *Name used in errors*
+
+    Returns:
+        str: *Equivalent Python program*
+
+    Raises:
+        SyntaxError: *CPython rejects the program*
+
+    """
+    module: ast.Module = _module(source, optimize)
+    compile(module, filename, "exec")
+    return ast.unparse(module) + "\n"
+
+
+def compile_source(
+    source: str,
+    filename: str = DEFAULT_FILENAME,
+    optimize: int = DEFAULT_LEVEL,
+) -> CodeType:
+    """*Compile a Quartz program, reusing cached code for repeated sources*.
+
+    Args:
+        source (str): *Program text*
+        filename (str): *Name used in tracebacks*
+        optimize (int): *Optimization level*
+
+    Returns:
+        CodeType: *Compiled program*
+
+    """
+    return CODE_CACHE.get(source, filename, optimize)
+
+
+def run(
+    source: str,
+    globals: dict[str, Any] | None = None,  # noqa: A002
+    filename: str = DEFAULT_FILENAME,
+    optimize: int = DEFAULT_LEVEL,
+) -> dict[str, Any]:
+    """*Compile (through the cache) and run a Quartz program*.
+
+    Args:
+        source (str): *Program text*
+        globals (dict[str, Any] | None): *Namespace to run in, or a new one*
+        filename (str): *Name used in tracebacks*
+        optimize (int): *Optimization level*
+
+    Returns:
+        dict[str, Any]: *The namespace after running*
+
+    """
+    namespace: dict[str, Any] = {} if globals is None else globals
+    exec(compile_source(source, filename, optimize), namespace)  # noqa: S102
+    return namespace
+
+
+def cache_info() -> CacheInfo:
+    """*Report the statistics of the cache behind `compile_source` and `run`*.
+
+    Returns:
+        CacheInfo: *Current statistics*
+
+    """
+    return CODE_CACHE.info()
+
+
+def cache_clear() -> None:
+    """*Empty the cache behind `compile_source` and `run`*."""
+    CODE_CACHE.clear()
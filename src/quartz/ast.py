@@ -7,7 +7,7 @@
 from dataclasses import dataclass, field
 from types import EllipsisType
 
-from .tokendef import Tag
+from .tokendef import Source, Tag
 
 ##############################
 # NODES
@@ -16,7 +16,15 @@ from .tokendef import Tag
 
 @dataclass(frozen=True, slots=True)
 class Node:
-    """*Adam*."""
+    """*Adam*.
+
+    `start` and `end` are offsets into the program, or -1
+    for nodes the compiler made up, which take their parent's position.
+    They never take part in comparisons.
+    """
+
+    start: int = field(default=-1, kw_only=True, compare=False, repr=False)
+    end: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -34,6 +42,7 @@ class Program:
     """*Contains all statements and expressions for the program*."""
 
     statements: list[Stmt]
+    source: Source | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -51,6 +60,29 @@ class Delete(Stmt):
     targets: list[Expr]
 
 
+@dataclass(frozen=True, slots=True)
+class Alias(Node):
+    """*A name in an `import` statement, optionally renamed with `as`*."""
+
+    name: str
+    asname: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Import(Stmt):
+    """*An `import` statement*."""
+
+    names: list[Alias]
+
+
+@dataclass(frozen=True, slots=True)
+class ImportFrom(Stmt):
+    """*A `from ... import` statement*."""
+
+    module: str
+    names: list[Alias]
+
+
 @dataclass(frozen=True, slots=True)
 class ExprStmt(Stmt):
     """*Statement containing only a bare expression*."""
@@ -115,6 +147,48 @@ class Dict(Expr):
     values: list[Expr] = field(default_factory=list)
 
 
+@dataclass(frozen=True, slots=True)
+class Comprehension(Node):
+    """*One `for ... in ...` clause of a comprehension, with its tests*."""
+
+    target: Expr
+    iter_: Expr
+    ifs: list[Expr] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class ListComp(Expr):
+    """*A list comprehension: `[x for x in xs]`*."""
+
+    element: Expr
+    generators: list[Comprehension]
+
+
+@dataclass(frozen=True, slots=True)
+class SetComp(Expr):
+    """*A set comprehension: `${x for x in xs}`*."""
+
+    element: Expr
+    generators: list[Comprehension]
+
+
+@dataclass(frozen=True, slots=True)
+class DictComp(Expr):
+    """*A dictionary comprehension: `%{k: v for k in ks}`*."""
+
+    key: Expr
+    value: Expr
+    generators: list[Comprehension]
+
+
+@dataclass(frozen=True, slots=True)
+class GeneratorExp(Expr):
+    """*A generator expression: `(x for x in xs)`*."""
+
+    element: Expr
+    generators: list[Comprehension]
+
+
 @dataclass(frozen=True, slots=True)
 class Op(Expr):
     """*Operation with one or more operands*."""
@@ -180,6 +254,64 @@ class TernaryOp(Op):
     test: Expr  # c
 
 
+@dataclass(frozen=True, slots=True)
+class NamedExpr(Expr):
+    """*An assignment expression, `target := value`*."""
+
+    target: Expr
+    value: Expr
+
+
+@dataclass(frozen=True, slots=True)
+class Yield(Expr):
+    """*A `yield`, optionally of a value*."""
+
+    value: Expr | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class YieldFrom(Expr):
+    """*A delegating `yield from`*."""
+
+    value: Expr
+
+
+@dataclass(frozen=True, slots=True)
+class Await(Expr):
+    """*An `await`*."""
+
+    value: Expr
+
+
+@dataclass(frozen=True, slots=True)
+class Gather(Expr):
+    """*Awaitables run at once, from an `-> await (f, g)` stage*."""
+
+    stages: list[Expr]
+
+
+@dataclass(frozen=True, slots=True)
+class Stream(Expr):
+    """*A lazy `~>` pipeline, mapping `element` over `iterable`*."""
+
+    iterable: Expr
+    element: Expr
+
+
+@dataclass(frozen=True, slots=True)
+class StreamItem(Expr):
+    """*The current element inside a `Stream`*."""
+
+
+@dataclass(frozen=True, slots=True)
+class Parallel(Expr):
+    """*A `|...|` pipeline, running its `~>` stages in a worker pool*."""
+
+    iterable: Expr
+    stages: list[Call]
+    options: list[Keyword] = field(default_factory=list)
+
+
 @dataclass(frozen=True, slots=True)
 class Attribute(Expr):
     """*Attribute access*."""
@@ -207,9 +339,14 @@ class Slice(Expr):
 
 @dataclass(frozen=True, slots=True)
 class Constant(Expr):
-    """*Integer, float, string, boolean, Ellipsis or None*."""
+    """*Integer, float, string, boolean, Ellipsis or None*.
 
-    value: int | float | str | bool | EllipsisType | None = None
+    The optimizer also folds literals into tuples and frozensets.
+    """
+
+    value: (
+        int | float | str | bool | EllipsisType | tuple | frozenset | None
+    ) = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -220,7 +357,7 @@ class Ident(Expr):
 
 
 @dataclass(frozen=True, slots=True)
-class Arg:
+class Arg(Node):
     """*A single argument in a list*."""
 
     arg: str
@@ -242,12 +379,18 @@ class Arguments:
 
 @dataclass(frozen=True, slots=True)
 class FunctionDefinition(Stmt):
-    """*A function definition*."""
+    """*A function definition, with any `@` decorators*."""
 
     name: str
     args: Arguments
     body: list[Stmt]
     returns: Expr
+    decorators: list[Expr] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class AsyncFunctionDefinition(FunctionDefinition):
+    """*An `async fn` definition*."""
 
 
 @dataclass(frozen=True, slots=True)
@@ -258,6 +401,11 @@ class Lambda(Expr):
     body: Expr
 
 
+@dataclass(frozen=True, slots=True)
+class Continue(Stmt):
+    """*A `continue` statement*."""
+
+
 @dataclass(frozen=True, slots=True)
 class Return(Stmt):
     """*A `return` statement*."""
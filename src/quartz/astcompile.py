@@ -5,54 +5,78 @@
 ##############################
 
 import ast as py
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, ClassVar, TypeVar
 
 import quartz.ast as q
 
 from .tokendef import Error, Tag
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from .tokendef import Source
+
+PyNode = TypeVar("PyNode", bound=py.AST)
 
 ##############################
 # SET CONSTANTS
 ##############################
 
-BINARY_OPERATORS: dict[Tag, Any] = {
-    Tag.AMPERSAND: py.BitAnd,
-    Tag.ASTERISK: py.Mult,
-    Tag.CARET: py.Pow,
-    Tag.MINUS: py.Sub,
-    Tag.L_ANGLE_L_ANGLE: py.LShift,
-    Tag.PERCENT: py.Mod,
-    Tag.PIPE: py.BitOr,
-    Tag.PLUS: py.Add,
-    Tag.R_ANGLE_R_ANGLE: py.RShift,
-    Tag.SLASH: py.Div,
-    Tag.SLASH_SLASH: py.FloorDiv,
-    Tag.TILDE: py.BitXor,
+# Contexts and operators carry no state or position,
+# so, like Python's own parser, every node shares one of each.
+LOAD: py.Load = py.Load()
+STORE: py.Store = py.Store()
+DEL: py.Del = py.Del()
+
+BINARY_OPERATORS: dict[Tag, py.operator] = {
+    Tag.AMPERSAND: py.BitAnd(),
+    Tag.ASTERISK: py.Mult(),
+    Tag.CARET: py.Pow(),
+    Tag.MINUS: py.Sub(),
+    Tag.L_ANGLE_L_ANGLE: py.LShift(),
+    Tag.PERCENT: py.Mod(),
+    Tag.PIPE: py.BitOr(),
+    Tag.PLUS: py.Add(),
+    Tag.R_ANGLE_R_ANGLE: py.RShift(),
+    Tag.SLASH: py.Div(),
+    Tag.SLASH_SLASH: py.FloorDiv(),
+    Tag.TILDE: py.BitXor(),
+}
+
+UNARY_OPERATORS: dict[Tag, py.unaryop] = {
+    Tag.MINUS: py.USub(),
+    Tag.NOT: py.Not(),
+    Tag.PLUS: py.UAdd(),
+    Tag.TILDE: py.Invert(),
 }
 
-UNARY_OPERATORS: dict[Tag, Any] = {
-    Tag.MINUS: py.USub,
-    Tag.NOT: py.Not,
-    Tag.PLUS: py.UAdd,
-    Tag.TILDE: py.Invert,
+COMPARE_OPERATORS: dict[Tag, py.cmpop] = {
+    Tag.EQUAL_EQUAL: py.Eq(),
+    Tag.BANG_EQUAL: py.NotEq(),
+    Tag.L_ANGLE: py.Lt(),
+    Tag.L_ANGLE_EQUAL: py.LtE(),
+    Tag.R_ANGLE: py.Gt(),
+    Tag.R_ANGLE_EQUAL: py.GtE(),
+    Tag.IS: py.Is(),
+    Tag.IS_NOT: py.IsNot(),
+    Tag.IN: py.In(),
+    Tag.NOT_IN: py.NotIn(),
 }
 
-COMPARE_OPERATORS: dict[Tag, Any] = {
-    Tag.EQUAL_EQUAL: py.Eq,
-    Tag.BANG_EQUAL: py.NotEq,
-    Tag.L_ANGLE: py.Lt,
-    Tag.L_ANGLE_EQUAL: py.LtE,
-    Tag.R_ANGLE: py.Gt,
-    Tag.R_ANGLE_EQUAL: py.GtE,
-    Tag.IS: py.Is,
-    Tag.IS_NOT: py.IsNot,
-    Tag.IN: py.In,
-    Tag.NOT_IN: py.NotIn,
+BOOL_OPERATORS: dict[Tag, py.boolop] = {
+    Tag.AND: py.And(),
+    Tag.OR: py.Or(),
 }
 
+# The loop variable of a compiled `~>` stream.
+STREAM_ITEM: str = "__quartz_item"
+# Holds a comprehension's iterable that contains `:=`, see `_comp`.
+ITER_TEMP: str = "__quartz_iter_{}"
+# The name `quartz.runtime` is imported as, when a program needs it.
+RUNTIME: str = "__quartz_runtime"
+# `(lineno, col_offset, end_lineno, end_col_offset)` of nodes
+# outside any node with a position.
+NO_POSITION: tuple[int, int, int, int] = (1, 0, 1, 0)
+
 ##############################
 # ERROR DEFINITION
 ##############################
@@ -70,120 +94,60 @@ class _TranspilerError(Error):
 class ASTCompile:
     """The Quartz AST Compiler."""
 
-    def __init__(self, program: q.Program) -> None:
+    def __init__(self, program: q.Program | None = None) -> None:
         """*Compiles Python AST from Quartz `Node`'s*.
 
+        The dispatch tables live on the class,
+        so a compiler is cheap to make and can be reused:
+        `compile_module` compiles one program after another.
+
+        Args:
+            program (Program | None): *A Quartz `Program` to compile now*
+
+        """
+        self._context: py.expr_context = LOAD
+        self._uses_runtime: bool = False
+        self._iters: int = 0
+        self._source: Source | None = None
+        # Given to every Python node made, see `_build`.
+        self._position: tuple[int, int, int, int] = NO_POSITION
+        self._positions: dict[int, tuple[int, int]] = {}
+        self._module: py.Module = py.Module(body=[], type_ignores=[])
+        if program is not None:
+            self.compile_module(program)
+
+    ##########################
+    # Main Functions
+    ##########################
+
+    def compile_module(self, program: q.Program) -> py.Module:
+        """*Compile a program, replacing the previous output*.
+
         Args:
             program (Program): *A Quartz `Program`*
 
         Returns:
-            Node: *Every statement and expression*
+            py.Module: *Every statement and expression*
 
         """
-        self._stmt_handlers: dict[Any, Callable[[Any], Any]] = {
-            q.ExprStmt: lambda stmt: py.Expr(self._expr(stmt.expr)),
-            q.Assign: lambda stmt: py.Assign(
-                [self._expr(trgt, py.Store()) for trgt in stmt.targets],
-                self._expr(stmt.value),
-            ),
-            q.Delete: lambda stmt: py.Delete(
-                [self._expr(trgt, py.Del()) for trgt in stmt.targets],
-            ),
-            q.Return: lambda stmt: py.Return(
-                self._expr(stmt.value) if stmt.value else None,
-            ),
-            q.If: lambda stmt: py.If(
-                test=self._expr(stmt.test),
-                body=[self._stmt(sttmnt) for sttmnt in stmt.body],
-                orelse=[self._stmt(sttmnt) for sttmnt in stmt.orelse],
-            ),
-            q.While: lambda stmt: py.While(
-                test=self._expr(stmt.test),
-                body=[self._stmt(sttmnt) for sttmnt in stmt.body],
-                orelse=[self._stmt(sttmnt) for sttmnt in stmt.orelse],
-            ),
-            q.For: lambda stmt: py.For(
-                target=self._expr(stmt.target, ctx=py.Store()),
-                iter=self._expr(stmt.iter_),
-                body=[self._stmt(sttmnt) for sttmnt in stmt.body],
-                orelse=[self._stmt(sttmnt) for sttmnt in stmt.orelse],
-            ),
-            q.FunctionDefinition: lambda stmt: py.FunctionDef(
-                name=stmt.name,
-                args=self._arguments(stmt.args),
-                body=[self._stmt(sttmnt) for sttmnt in stmt.body],
-                decorator_list=[],
-            ),
-        }
-        self._expr_handlers: dict[Any, Callable[[Any], Any]] = {
-            q.Constant: lambda node: py.Constant(node.value),
-            q.Ident: lambda node: py.Name(node.name, self._get_ctx()),
-            q.BoolOp: lambda node: py.BoolOp(
-                op=(py.Or if node.op == Tag.OR else py.And)(),
-                values=[self._expr(value) for value in node.values],
-            ),
-            q.BinaryOp: lambda node: py.BinOp(
-                left=self._expr(node.left),
-                op=BINARY_OPERATORS[node.op](),
-                right=self._expr(node.right),
-            ),
-            q.UnaryOp: lambda node: py.UnaryOp(
-                op=UNARY_OPERATORS[node.op](),
-                operand=self._expr(node.operand),
-            ),
-            q.Comparison: lambda node: py.Compare(
-                self._expr(node.left),
-                [COMPARE_OPERATORS[op]() for op in node.ops],
-                [self._expr(expr) for expr in node.comparators],
-            ),
-            q.TernaryOp: lambda node: py.IfExp(
-                self._expr(node.test),
-                self._expr(node.body),
-                self._expr(node.orelse),
-            ),
-            q.List: self._list,
-            q.Tuple: self._tuple,
-            q.Set: lambda node: py.Set(
-                [self._expr(elt) for elt in node.elements],
-            ),
-            q.Dict: lambda node: py.Dict(
-                [self._expr(key) for key in node.keys],
-                [self._expr(value) for value in node.values],
-            ),
-            q.Call: lambda node: py.Call(
-                self._expr(node.func),
-                [self._expr(arg) for arg in node.args],
-                [self._keyword(kw) for kw in node.keywords],
-            ),
-            q.Keyword: self._keyword,
-            q.Attribute: self._attribute,
-            q.Subscript: self._subscript,
-            q.Slice: lambda node: py.Slice(
-                self._expr(node.lower) if node.lower else None,
-                self._expr(node.upper) if node.upper else None,
-                self._expr(node.step) if node.step else None,
-            ),
-            q.Lambda: lambda node: py.Lambda(
-                self._arguments(node.args),
-                self._expr(node.body),
-            ),
-        }
-        self._context: py.expr_context = py.Load()
+        self._context = LOAD
+        self._uses_runtime = False
+        self._iters = 0
+        self._source = program.source
+        self._position = NO_POSITION
+        self._positions = {}
         statements: list[py.stmt] = [
             self._stmt(node) for node in program.statements
         ]
-        self._module: py.Module = py.Module(body=statements, type_ignores=[])
-
-    ##########################
-    # Helper Functions
-    ##########################
-
-    def _get_ctx(self) -> py.expr_context:
-        return self._context
-
-    ##########################
-    # Main Getter Function
-    ##########################
+        if self._uses_runtime:
+            statements.insert(
+                0,
+                self._at(
+                    py.Import([self._at(py.alias("quartz.runtime", RUNTIME))]),
+                ),
+            )
+        self._module = py.Module(body=statements, type_ignores=[])
+        return self._module
 
     def get_module(self) -> py.Module:
         """*Return the output of the AST compiler*.
@@ -194,25 +158,417 @@ class ASTCompile:
         """
         return self._module
 
+    ##########################
+    # Helper Functions
+    ##########################
+
+    def _get_ctx(self) -> py.expr_context:
+        return self._context
+
+    def _runtime(self, name: str) -> py.Attribute:
+        self._uses_runtime = True
+        module: py.Name = self._at(py.Name(RUNTIME, LOAD))
+        return self._at(py.Attribute(module, name, LOAD))
+
+    def _at(self, node: PyNode) -> PyNode:
+        # Positions a node the Quartz AST has no counterpart for.
+        (
+            node.lineno,
+            node.col_offset,
+            node.end_lineno,
+            node.end_col_offset,
+        ) = self._position
+        return node
+
+    def _build(
+        self,
+        node: q.Node,
+        handler: "Callable[[ASTCompile, Any], PyNode]",
+    ) -> PyNode:
+        # Nodes without a position of their own take their parent's.
+        outer: tuple[int, int, int, int] = self._position
+        if node.start >= 0 and self._source is not None:
+            self._position = self._locate(node.start) + self._locate(node.end)
+        built: PyNode = handler(self, node)
+        (
+            built.lineno,
+            built.col_offset,
+            built.end_lineno,
+            built.end_col_offset,
+        ) = self._position
+        self._position = outer
+        return built
+
+    def _locate(self, offset: int) -> tuple[int, int]:
+        # Parents and their first and last children share offsets.
+        position: tuple[int, int] | None = self._positions.get(offset)
+        if position is None:
+            position = self._source.position(offset)
+            self._positions[offset] = position
+        return position
+
+    def _stmts(self, stmts: list[q.Stmt]) -> list[py.stmt]:
+        return [self._stmt(stmt) for stmt in stmts]
+
     ##########################
     # Match Functions
     ##########################
 
     def _stmt(self, stmt: q.Stmt) -> py.stmt:
-        return self._stmt_handlers[type(stmt)](stmt)
+        return self._build(stmt, self._stmt_handlers[type(stmt)])
 
     def _expr(
         self,
         expr: q.Expr,
-        ctx: py.expr_context | None = None,
+        ctx: py.expr_context = LOAD,
     ) -> py.expr:
-        self._context: py.expr_context = ctx or py.Load()
-        return self._expr_handlers[type(expr)](expr)
+        self._context = ctx
+        return self._build(expr, self._expr_handlers[type(expr)])
+
+    ##########################
+    # Statements
+    ##########################
+
+    def _expr_stmt(self, stmt: q.ExprStmt) -> py.stmt:
+        if isinstance(stmt.expr, q.Stream):
+            # A discarded stream is drained in place by a plain loop.
+            return py.For(
+                target=self._at(py.Name(STREAM_ITEM, STORE)),
+                iter=self._expr(stmt.expr.iterable),
+                body=[self._at(py.Expr(self._expr(stmt.expr.element)))],
+                orelse=[],
+            )
+        return py.Expr(self._expr(stmt.expr))
+
+    def _assign(self, stmt: q.Assign) -> py.Assign:
+        return py.Assign(
+            [self._expr(target, STORE) for target in stmt.targets],
+            self._expr(stmt.value),
+        )
+
+    def _delete(self, stmt: q.Delete) -> py.Delete:
+        return py.Delete([self._expr(target, DEL) for target in stmt.targets])
+
+    def _import(self, stmt: q.Import) -> py.Import:
+        return py.Import(
+            [self._build(alias, ASTCompile._alias) for alias in stmt.names],
+        )
+
+    def _import_from(self, stmt: q.ImportFrom) -> py.ImportFrom:
+        return py.ImportFrom(
+            stmt.module,
+            [self._build(alias, ASTCompile._alias) for alias in stmt.names],
+            0,
+        )
+
+    def _alias(self, alias: q.Alias) -> py.alias:
+        return py.alias(alias.name, alias.asname)
+
+    def _continue(self, _: q.Continue) -> py.Continue:
+        return py.Continue()
+
+    def _return(self, stmt: q.Return) -> py.Return:
+        return py.Return(self._expr(stmt.value) if stmt.value else None)
+
+    def _if(self, stmt: q.If) -> py.If:
+        return py.If(
+            self._expr(stmt.test),
+            self._stmts(stmt.body),
+            self._stmts(stmt.orelse),
+        )
+
+    def _while(self, stmt: q.While) -> py.While:
+        return py.While(
+            self._expr(stmt.test),
+            self._stmts(stmt.body),
+            self._stmts(stmt.orelse),
+        )
+
+    def _for(self, stmt: q.For) -> py.For:
+        return py.For(
+            target=self._expr(stmt.target, STORE),
+            iter=self._expr(stmt.iter_),
+            body=self._stmts(stmt.body),
+            orelse=self._stmts(stmt.orelse),
+        )
+
+    def _function_definition(
+        self,
+        stmt: q.FunctionDefinition,
+    ) -> py.FunctionDef:
+        return py.FunctionDef(
+            name=stmt.name,
+            args=self._arguments(stmt.args),
+            body=self._stmts(stmt.body),
+            decorator_list=[self._expr(dec) for dec in stmt.decorators],
+        )
+
+    def _async_function_definition(
+        self,
+        stmt: q.AsyncFunctionDefinition,
+    ) -> py.AsyncFunctionDef:
+        return py.AsyncFunctionDef(
+            name=stmt.name,
+            args=self._arguments(stmt.args),
+            body=self._stmts(stmt.body),
+            decorator_list=[self._expr(dec) for dec in stmt.decorators],
+        )
+
+    ##########################
+    # Expressions
+    ##########################
+
+    def _constant(self, node: q.Constant) -> py.Constant:
+        return py.Constant(node.value)
+
+    def _ident(self, node: q.Ident) -> py.Name:
+        return py.Name(node.name, self._get_ctx())
+
+    def _bool_op(self, node: q.BoolOp) -> py.BoolOp:
+        return py.BoolOp(
+            BOOL_OPERATORS[node.op],
+            [self._expr(value) for value in node.values],
+        )
+
+    def _binary_op(self, node: q.BinaryOp) -> py.BinOp:
+        return py.BinOp(
+            self._expr(node.left),
+            BINARY_OPERATORS[node.op],
+            self._expr(node.right),
+        )
+
+    def _unary_op(self, node: q.UnaryOp) -> py.UnaryOp:
+        return py.UnaryOp(
+            UNARY_OPERATORS[node.op],
+            self._expr(node.operand),
+        )
+
+    def _comparison(self, node: q.Comparison) -> py.Compare:
+        return py.Compare(
+            self._expr(node.left),
+            [COMPARE_OPERATORS[op] for op in node.ops],
+            [self._expr(expr) for expr in node.comparators],
+        )
+
+    def _ternary_op(self, node: q.TernaryOp) -> py.IfExp:
+        return py.IfExp(
+            self._expr(node.test),
+            self._expr(node.body),
+            self._expr(node.orelse),
+        )
+
+    def _set(self, node: q.Set) -> py.Set:
+        return py.Set([self._expr(elt) for elt in node.elements])
+
+    def _dict(self, node: q.Dict) -> py.Dict:
+        return py.Dict(
+            [self._expr(key) for key in node.keys],
+            [self._expr(value) for value in node.values],
+        )
+
+    def _list_comp(self, node: q.ListComp) -> py.expr:
+        return self._comp(
+            py.ListComp(self._expr(node.element), []),
+            node.generators,
+        )
+
+    def _set_comp(self, node: q.SetComp) -> py.expr:
+        return self._comp(
+            py.SetComp(self._expr(node.element), []),
+            node.generators,
+        )
+
+    def _dict_comp(self, node: q.DictComp) -> py.expr:
+        return self._comp(
+            py.DictComp(self._expr(node.key), self._expr(node.value), []),
+            node.generators,
+        )
+
+    def _generator_exp(self, node: q.GeneratorExp) -> py.expr:
+        return self._comp(
+            py.GeneratorExp(self._expr(node.element), []),
+            node.generators,
+        )
+
+    def _comp(
+        self,
+        comp: py.ListComp | py.SetComp | py.DictComp | py.GeneratorExp,
+        generators: list[q.Comprehension],
+    ) -> py.expr:
+        # A comprehension's iterable cannot contain `:=` (from `|>`
+        # or a long chain), so such an iterable is assigned beforehand:
+        # the first outside, as `(t := a, [... for x in t])[-1]`,
+        # and the rest in an always true test of the clause before them,
+        # `for x in a if [t := b] for y in t`.
+        comp.generators = [
+            self._build(generator, ASTCompile._comprehension)
+            for generator in generators
+        ]
+        first: py.NamedExpr | None = None
+        for index, generator in enumerate(comp.generators):
+            if not any(
+                isinstance(child, py.NamedExpr)
+                for child in py.walk(generator.iter)
+            ):
+                continue
+            name: str = ITER_TEMP.format(self._iters)
+            self._iters += 1
+            assign: py.NamedExpr = self._at(
+                py.NamedExpr(self._at(py.Name(name, STORE)), generator.iter),
+            )
+            generator.iter = self._at(py.Name(name, LOAD))
+            if index:
+                comp.generators[index - 1].ifs.append(
+                    self._at(py.List([assign], LOAD)),
+                )
+            else:
+                first = assign
+        if first is None:
+            return comp
+        return py.Subscript(
+            self._at(py.Tuple([first, self._at(comp)], LOAD)),
+            self._at(py.Constant(-1)),
+            LOAD,
+        )
+
+    def _comprehension(self, node: q.Comprehension) -> py.comprehension:
+        return py.comprehension(
+            self._expr(node.target, STORE),
+            self._expr(node.iter_),
+            [self._expr(test) for test in node.ifs],
+            0,
+        )
+
+    def _call(self, node: q.Call) -> py.Call:
+        return py.Call(
+            self._expr(node.func),
+            [self._expr(arg) for arg in node.args],
+            [self._expr(kw) for kw in node.keywords],
+        )
+
+    def _slice(self, node: q.Slice) -> py.Slice:
+        return py.Slice(
+            self._expr(node.lower) if node.lower else None,
+            self._expr(node.upper) if node.upper else None,
+            self._expr(node.step) if node.step else None,
+        )
+
+    def _named_expr(self, node: q.NamedExpr) -> py.NamedExpr:
+        return py.NamedExpr(
+            self._expr(node.target, STORE),
+            self._expr(node.value),
+        )
+
+    def _yield(self, node: q.Yield) -> py.Yield:
+        return py.Yield(self._expr(node.value) if node.value else None)
+
+    def _yield_from(self, node: q.YieldFrom) -> py.YieldFrom:
+        return py.YieldFrom(self._expr(node.value))
+
+    def _await(self, node: q.Await) -> py.Await:
+        return py.Await(self._expr(node.value))
+
+    def _gather(self, node: q.Gather) -> py.Call:
+        return py.Call(
+            self._runtime("gather"),
+            [self._expr(stage) for stage in node.stages],
+            [],
+        )
+
+    def _stream_item(self, _: q.StreamItem) -> py.Name:
+        return py.Name(STREAM_ITEM, LOAD)
+
+    def _lambda(self, node: q.Lambda) -> py.Lambda:
+        return py.Lambda(self._arguments(node.args), self._expr(node.body))
+
+    def _stream(self, node: q.Stream) -> py.expr:
+        element: q.Expr = node.element
+        iterable: py.expr = self._expr(node.iterable)
+        # `~> f` alone maps `f` directly, without a Python-level frame.
+        if (
+            isinstance(element, q.Call)
+            and element.args == [q.StreamItem()]
+            and not element.keywords
+        ):
+            return py.Call(
+                self._at(py.Name("map", LOAD)),
+                [self._expr(element.func), iterable],
+                [],
+            )
+        if any(isinstance(node, py.NamedExpr) for node in py.walk(iterable)):
+            # A comprehension's iterable cannot contain `:=` (from `|>`).
+            return py.Call(
+                self._at(py.Name("map", LOAD)),
+                [self._at(self._item_lambda(element)), iterable],
+                [],
+            )
+        return py.GeneratorExp(
+            self._expr(element),
+            [
+                py.comprehension(
+                    self._at(py.Name(STREAM_ITEM, STORE)),
+                    iterable,
+                    [],
+                    0,
+                ),
+            ],
+        )
+
+    def _parallel(self, node: q.Parallel) -> py.Call:
+        stages: list[py.expr] = [
+            self._build(stage, ASTCompile._stage) for stage in node.stages
+        ]
+        return py.Call(
+            self._runtime("parallel_map"),
+            [
+                stages[0]
+                if len(stages) == 1
+                else self._at(py.Call(self._runtime("Chain"), stages, [])),
+                self._expr(node.iterable),
+            ],
+            [self._expr(option) for option in node.options],
+        )
+
+    def _stage(self, stage: q.Call) -> py.expr:
+        # Stages become `Apply`/`CallMethod` objects where possible,
+        # since lambdas cannot be sent to a process pool.
+        args: list[py.expr] = [self._expr(arg) for arg in stage.args[1:]]
+        keywords: list[py.keyword] = [self._expr(kw) for kw in stage.keywords]
+        if stage.args[:1] == [q.StreamItem()]:
+            return py.Call(
+                self._runtime("Apply"),
+                [self._expr(stage.func), *args],
+                keywords,
+            )
+        attrs: list[str] = []
+        func: q.Expr = stage.func
+        while isinstance(func, q.Attribute):
+            attrs.insert(0, func.attr)
+            func = func.value
+        if isinstance(func, q.StreamItem):
+            return py.Call(
+                self._runtime("CallMethod"),
+                [self._at(py.Constant(".".join(attrs))), *args],
+                keywords,
+            )
+        return self._item_lambda(stage)
+
+    def _item_lambda(self, body: q.Expr) -> py.Lambda:
+        return py.Lambda(
+            py.arguments(
+                posonlyargs=[],
+                args=[self._at(py.arg(STREAM_ITEM))],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            self._expr(body),
+        )
 
     def _arguments(self, args: q.Arguments) -> py.arguments:
         return py.arguments(
             posonlyargs=[],
-            args=[self._arg(arg) for arg in args.args],
+            args=[self._build(arg, ASTCompile._arg) for arg in args.args],
             kwonlyargs=[],
             vararg=None,
             kwarg=None,
@@ -230,11 +586,11 @@ class ASTCompile:
 
     def _list(self, node: q.List) -> py.List:
         ctx: py.expr_context = self._get_ctx()
-        return py.List([self._expr(elt) for elt in node.elements], ctx)
+        return py.List([self._expr(elt, ctx) for elt in node.elements], ctx)
 
     def _tuple(self, node: q.Tuple) -> py.Tuple:
         ctx: py.expr_context = self._get_ctx()
-        return py.Tuple([self._expr(elt) for elt in node.elements], ctx)
+        return py.Tuple([self._expr(elt, ctx) for elt in node.elements], ctx)
 
     def _keyword(self, node: q.Keyword) -> py.keyword:
         return py.keyword(node.arg, self._expr(node.value))
@@ -254,3 +610,54 @@ class ASTCompile:
             self._expr(node.slice_),
             ctx,
         )
+
+    ##########################
+    # Dispatch Tables
+    ##########################
+
+    _stmt_handlers: ClassVar[dict[type, Callable[..., py.stmt]]] = {
+        q.Assign: _assign,
+        q.AsyncFunctionDefinition: _async_function_definition,
+        q.Continue: _continue,
+        q.Delete: _delete,
+        q.ExprStmt: _expr_stmt,
+        q.For: _for,
+        q.FunctionDefinition: _function_definition,
+        q.If: _if,
+        q.Import: _import,
+        q.ImportFrom: _import_from,
+        q.Return: _return,
+        q.While: _while,
+    }
+
+    _expr_handlers: ClassVar[dict[type, Callable[..., py.AST]]] = {
+        q.Attribute: _attribute,
+        q.Await: _await,
+        q.BinaryOp: _binary_op,
+        q.BoolOp: _bool_op,
+        q.Call: _call,
+        q.Comparison: _comparison,
+        q.Constant: _constant,
+        q.Dict: _dict,
+        q.DictComp: _dict_comp,
+        q.Gather: _gather,
+        q.GeneratorExp: _generator_exp,
+        q.Ident: _ident,
+        q.Keyword: _keyword,
+        q.Lambda: _lambda,
+        q.List: _list,
+        q.ListComp: _list_comp,
+        q.NamedExpr: _named_expr,
+        q.Parallel: _parallel,
+        q.Set: _set,
+        q.SetComp: _set_comp,
+        q.Slice: _slice,
+        q.Stream: _stream,
+        q.StreamItem: _stream_item,
+        q.Subscript: _subscript,
+        q.TernaryOp: _ternary_op,
+        q.Tuple: _tuple,
+        q.UnaryOp: _unary_op,
+        q.Yield: _yield,
+        q.YieldFrom: _yield_from,
+    }
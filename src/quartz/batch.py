@@ -0,0 +1,186 @@
+"""*Batch checking and compiling for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from . import cache
+from .api import compile_uncached
+from .importer import find_sources
+from .tokendef import Error
+
+if TYPE_CHECKING:
+    from types import CodeType
+
+##############################
+# SET CONSTANTS
+##############################
+
+OK: str = "ok"
+CACHED: str = "cached"
+FAILED: str = "failed"
+STATUSES: tuple[str, ...] = (OK, CACHED, FAILED)
+# Files go to workers in about this many chunks each,
+# few enough to keep messages cheap and enough to balance the load.
+CHUNKS_PER_WORKER: int = 4
+
+##############################
+# RESULTS
+##############################
+
+
+class Diagnostic(NamedTuple):
+    """*A problem found in one file, as reported in JSON*."""
+
+    path: str
+    line: int | None
+    column: int | None
+    error: str
+    message: str
+
+
+class FileResult(NamedTuple):
+    """*What checking one file found*."""
+
+    path: str
+    status: str
+    diagnostic: Diagnostic | None = None
+
+
+def diagnose(path: str, error: Exception) -> Diagnostic:
+    """*Describe what went wrong with one file*.
+
+    Args:
+        path (str): *Path to Quartz file*
+        error (Exception): *Raised while reading or compiling it*
+
+    Returns:
+        Diagnostic: *Position, if known, error name and message*
+
+    """
+    line: int | None = None
+    column: int | None = None
+    message: str = str(error)
+    if isinstance(error, Error):
+        line, column, message = error.ln, error.col, error.message
+    elif isinstance(error, SyntaxError):
+        # From CPython's compiler, e.g. `<<<` outside a `fn`.
+        line, column, message = error.lineno, error.offset, error.msg
+    return Diagnostic(
+        path,
+        line,
+        column,
+        type(error).__name__.lstrip("_"),
+        message.strip(),
+    )
+
+
+##############################
+# CHECK
+##############################
+
+
+def check_file(path: str, *, optimize: int, write: bool) -> FileResult:
+    """*Lex, parse and compile one Quartz file, without running it*.
+
+    Args:
+        path (str): *Path to Quartz file*
+        optimize (int): *Optimization level*
+        write (bool): *Store the code in the bytecode cache,
+        skipping files it already holds*
+
+    Returns:
+        FileResult: *Status, and the error if there was one*
+
+    """
+    file: Path = Path(path)
+    try:
+        source: str = file.read_text(encoding="utf8")
+        # Compiled as a main program, like `quartz file.qrtz` would.
+        if write and cache.load(
+            file,
+            source,
+            optimize=optimize,
+            top_level_await=True,
+        ):
+            return FileResult(path, CACHED)
+        code: CodeType = compile_uncached(
+            source,
+            path,
+            optimize,
+            top_level_await=True,
+        )
+    except Exception as error:  # noqa: BLE001
+        # An unreadable file, or a compiler bug, fails only this file.
+        return FileResult(path, FAILED, diagnose(path, error))
+    if write:
+        cache.store(
+            file,
+            source,
+            code,
+            optimize=optimize,
+            top_level_await=True,
+        )
+    return FileResult(path, OK)
+
+
+def check(
+    roots: list[Path],
+    *,
+    optimize: int,
+    write: bool,
+    jobs: int | None = None,
+) -> dict[str, Any]:
+    """*Check, or compile, every Quartz file under some paths in parallel*.
+
+    Files are spread over a pool of `jobs` processes,
+    so wall-clock time falls with the number of cores.
+
+    Args:
+        roots (list[Path]): *Quartz files or directories*
+        optimize (int): *Optimization level*
+        write (bool): *Store the code in the bytecode cache*
+        jobs (int | None): *Worker processes, or `None` for one per core*
+
+    Returns:
+        dict[str, Any]: *Counts per status, timing and diagnostics*
+
+    """
+    start: float = time.perf_counter()
+    paths: list[str] = [
+        str(path) for root in roots for path in find_sources(root)
+    ]
+    workers: int = max(1, min(jobs or os.cpu_count() or 1, len(paths)))
+    task: partial[FileResult] = partial(
+        check_file,
+        optimize=optimize,
+        write=write,
+    )
+    if workers == 1:
+        results: list[FileResult] = list(map(task, paths))
+    else:
+        chunksize: int = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(task, paths, chunksize=chunksize))
+    counts: Counter[str] = Counter(result.status for result in results)
+    return {
+        "command": "compile" if write else "check",
+        "optimize": optimize,
+        "jobs": workers,
+        "files": len(results),
+        **{status: counts[status] for status in STATUSES},
+        "seconds": time.perf_counter() - start,
+        "diagnostics": [
+            result.diagnostic._asdict()
+            for result in results
+            if result.diagnostic is not None
+        ],
+    }
@@ -0,0 +1,165 @@
+"""*Ahead-of-time builds for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+from pathlib import Path
+from typing import NamedTuple
+
+from .api import compile_uncached, transpile
+from .batch import Diagnostic, diagnose
+from .cache import VERSION, source_hash
+from .importer import find_sources
+
+##############################
+# SET CONSTANTS
+##############################
+
+EMIT_FORMATS: tuple[str, ...] = ("py",)
+# The first line of every generated file; `build` compares it
+# to decide whether a file needs rebuilding.
+HEADER: str = "# quartz-build: sha256={hash} opt={optimize} version={version}"
+WARNING: str = "# Generated from {name}; edit that file instead."
+# Built files are imported, so only `quartz file.qrtz` can run these.
+TOP_LEVEL_AWAIT_MESSAGE: str = (
+    "'await' outside function: only `quartz file.qrtz` runs top-level "
+    "await, so move it into an `async fn` to build"
+)
+
+##############################
+# BUILD
+##############################
+
+
+class BuildResult(NamedTuple):
+    """*What `build` wrote, and why any other files failed*."""
+
+    written: list[Path]
+    diagnostics: list[Diagnostic]
+
+
+def header(source: str, *, optimize: int) -> str:
+    """*Make the first line of the Python file built from a program*.
+
+    Args:
+        source (str): *Program text*
+        optimize (int): *Optimization level*
+
+    Returns:
+        str: *Header recording the source hash, level and version*
+
+    """
+    return HEADER.format(
+        hash=source_hash(source).hex(),
+        optimize=optimize,
+        version=VERSION,
+    )
+
+
+def output_path(path: Path, root: Path, out_dir: Path | None) -> Path:
+    """*Find where the Python file for a Quartz file goes*.
+
+    Args:
+        path (Path): *Path to Quartz file*
+        root (Path): *File or directory being built*
+        out_dir (Path | None): *Output directory, or `None` for in place*
+
+    Returns:
+        Path: *`.py` path beside the source or mirrored under `out_dir`*
+
+    """
+    target: Path = path.with_suffix(".py")
+    if out_dir is None:
+        return target
+    base: Path = root.parent if root.is_file() else root
+    return out_dir / target.relative_to(base)
+
+
+def _awaits_at_top_level(source: str, path: Path, *, optimize: int) -> bool:
+    # Valid as a main program, which `compile_uncached` allows to await.
+    try:
+        compile_uncached(source, str(path), optimize, top_level_await=True)
+    except SyntaxError:
+        return False
+    return True
+
+
+def build_file(path: Path, target: Path, *, optimize: int) -> bool:
+    """*Write the Python translation of one Quartz file*.
+
+    Args:
+        path (Path): *Path to Quartz file*
+        target (Path): *Python file to write*
+        optimize (int): *Optimization level*
+
+    Returns:
+        bool: *Whether it was written, or `False` if already up to date*
+
+    Raises:
+        Error: *The program does not lex or parse*
+        SyntaxError: *CPython rejects the program, or it awaits
+        outside an `async fn`, so nothing is written*
+
+    """
+    source: str = path.read_text(encoding="utf8")
+    first: str = header(source, optimize=optimize)
+    try:
+        with target.open(encoding="utf8") as f:
+            if f.readline().rstrip("\n") == first:
+                return False
+    except OSError:
+        pass
+    try:
+        python: str = transpile(source, optimize, filename=str(path))
+    except SyntaxError as error:
+        if not _awaits_at_top_level(source, path, optimize=optimize):
+            raise
+        raise SyntaxError(
+            TOP_LEVEL_AWAIT_MESSAGE,
+            (error.filename, error.lineno, error.offset, error.text),
+        ) from error
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(
+        f"{first}\n{WARNING.format(name=path.name)}\n\n{python}",
+        encoding="utf8",
+    )
+    return True
+
+
+def build(
+    root: Path,
+    *,
+    optimize: int,
+    out_dir: Path | None = None,
+) -> BuildResult:
+    """*Translate a Quartz file, or every one under a directory, to Python*.
+
+    The output imports like any Python module,
+    so deployments can skip the Quartz front end
+    and let CPython cache bytecode as usual.
+    Programs using `~>` or `|...|` still import `quartz.runtime`.
+    A program that awaits outside an `async fn` fails,
+    since Python only allows that in a main program Quartz runs itself.
+    A file that fails is reported and skipped,
+    leaving any earlier build of it in place.
+
+    Args:
+        root (Path): *Quartz file or directory*
+        optimize (int): *Optimization level*
+        out_dir (Path | None): *Output directory, or `None` for in place*
+
+    Returns:
+        BuildResult: *Python files written, and a diagnostic per failure*
+
+    """
+    result: BuildResult = BuildResult([], [])
+    for path in find_sources(root):
+        target: Path = output_path(path, root, out_dir)
+        try:
+            if build_file(path, target, optimize=optimize):
+                result.written.append(target)
+        except Exception as error:  # noqa: BLE001
+            # An unreadable file, or a compiler bug, fails only this file.
+            result.diagnostics.append(diagnose(str(path), error))
+    return result
@@ -0,0 +1,209 @@
+"""*The compiled-code cache for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import contextlib
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+from types import CodeType
+
+##############################
+# SET CONSTANTS
+##############################
+
+try:
+    VERSION: str = version("quartz")
+except PackageNotFoundError:
+    VERSION = "0.0.0"
+
+CACHE_DIR: str = "__qrtzcache__"
+CACHE_SUFFIX: str = ".qrtzc"
+# Marks entries compiled with `TOP_LEVEL_AWAIT`, which imports never read.
+TOP_LEVEL_AWAIT_TAG: str = ".tla"
+# Disables the cache when set to anything but an empty string.
+DISABLE_ENV: str = "QUARTZ_NO_CACHE"
+
+# Python's magic number, then Quartz's, then the Quartz version.
+HEADER: bytes = MAGIC_NUMBER + b"QRTZ" + VERSION.encode() + b"\n"
+HASH_SIZE: int = hashlib.sha256().digest_size
+
+##############################
+# CACHE
+##############################
+
+
+def enabled() -> bool:
+    """*Check whether the cache is switched on*.
+
+    Returns:
+        bool: *`False` if `QUARTZ_NO_CACHE` is set*
+
+    """
+    return not os.environ.get(DISABLE_ENV)
+
+
+def cache_path(
+    path: Path,
+    *,
+    optimize: int,
+    top_level_await: bool = False,
+) -> Path:
+    """*Find where the code for a Quartz file is cached*.
+
+    A main program and a module get separate entries,
+    since a main program that awaits at the top level compiles to a coroutine.
+
+    Args:
+        path (Path): *Path to Quartz file*
+        optimize (int): *Optimization level the code is compiled at*
+        top_level_await (bool): *Whether it is compiled as a main program*
+
+    Returns:
+        Path: *`__qrtzcache__/<name>.<python tag>.opt-<level>.qrtzc`,
+        with `.tla` before the suffix for a main program*
+
+    """
+    tag: str = f"{sys.implementation.cache_tag}.opt-{optimize}"
+    if top_level_await:
+        tag += TOP_LEVEL_AWAIT_TAG
+    return path.parent / CACHE_DIR / f"{path.name}.{tag}{CACHE_SUFFIX}"
+
+
+def source_hash(source: str) -> bytes:
+    """*Hash a Quartz program for the cache key*.
+
+    Args:
+        source (str): *Program text*
+
+    Returns:
+        bytes: *SHA-256 digest of the UTF-8 source*
+
+    """
+    return hashlib.sha256(source.encode()).digest()
+
+
+def load(
+    path: Path,
+    source: str,
+    *,
+    optimize: int,
+    top_level_await: bool = False,
+) -> CodeType | None:
+    """*Get the cached code for a Quartz file, if it is still valid*.
+
+    Args:
+        path (Path): *Path to Quartz file*
+        source (str): *Current program text*
+        optimize (int): *Optimization level the code is compiled at*
+        top_level_await (bool): *Whether it is compiled as a main program*
+
+    Returns:
+        CodeType | None: *`None` on a miss or a stale or unreadable entry*
+
+    """
+    target: Path = cache_path(
+        path,
+        optimize=optimize,
+        top_level_await=top_level_await,
+    )
+    try:
+        data: bytes = target.read_bytes()
+    except OSError:
+        return None
+    key_end: int = len(HEADER) + HASH_SIZE
+    stored_hash: bytes = data[len(HEADER) : key_end]
+    if not data.startswith(HEADER) or stored_hash != source_hash(source):
+        return None
+    try:
+        # Only entries whose header and source hash match get here.
+        code: object = marshal.loads(data[key_end:])  # noqa: S302
+    except (EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def store(
+    path: Path,
+    source: str,
+    code: CodeType,
+    *,
+    optimize: int,
+    top_level_await: bool = False,
+) -> bool:
+    """*Cache the compiled code for a Quartz file*.
+
+    The entry is written to a temporary file and renamed into place,
+    so concurrent readers and writers never see a partial entry.
+
+    Args:
+        path (Path): *Path to Quartz file*
+        source (str): *Program text `code` was compiled from*
+        code (CodeType): *Compiled program*
+        optimize (int): *Optimization level `code` was compiled at*
+        top_level_await (bool): *Whether `code` was compiled
+        as a main program*
+
+    Returns:
+        bool: *Whether the entry was written*
+
+    """
+    target: Path = cache_path(
+        path,
+        optimize=optimize,
+        top_level_await=top_level_await,
+    )
+    data: bytes = HEADER + source_hash(source) + marshal.dumps(code)
+    try:
+        target.parent.mkdir(exist_ok=True)
+        fd, temp = tempfile.mkstemp(
+            prefix=f".{target.name}.",
+            dir=target.parent,
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            Path(temp).replace(target)
+        except BaseException:
+            Path(temp).unlink(missing_ok=True)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+def clean(root: Path) -> int:
+    """*Delete every cache entry under a path*.
+
+    Args:
+        root (Path): *Quartz file or directory to clean*
+
+    Returns:
+        int: *Number of files removed*
+
+    """
+    if root.is_file():
+        entries: list[Path] = list(
+            (root.parent / CACHE_DIR).glob(f"{root.name}.*{CACHE_SUFFIX}"),
+        )
+    else:
+        entries = list(root.rglob(f"{CACHE_DIR}/*{CACHE_SUFFIX}"))
+        entries += root.rglob(f"{CACHE_DIR}/.*{CACHE_SUFFIX}.*")
+    removed: int = 0
+    for entry in entries:
+        try:
+            entry.unlink()
+        except OSError:
+            continue
+        removed += 1
+        # Only succeeds once the directory is empty.
+        with contextlib.suppress(OSError):
+            entry.parent.rmdir()
+    return removed
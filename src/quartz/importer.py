@@ -0,0 +1,262 @@
+"""*The import hook for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import multiprocessing
+import sys
+from collections.abc import Sequence
+from importlib.abc import FileLoader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+from types import CodeType, ModuleType
+from typing import TYPE_CHECKING
+
+from . import cache
+from .api import compile_uncached, run_code
+from .optimizer import DEFAULT_LEVEL
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+##############################
+# SET CONSTANTS
+##############################
+
+SOURCE_SUFFIX: str = ".qrtz"
+
+##############################
+# SOURCES
+##############################
+
+
+def find_sources(root: Path) -> list[Path]:
+    """*List a Quartz file, or every one under a directory*.
+
+    Args:
+        root (Path): *Quartz file or directory*
+
+    Returns:
+        list[Path]: *Quartz files, sorted*
+
+    """
+    if root.is_file():
+        return [root]
+    return sorted(root.rglob(f"*{SOURCE_SUFFIX}"))
+
+
+##############################
+# LOADER
+##############################
+
+
+class QuartzLoader(FileLoader):
+    """*Loads a `.qrtz` module through the Quartz compiler*."""
+
+    def __init__(
+        self,
+        fullname: str,
+        path: str,
+        *,
+        use_cache: bool = True,
+        optimize: int = DEFAULT_LEVEL,
+    ) -> None:
+        """*Load one Quartz module*.
+
+        Args:
+            fullname (str): *Fully qualified module name*
+            path (str): *Path to the `.qrtz` file*
+            use_cache (bool): *Read and write `__qrtzcache__` entries*
+            optimize (int): *Optimization level*
+
+        """
+        super().__init__(fullname, path)
+        self._use_cache: bool = use_cache
+        self._optimize: int = optimize
+
+    def get_source(self, fullname: str) -> str:
+        """*Read the module's Quartz source*.
+
+        Args:
+            fullname (str): *Fully qualified module name*
+
+        Returns:
+            str: *Program text*
+
+        """
+        return self.get_data(self.get_filename(fullname)).decode("utf8")
+
+    def get_code(self, fullname: str) -> CodeType:
+        """*Compile the module, or reuse its cached code*.
+
+        Args:
+            fullname (str): *Fully qualified module name*
+
+        Returns:
+            CodeType: *Compiled module*
+
+        """
+        path: Path = Path(self.get_filename(fullname))
+        source: str = self.get_source(fullname)
+        code: CodeType | None = (
+            cache.load(path, source, optimize=self._optimize)
+            if self._use_cache
+            else None
+        )
+        if code is None:
+            code = compile_uncached(source, str(path), self._optimize)
+            if self._use_cache:
+                cache.store(path, source, code, optimize=self._optimize)
+        return code
+
+    def init_worker(self) -> None:
+        """*Run a Quartz `__main__` in a worker process that was not forked*.
+
+        As `multiprocessing` does for a Python `__main__`,
+        the program runs again as `__mp_main__`,
+        so workers can unpickle the functions it defines,
+        and starting processes while it runs is an error.
+        """
+        install(use_cache=self._use_cache, optimize=self._optimize)
+        path: Path = Path(self.path)
+        source: str = self.get_source(self.name)
+        # Stored as a main program by the parent, see `quartz.quartz`.
+        code: CodeType | None = None
+        if self._use_cache:
+            code = cache.load(
+                path,
+                source,
+                optimize=self._optimize,
+                top_level_await=True,
+            )
+        if code is None:
+            code = compile_uncached(
+                source,
+                self.path,
+                self._optimize,
+                top_level_await=True,
+            )
+        module: ModuleType = ModuleType("__mp_main__")
+        module.__file__ = self.path
+        sys.modules["__main__"] = sys.modules["__mp_main__"] = module
+        process: BaseProcess = multiprocessing.current_process()
+        # What `multiprocessing` checks to refuse starting processes.
+        process._inheriting = True  # noqa: SLF001
+        try:
+            run_code(code, module.__dict__)
+        finally:
+            process._inheriting = False  # noqa: SLF001
+
+    def is_package(self, fullname: str) -> bool:  # noqa: ARG002
+        """*Quartz modules are never packages*.
+
+        Packages are plain directories, found as namespace packages.
+
+        Args:
+            fullname (str): *Fully qualified module name*
+
+        Returns:
+            bool: *Always `False`*
+
+        """
+        return False
+
+
+##############################
+# FINDER
+##############################
+
+
+class QuartzFinder(MetaPathFinder):
+    """*Finds `<name>.qrtz` files on `sys.path` or a package's `__path__`*."""
+
+    def __init__(
+        self,
+        *,
+        use_cache: bool = True,
+        optimize: int = DEFAULT_LEVEL,
+    ) -> None:
+        """*Resolve imports to Quartz modules*.
+
+        Args:
+            use_cache (bool): *Read and write `__qrtzcache__` entries*
+            optimize (int): *Optimization level*
+
+        """
+        self._use_cache: bool = use_cache
+        self._optimize: int = optimize
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Sequence[str] | None,
+        target: ModuleType | None = None,  # noqa: ARG002
+    ) -> ModuleSpec | None:
+        """*Find the spec for a Quartz module*.
+
+        Args:
+            fullname (str): *Fully qualified module name*
+            path (Sequence[str] | None): *Parent package's `__path__`*
+            target (ModuleType | None): *Unused*
+
+        Returns:
+            ModuleSpec | None: *`None` if no `.qrtz` file matches*
+
+        """
+        name: str = fullname.rpartition(".")[2] + SOURCE_SUFFIX
+        for entry in sys.path if path is None else path:
+            file: Path = Path(entry or ".") / name
+            if file.is_file():
+                return spec_from_file_location(
+                    fullname,
+                    file,
+                    loader=QuartzLoader(
+                        fullname,
+                        str(file),
+                        use_cache=self._use_cache,
+                        optimize=self._optimize,
+                    ),
+                )
+        return None
+
+
+##############################
+# INSTALL
+##############################
+
+
+def install(
+    *,
+    use_cache: bool = True,
+    optimize: int = DEFAULT_LEVEL,
+) -> QuartzFinder:
+    """*Let `import` find Quartz modules*.
+
+    Installing again replaces the previous finder.
+
+    Args:
+        use_cache (bool): *Read and write `__qrtzcache__` entries*
+        optimize (int): *Optimization level*
+
+    Returns:
+        QuartzFinder: *The installed finder*
+
+    """
+    uninstall()
+    finder: QuartzFinder = QuartzFinder(
+        use_cache=use_cache,
+        optimize=optimize,
+    )
+    sys.meta_path.append(finder)
+    return finder
+
+
+def uninstall() -> None:
+    """*Remove every installed `QuartzFinder`*."""
+    sys.meta_path[:] = [
+        finder
+        for finder in sys.meta_path
+        if not isinstance(finder, QuartzFinder)
+    ]
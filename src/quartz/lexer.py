@@ -4,12 +4,15 @@
 # IMPORTS
 ##############################
 
-from typing import TYPE_CHECKING, NoReturn
+import re
+from collections.abc import Iterator
+from itertools import islice
+from typing import TYPE_CHECKING, Literal, NoReturn
 
-from .tokendef import Error, Tag, Token
+from .tokendef import TAG_IDS, TAGS, Error, Source, Tag, Token, TokenStore
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterator
+    from collections.abc import Callable
 
 ##############################
 # SET CONSTANTS
@@ -36,6 +39,8 @@ DIGITS: set[str] = {
 KEYWORDS: set[str] = {
     "and",
     "as",
+    "async",
+    "await",
     "break",
     "case",
     "class",
@@ -56,11 +61,14 @@ KEYWORDS: set[str] = {
     "or",
     "raise",
     "True",
+    "unless",
     "until",
     "while",
     "yield",
 }
 
+KEYWORD_TAGS: dict[str, Tag] = {keyword: Tag(keyword) for keyword in KEYWORDS}
+
 OPEN_BRACKETS: set[str] = {
     "(",
     "[",
@@ -73,6 +81,140 @@ CLOSED_BRACKETS: set[str] = {
     "}",
 }
 
+# How many tokens a lazy lexer holds before handing them out.
+TOKEN_BUFFER_SIZE: int = 256
+
+##############################
+# SCANNING TABLES
+##############################
+
+# Every punctuation `Tag` except the period family,
+# which has its own (stateful) scanning rules.
+OPERATORS: dict[str, Tag] = {
+    tag.value: tag
+    for tag in Tag
+    if not tag.value.startswith(".")
+    and not any(char.isalnum() or char.isspace() for char in tag.value)
+}
+
+# Operators that are a proper prefix of a longer operator.
+# The character-by-character engine only emits these
+# after looking one character past them,
+# so their tokens are positioned one column later.
+LOOKAHEAD_OPERATORS: set[str] = {
+    op
+    for op in OPERATORS
+    if any(other != op and other.startswith(op) for other in OPERATORS)
+}
+
+# `op -> (kind, column offset from the end of op, bracket depth change)`,
+# where the kind is `TAG_IDS[tag]`, so scanning never hashes a `Tag`.
+OPERATOR_TABLE: dict[str, tuple[int, int, int]] = {
+    op: (
+        TAG_IDS[tag],
+        0 if op in LOOKAHEAD_OPERATORS else -1,
+        (op[-1] in OPEN_BRACKETS) - (op in CLOSED_BRACKETS),
+    )
+    for op, tag in OPERATORS.items()
+}
+
+# Keywords whose tokens carry no text and are positioned at their end.
+BARE_KEYWORDS: set[Tag] = {
+    Tag.AND,
+    Tag.FALSE,
+    Tag.IN,
+    Tag.IS,
+    Tag.IS_NOT,
+    Tag.NONE,
+    Tag.NOT,
+    Tag.NOT_IN,
+    Tag.OR,
+    Tag.TRUE,
+}
+
+
+def _extent(tag: Tag) -> tuple[int, int]:
+    if tag is Tag.STRING:
+        return (-1, 1)
+    if tag is Tag.ELLIPSIS:
+        return (-2, 1)
+    if (
+        tag in BARE_KEYWORDS
+        or tag is Tag.PERIOD
+        or tag.value in LOOKAHEAD_OPERATORS
+    ):
+        return (-len(tag.value), 0)
+    if tag.value in OPERATORS:
+        return (1 - len(tag.value), 1)
+    return (0, 0)
+
+
+# Kinds of the tags the regex engine scans most.
+IDENT_KIND: int = TAG_IDS[Tag.IDENT]
+INTEGER_KIND: int = TAG_IDS[Tag.INTEGER]
+FLOAT_KIND: int = TAG_IDS[Tag.FLOAT]
+STRING_KIND: int = TAG_IDS[Tag.STRING]
+NEWLINE_KIND: int = TAG_IDS[Tag.NEWLINE]
+
+# `kind -> (start, end)` corrections from a token's `start` and `end`
+# to the full text it was scanned from, quotes and symbols included.
+EXTENT_TABLE: list[tuple[int, int]] = [_extent(tag) for tag in TAGS]
+
+# Order matters: earlier groups win.
+# Leading whitespace (other than newlines) is skipped by every match.
+TOKEN_PATTERN: re.Pattern[str] = re.compile(
+    r"[^\S\n]*(?:"
+    + "|".join(
+        f"(?P<{name}>{pattern})"
+        for name, pattern in (
+            ("NEWLINE", r"\n"),
+            ("IDENT", r"[^\W\d]\w*\??"),
+            ("NUMBER", r"[0-9]+(?:\.[0-9]*)?"),
+            ("L_ANGLE_MINUS", r"<-(?!>)"),
+            (
+                "OPERATOR",
+                "|".join(
+                    re.escape(op)
+                    for op in sorted(OPERATORS, key=len, reverse=True)
+                ),
+            ),
+            ("STRING", r"\"[^\"]*\"|'[^']*'"),
+            ("PERIOD", r"\."),
+            ("COMMENT", r"#[^\n]*"),
+            ("BACKSLASH", r"\\\n?"),
+            ("QUOTE", r"[\"']"),
+            ("BANG", r"!"),
+            ("DOLLAR", r"\$"),
+            ("UNKNOWN", r"."),
+        )
+    )
+    + ")",
+)
+
+##############################
+# ERROR MESSAGES
+##############################
+
+INDENT_MESSAGE: str = """\
+    Inconsistent indentation.
+    Each indent level must be:
+    - FOUR characters long
+    - SPACES, not tabs"""
+
+ELLIPSIS_MESSAGE: str = """\
+    `..` is not a valid token.
+    Did you mean `.` or `...`?"""
+
+L_ANGLE_MINUS_MESSAGE: str = """Did you mean `<->`?"""
+
+BANG_MESSAGE: str = """Did you mean `!=` or `not`?"""
+
+DOLLAR_MESSAGE: str = """\
+    `$` is not an identifiable token.
+    Did you mean `${` for a set?"""
+
+QUOTE_MESSAGE: str = """Unterminated string."""
+
 ##############################
 # ERROR DEFINITION
 ##############################
@@ -90,29 +232,39 @@ class _LexerError(Error):
 class Lexer:
     """*The Quartz Lexer*."""
 
-    def __init__(self, program: str) -> None:
+    def __init__(
+        self,
+        program: str,
+        engine: Literal["char", "regex"] = "regex",
+        *,
+        lazy: bool = False,
+    ) -> None:
         """*Lex a Quartz program*.
 
+        Both engines produce the same tokens.
+        `"regex"` matches whole tokens at once with `TOKEN_PATTERN`;
+        `"char"` steps through the program one character at a time.
+
+        A lazy lexer does no work up front:
+        tokens are produced as `iter_tokens` is consumed.
+
         Args:
             program (str): *File input*
+            engine (str): *Scanning engine, `"regex"` or `"char"`*
+            lazy (bool): *Lex on demand instead of all at once*
+
+        Raises:
+            ValueError: *Unknown engine*
 
         """
         self._i: int = 0
-        self._tokens: list[Token] = []
         self._is_eof: bool = False
         self._indent_stack: list[int] = [0]
         self._in_parens: int = 0
-        self._line_start: int = 0
-        self._line: int = 1
-        self._column: int = 1
 
         self._program: str = program + "\n"
-        self._program_lines: Iterator[str] = iter(
-            self._program.replace(" ", "·").splitlines(),
-        )
-        self._program_line: str = next(
-            self._program_lines,
-        )
+        self._source: Source = Source(self._program)
+        self._tokens: TokenStore = TokenStore(self._source)
         self._length: int = len(self._program)
         self._char: str = self._program[0] if self._length > 0 else ""
 
@@ -141,25 +293,27 @@ class Lexer:
         }
         self._symbols: set[str] = set(self._match_symbols.keys())
 
-        if self._length == 0:
-            self._eof()
-            return
-        while self._check("\n"):
-            self._next_eof()
-        while not self._is_eof:
-            self._match_char()
+        if engine not in {"char", "regex"}:
+            msg: str = f"Unknown lexer engine: {engine!r}"
+            raise ValueError(msg)
+        self._lazy: bool = lazy
+        self._stream: Iterator[Token] = (
+            self._scan() if engine == "regex" else self._match_chars()
+        )
+        if not lazy:
+            # Nothing is handed out, so every token stays in `self._tokens`.
+            for _ in self._stream:
+                pass
 
     ##########################
     # Helper Functions
     ##########################
 
     def _raise_error(self, message: str) -> NoReturn:
-        raise _LexerError(
-            self._line,
-            self._column,
-            self._program_line,
-            message,
-        )
+        raise _LexerError(self._source, self._i, message)
+
+    def _raise_error_at(self, i: int, message: str) -> NoReturn:
+        raise _LexerError(self._source, i, message)
 
     def _check(self, char: str) -> bool:
         return self._char == char
@@ -169,29 +323,16 @@ class Lexer:
 
     def _next(self) -> None:
         self._i += 1
-        self._column += 1
-        if self._check("\n"):
-            if self._i != self._length:
-                self._program_line: str = next(
-                    self._program_lines,
-                )
-            self._line += 1
-            self._column = 1
         if self._i != self._length:
             self._char: str = self._program[self._i]
         else:
             self._is_eof = True
 
     def _token(self, tag: Tag, tok: str = "") -> None:
-        self._tokens.append(
-            Token(
-                tag,
-                tok,
-                self._line,
-                self._column,
-                self._program_line,
-            ),
-        )
+        self._tokens.append(tag, self._i - len(tok), self._i)
+
+    def _token_at(self, i: int, tag: Tag, tok: str = "") -> None:
+        self._tokens.append(tag, i - len(tok), i)
 
     def _eof(self) -> None:
         while self._indent_stack != [0]:
@@ -206,23 +347,175 @@ class Lexer:
             return True
         return False
 
+    def _flush(self) -> list[Token]:
+        # The last token stays behind,
+        # as `not`, `in` and newlines look back at it.
+        flushed: list[Token] = list(
+            islice(self._tokens, len(self._tokens) - 1),
+        )
+        del self._tokens[:-1]
+        return flushed
+
     ##########################
     # Main Getter Method
     ##########################
 
-    def get_tokens(self) -> list[Token]:
+    def get_tokens(self) -> TokenStore:
         """*Return the output of the lexer*.
 
         Returns:
-            list[Token]: *Lexer output*
+            TokenStore: *Lexer output*
 
         """
         return self._tokens
 
+    def iter_tokens(self) -> Iterator[Token]:
+        """*Iterate over the output of the lexer*.
+
+        A lazy lexer only lexes as far as the iterator has been consumed,
+        so it can only be iterated over once.
+
+        Returns:
+            Iterator[Token]: *Lexer output*
+
+        """
+        if self._lazy:
+            return self._stream
+        return iter(self._tokens)
+
+    ##########################
+    # Regex Engine
+    ##########################
+
+    def _scan(self) -> Iterator[Token]:  # noqa: C901, PLR0912, PLR0915
+        program: str = self._program
+        length: int = self._length
+        lazy: bool = self._lazy
+        match: Callable[[str, int], re.Match[str] | None] = TOKEN_PATTERN.match
+        # Tokens go straight into the store's columns by kind,
+        # as per-token calls and `Tag` hashes would dominate the time here.
+        kinds, starts, ends = self._tokens.appenders()
+        found: re.Match[str] | None
+        i: int = 0
+        while i < length and program[i] == "\n":
+            i += 1
+        while i < length:
+            # `UNKNOWN` matches anything `NEWLINE` does not.
+            found = match(program, i)
+            assert found is not None  # noqa: S101
+            kind: str | None = found.lastgroup
+            end: int = found.end()
+            if kind == "IDENT":
+                ident: str = found[kind]
+                if not (ident[0].isalpha() or ident[0] == "_"):
+                    i = end - len(ident) + 1
+                    continue
+                if ident in KEYWORDS:
+                    self._i = end
+                    self._keyword(ident)
+                else:
+                    kinds(IDENT_KIND)
+                    starts(end - len(ident))
+                    ends(end)
+            elif kind == "OPERATOR":
+                tag_kind, offset, depth = OPERATOR_TABLE[found[kind]]
+                self._in_parens += depth
+                kinds(tag_kind)
+                starts(end + offset)
+                ends(end + offset)
+            elif kind == "NEWLINE":
+                end = self._scan_newline(end - 1)
+            elif kind == "NUMBER":
+                number: str = found[kind]
+                kinds(FLOAT_KIND if "." in number else INTEGER_KIND)
+                starts(end - len(number))
+                ends(end)
+            elif kind == "STRING":
+                # Positioned before the closing quote, holding the text inside.
+                kinds(STRING_KIND)
+                starts(found.start(kind) + 1)
+                ends(end - 1)
+            elif kind == "PERIOD":
+                end = self._scan_period(end - 1)
+            elif kind == "COMMENT":
+                end = self._scan_indent(end + 1)
+            elif kind == "QUOTE":
+                self._raise_error_at(length, QUOTE_MESSAGE)
+            elif kind == "BANG":
+                self._raise_error_at(end, BANG_MESSAGE)
+            elif kind == "DOLLAR":
+                self._raise_error_at(end, DOLLAR_MESSAGE)
+            elif kind == "L_ANGLE_MINUS":
+                self._raise_error_at(end, L_ANGLE_MINUS_MESSAGE)
+            i = end
+            if lazy and len(self._tokens) > TOKEN_BUFFER_SIZE:
+                yield from self._flush()
+        self._i = length
+        self._eof()
+        if lazy:
+            yield from self._tokens
+
+    def _scan_newline(self, i: int) -> int:
+        if self._in_parens:
+            return i + 1
+        if self._tokens and self._tokens.kind(-1) != NEWLINE_KIND:
+            self._token_at(i, Tag.NEWLINE)
+        i += 1
+        if i < self._length and self._program[i] != "\n":
+            return self._scan_indent(i)
+        return i
+
+    def _scan_indent(self, i: int) -> int:
+        start: int = i
+        while i < self._length and self._program[i] == " ":
+            i += 1
+        spaces: int = i - start
+        if spaces % 4 != 0:
+            self._raise_error_at(i, INDENT_MESSAGE)
+        indents: int = spaces // 4
+        if indents > self._indent_stack[-1]:
+            self._indent_stack.append(indents)
+            self._token_at(i, Tag.INDENT)
+        while indents < self._indent_stack[-1]:
+            del self._indent_stack[-1]
+            self._token_at(i, Tag.DEDENT)
+        if indents != self._indent_stack[-1]:
+            self._raise_error_at(i, INDENT_MESSAGE)
+        return i
+
+    def _scan_period(self, i: int) -> int:
+        program: str = self._program
+        i += 1
+        if program[i] in DIGITS:
+            start: int = i - 1
+            while program[i] in DIGITS:
+                i += 1
+            self._token_at(i, Tag.FLOAT, program[start:i])
+        if program[i] != ".":
+            self._token_at(i, Tag.PERIOD)
+            return i
+        i += 1
+        if program[i] != ".":
+            self._raise_error_at(i, ELLIPSIS_MESSAGE)
+        self._token_at(i, Tag.ELLIPSIS)
+        return i
+
     ##########################
     # Match Functions
     ##########################
 
+    def _match_chars(self) -> Iterator[Token]:
+        if self._length == 0:
+            self._eof()
+        while self._check("\n") and not self._is_eof:
+            self._next_eof()
+        while not self._is_eof:
+            self._match_char()
+            if self._lazy and len(self._tokens) > TOKEN_BUFFER_SIZE:
+                yield from self._flush()
+        if self._lazy:
+            yield from self._tokens
+
     def _match_char(self) -> None:
         if self._check("\n"):
             self._newline()
@@ -301,13 +594,7 @@ class Lexer:
             spaces += 1
             self._next()
         if spaces % 4 != 0:
-            self._raise_error(
-                """\
-                Inconsistent indentation.
-                Each indent level must be:
-                - FOUR characters long
-                - SPACES, not tabs""",
-            )
+            self._raise_error(INDENT_MESSAGE)
         indents: int = int(spaces / 4)
         if indents > self._indent_stack[-1]:
             self._indent_stack.append(indents)
@@ -317,13 +604,7 @@ class Lexer:
                 del self._indent_stack[-1]
                 self._token(Tag.DEDENT)
             if indents != self._indent_stack[-1]:
-                self._raise_error(
-                    """\
-                    Inconsistent indentation.
-                    Each indent level must be:
-                    - FOUR characters long
-                    - SPACES, not tabs""",
-                )
+                self._raise_error(INDENT_MESSAGE)
         if self._is_eof:
             self._eof()
 
@@ -384,7 +665,7 @@ class Lexer:
             case "None":
                 self._token(Tag.NONE)
             case _:
-                self._token(Tag.KEYWORD, ident)
+                self._token(KEYWORD_TAGS[ident], ident)
 
     def _integer(self) -> None:
         start: int = self._i
@@ -420,11 +701,7 @@ class Lexer:
         if self._next_eof():
             return
         if not self._check("."):
-            self._raise_error(
-                """\
-                `..` is not a valid token.
-                Did you mean `.` or `...`?""",
-            )
+            self._raise_error(ELLIPSIS_MESSAGE)
         self._token(Tag.ELLIPSIS)
 
     def _period_int(self) -> None:
@@ -547,9 +824,7 @@ class Lexer:
         if self._next_eof():
             return
         if not self._check_next(">", Tag.L_ANGLE_MINUS_R_ANGLE):
-            self._raise_error(
-                """Did you mean `<->`?""",
-            )
+            self._raise_error(L_ANGLE_MINUS_MESSAGE)
 
     def _r_angle(self) -> None:
         if self._next_eof():
@@ -599,9 +874,7 @@ class Lexer:
         if self._next_eof():
             return
         if not self._check_next("=", Tag.BANG_EQUAL):
-            self._raise_error(
-                """Did you mean `!=` or `not`?""",
-            )
+            self._raise_error(BANG_MESSAGE)
 
     def _dollar(self) -> None:
         if self._next_eof():
@@ -609,8 +882,4 @@ class Lexer:
         if self._check_next("{", Tag.DOLLAR_L_BRACE):
             self._in_parens += 1
             return
-        self._raise_error(
-            """\
-            `$` is not an identifiable token.
-            Did you mean `${` for a set?""",
-        )
+        self._raise_error(DOLLAR_MESSAGE)
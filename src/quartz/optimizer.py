@@ -0,0 +1,610 @@
+"""*The AST optimizer for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import operator
+from collections.abc import Callable, Iterator
+from dataclasses import fields, is_dataclass, replace
+from functools import cache
+from typing import Any
+
+import quartz.ast as q
+
+from .tokendef import Tag
+
+##############################
+# SET CONSTANTS
+##############################
+
+# 0: no optimization.
+# 1: constant folding and peephole rewrites.
+# 2: also turns self-recursive `fn`s into loops.
+DEFAULT_LEVEL: int = 1
+TAIL_CALL_LEVEL: int = 2
+MAX_LEVEL: int = 2
+
+# Folded constants larger than these are left to run at runtime,
+# like CPython's own folding limits.
+MAX_INT_BITS: int = 128
+MAX_STR_SIZE: int = 4096
+MAX_COLLECTION_SIZE: int = 256
+
+BINARY_FOLDS: dict[Tag, Callable[[Any, Any], Any]] = {
+    Tag.AMPERSAND: operator.and_,
+    Tag.ASTERISK: operator.mul,
+    Tag.CARET: operator.pow,
+    Tag.L_ANGLE_L_ANGLE: operator.lshift,
+    Tag.MINUS: operator.sub,
+    Tag.PERCENT: operator.mod,
+    Tag.PIPE: operator.or_,
+    Tag.PLUS: operator.add,
+    Tag.R_ANGLE_R_ANGLE: operator.rshift,
+    Tag.SLASH: operator.truediv,
+    Tag.SLASH_SLASH: operator.floordiv,
+    Tag.TILDE: operator.xor,
+}
+
+UNARY_FOLDS: dict[Tag, Callable[[Any], Any]] = {
+    Tag.MINUS: operator.neg,
+    Tag.NOT: operator.not_,
+    Tag.PLUS: operator.pos,
+    Tag.TILDE: operator.invert,
+}
+
+# `is` is left alone: the identity of constants is not guaranteed.
+COMPARE_FOLDS: dict[Tag, Callable[[Any, Any], Any]] = {
+    Tag.BANG_EQUAL: operator.ne,
+    Tag.EQUAL_EQUAL: operator.eq,
+    Tag.IN: lambda left, right: left in right,
+    Tag.L_ANGLE: operator.lt,
+    Tag.L_ANGLE_EQUAL: operator.le,
+    Tag.NOT_IN: lambda left, right: left not in right,
+    Tag.R_ANGLE: operator.gt,
+    Tag.R_ANGLE_EQUAL: operator.ge,
+}
+
+MEMBERSHIP_OPS: set[Tag] = {Tag.IN, Tag.NOT_IN}
+
+PENDING: str = "__quartz_pending"
+RESULT: str = "__quartz_result"
+# These capture variables, which rebinding parameters in a loop would change.
+CLOSURES: tuple[type, ...] = (
+    q.FunctionDefinition,
+    q.GeneratorExp,
+    q.Lambda,
+    q.Parallel,
+    q.Stream,
+)
+# Any of these in a `fn` makes it a generator.
+YIELDS: tuple[type, ...] = (q.Yield, q.YieldFrom)
+# Operands that may be evaluated before, not after, a recursive call.
+PURE: tuple[type, ...] = (q.BinaryOp, q.Constant, q.Ident, q.UnaryOp)
+
+##############################
+# HELPER FUNCTIONS
+##############################
+
+
+def _is_constant(node: object) -> bool:
+    return type(node) is q.Constant
+
+
+def _fits(value: object) -> bool:
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, int):
+        return value.bit_length() <= MAX_INT_BITS
+    if isinstance(value, str | bytes):
+        return len(value) <= MAX_STR_SIZE
+    return True
+
+
+@cache
+def _children(cls: type) -> tuple[str, ...]:
+    # The fields that can hold nodes, so not the source positions.
+    return tuple(
+        field.name
+        for field in fields(cls)
+        if field.name not in {"start", "end", "source"}
+    )
+
+
+def _walk(node: object) -> Iterator[object]:
+    # On a work stack, since nesting `yield from` would recurse.
+    stack: list[object] = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        for name in _children(type(node)):
+            value: object = getattr(node, name)
+            if isinstance(value, list):
+                stack.extend(child for child in value if is_dataclass(child))
+            elif is_dataclass(value):
+                stack.append(value)
+
+
+def _yields(nodes: list[Any]) -> bool:
+    # Dead code still makes a `fn` a generator, so it is kept
+    # if it is the only place it yields (`if False` then `yield`).
+    return any(
+        isinstance(child, YIELDS) for node in nodes for child in _walk(node)
+    )
+
+
+def _too_big(op: Tag, left: object, right: object) -> bool:
+    # Catches huge results before they are computed,
+    # from operands that are themselves already folded.
+    if op == Tag.PERCENT and isinstance(left, str | bytes):
+        # Formatting can pad to any width, like `"%0100000000d" % 1`.
+        return True
+    if op == Tag.ASTERISK and isinstance(right, str | bytes):
+        # `n * "ab"` repeats like `"ab" * n`.
+        left, right = right, left
+    if not isinstance(right, int) or isinstance(right, bool):
+        return False
+    if op == Tag.CARET and isinstance(left, int):
+        return right > 0 and left.bit_length() * right > MAX_INT_BITS
+    if op == Tag.L_ANGLE_L_ANGLE and isinstance(left, int):
+        return left.bit_length() + right > MAX_INT_BITS
+    if op == Tag.ASTERISK and isinstance(left, str | bytes):
+        return len(left) * right > MAX_STR_SIZE
+    return False
+
+
+##############################
+# MAIN CLASS
+##############################
+
+
+class Optimizer:
+    """The Quartz AST Optimizer."""
+
+    def __init__(
+        self,
+        program: q.Program,
+        level: int = DEFAULT_LEVEL,
+    ) -> None:
+        """*Rewrites a Quartz `Program` before it is compiled*.
+
+        Args:
+            program (q.Program): *A Quartz `Program`*
+            level (int): *Optimization level, from 0 (none) to `MAX_LEVEL`*
+
+        """
+        self._level: int = level
+        self._folds: dict[Any, Callable[[Any], Any]] = {
+            q.BinaryOp: self._binary_op,
+            q.BoolOp: self._bool_op,
+            q.Comparison: self._comparison,
+            q.If: self._if,
+            q.TernaryOp: self._ternary_op,
+            q.UnaryOp: self._unary_op,
+            q.While: self._while,
+        }
+        if level >= TAIL_CALL_LEVEL:
+            self._folds[q.FunctionDefinition] = self._function_definition
+        self._program: q.Program = (
+            self._node(program) if level > 0 else program
+        )
+
+    ##########################
+    # Main Getter Function
+    ##########################
+
+    def get_program(self) -> q.Program:
+        """*Return the output of the optimizer*.
+
+        Returns:
+            q.Program: *Optimized program*
+
+        """
+        return self._program
+
+    ##########################
+    # Traversal
+    ##########################
+
+    def _node(self, node: Any) -> Any:  # noqa: ANN401
+        # Children first, so folds see already-folded operands.
+        changes: dict[str, Any] = {}
+        for name in _children(type(node)):
+            value: Any = getattr(node, name)
+            new: Any = self._value(value)
+            if new is not value:
+                changes[name] = new
+        if changes:
+            node = replace(node, **changes)
+        fold: Callable[[Any], Any] | None = self._folds.get(type(node))
+        if fold is None:
+            return node
+        new: Any = fold(node)
+        # A folded node stands where the original was written.
+        if isinstance(new, q.Node) and new.start < 0 <= node.start:
+            return replace(new, start=node.start, end=node.end)
+        return new
+
+    def _value(self, value: Any) -> Any:  # noqa: ANN401
+        if isinstance(value, list):
+            if value and isinstance(value[0], q.Stmt):
+                return self._body(value)
+            new: list[Any] = [self._value(item) for item in value]
+            unchanged: bool = all(map(operator.is_, new, value))
+            return value if unchanged else new
+        if is_dataclass(value):
+            return self._node(value)
+        return value
+
+    def _body(self, stmts: list[q.Stmt]) -> list[q.Stmt]:
+        # Statement folds may return several statements, or none.
+        body: list[q.Stmt] = []
+        for stmt in stmts:
+            new: q.Stmt | list[q.Stmt] = self._node(stmt)
+            if isinstance(new, list):
+                body.extend(new)
+            else:
+                body.append(new)
+        # A block cannot be empty; this compiles to nothing.
+        return body or [q.ExprStmt(q.Constant(None))]
+
+    ##########################
+    # Expressions
+    ##########################
+
+    def _binary_op(self, node: q.BinaryOp) -> q.Expr:
+        if not (_is_constant(node.left) and _is_constant(node.right)):
+            return node
+        left: Any = node.left.value
+        right: Any = node.right.value
+        if _too_big(node.op, left, right):
+            return node
+        try:
+            value: Any = BINARY_FOLDS[node.op](left, right)
+        except (ArithmeticError, TypeError, ValueError):
+            # Left for runtime, so the error is raised where it belongs.
+            return node
+        return q.Constant(value) if _fits(value) else node
+
+    def _unary_op(self, node: q.UnaryOp) -> q.Expr:
+        if not _is_constant(node.operand):
+            return node
+        try:
+            return q.Constant(UNARY_FOLDS[node.op](node.operand.value))
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+
+    def _bool_op(self, node: q.BoolOp) -> q.Expr:
+        # `and` stops at the first falsy value, `or` at the first truthy.
+        stop_on: bool = node.op == Tag.OR
+        values: list[q.Expr] = []
+        for value in node.values[:-1]:
+            if not _is_constant(value):
+                values.append(value)
+            elif bool(value.value) == stop_on:
+                values.append(value)
+                break
+        else:
+            values.append(node.values[-1])
+        if (
+            len(values) < len(node.values)
+            and _yields(node.values)
+            and not _yields(values)
+        ):
+            return node
+        if len(values) == 1:
+            return values[0]
+        return q.BoolOp(node.op, values)
+
+    def _comparison(self, node: q.Comparison) -> q.Expr:
+        comparators: list[q.Expr] = [
+            self._frozen(comparator) if op in MEMBERSHIP_OPS else comparator
+            for op, comparator in zip(node.ops, node.comparators, strict=True)
+        ]
+        node = q.Comparison(node.left, node.ops, comparators)
+        operands: list[q.Expr] = [node.left, *comparators]
+        if not all(map(_is_constant, operands)) or not all(
+            op in COMPARE_FOLDS for op in node.ops
+        ):
+            return node
+        try:
+            return q.Constant(
+                all(
+                    COMPARE_FOLDS[op](left.value, right.value)
+                    for op, left, right in zip(
+                        node.ops,
+                        operands,
+                        operands[1:],
+                        strict=False,
+                    )
+                ),
+            )
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+
+    def _frozen(self, node: q.Expr) -> q.Expr:
+        # `x in [1, 2]` tests against a tuple, `x in ${1, 2}` a frozenset,
+        # built once at compile time instead of on every evaluation.
+        if not isinstance(node, q.List | q.Set) or not all(
+            map(_is_constant, node.elements),
+        ):
+            return node
+        if len(node.elements) > MAX_COLLECTION_SIZE:
+            return node
+        values: list[Any] = [element.value for element in node.elements]
+        if isinstance(node, q.List):
+            return q.Constant(tuple(values))
+        return q.Constant(frozenset(values))
+
+    def _ternary_op(self, node: q.TernaryOp) -> q.Expr:
+        if not _is_constant(node.test):
+            return node
+        kept, dropped = (
+            (node.body, node.orelse)
+            if node.test.value
+            else (node.orelse, node.body)
+        )
+        return node if _yields([dropped]) else kept
+
+    ##########################
+    # Statements
+    ##########################
+
+    def _function_definition(
+        self,
+        node: q.FunctionDefinition,
+    ) -> q.FunctionDefinition:
+        return _TailCalls(node).rewrite()
+
+    def _if(self, node: q.If) -> q.Stmt | list[q.Stmt]:
+        if not _is_constant(node.test):
+            return node
+        kept, dropped = (
+            (node.body, node.orelse)
+            if node.test.value
+            else (node.orelse, node.body)
+        )
+        return node if _yields(dropped) else kept
+
+    def _while(self, node: q.While) -> q.Stmt | list[q.Stmt]:
+        if not _is_constant(node.test) or node.test.value:
+            return node
+        return node if _yields(node.body) else node.orelse
+
+
+##############################
+# TAIL CALLS
+##############################
+
+
+class _TailCalls:
+    """*Rewrites one self-recursive `fn` into a loop*.
+
+    `f(...) <<<` rebinds the parameters and restarts the loop.
+    `f(...) op x <<<` and `x op f(...) <<<`, with a pure `x`,
+    also push `x` onto a pending list;
+    every other return then applies the pending operands
+    in the same order the recursion would have,
+    so `op` does not need to be associative.
+
+    A `fn` with any decorator is left recursive,
+    so `@no_tail_calls` from `quartz.runtime` opts one out.
+    """
+
+    def __init__(self, fn: q.FunctionDefinition) -> None:
+        self._fn: q.FunctionDefinition = fn
+        self._params: list[str] = [arg.arg for arg in fn.args.args]
+        defaults: list[q.Expr] = fn.args.defaults
+        # Only constant defaults may be re-used for a left-out argument.
+        self._defaults: dict[str, q.Expr] = {
+            param: default
+            for param, default in zip(
+                self._params[len(self._params) - len(defaults) :],
+                defaults,
+                strict=True,
+            )
+            if _is_constant(default)
+        }
+        # The operator, and whether the call is its left operand.
+        self._linear: tuple[Tag, bool] | None = None
+        self._rewrites: int = 0
+
+    def rewrite(self) -> q.FunctionDefinition:
+        fn: q.FunctionDefinition = self._fn
+        if not self._eligible():
+            return fn
+        self._linear = self._find_linear(fn.body)
+        body: list[q.Stmt] = self._block([*fn.body, q.Return()], in_loop=False)
+        if not self._rewrites:
+            return fn
+        loop: q.While = q.While(q.Constant(value=True), body, [])
+        if self._linear is None:
+            return replace(fn, body=[loop])
+        pending: q.Assign = q.Assign([q.Ident(PENDING)], q.List([]))
+        return replace(fn, body=[pending, loop])
+
+    def _eligible(self) -> bool:
+        fn: q.FunctionDefinition = self._fn
+        # A decorator rebinds the name, so each call must go through it.
+        if fn.decorators:
+            return False
+        args: q.Arguments = fn.args
+        if args.posonlyargs or args.kwonlyargs or args.vararg or args.kwarg:
+            return False
+        name: q.Ident = q.Ident(fn.name)
+        for stmt in fn.body:
+            for node in _walk(stmt):
+                # A generator's `return` ends it, and is no call to loop.
+                if isinstance(node, (*CLOSURES, *YIELDS)):
+                    return False
+                # Rebinding its own name would make the calls go elsewhere.
+                targets: list[q.Expr] = (
+                    node.targets
+                    if isinstance(node, q.Assign | q.Delete)
+                    else [node.target]
+                    if isinstance(node, q.For | q.NamedExpr)
+                    else []
+                )
+                if any(name in _walk(target) for target in targets):
+                    return False
+        return True
+
+    def _call_args(self, expr: q.Expr) -> list[q.Expr] | None:
+        # New parameter values if `expr` is a call to this function.
+        if not (
+            isinstance(expr, q.Call) and expr.func == q.Ident(self._fn.name)
+        ):
+            return None
+        if len(expr.args) > len(self._params):
+            return None
+        values: dict[str, q.Expr] = dict(
+            zip(self._params, expr.args, strict=False),
+        )
+        for keyword in expr.keywords:
+            if keyword.arg not in self._params or keyword.arg in values:
+                return None
+            values[keyword.arg] = keyword.value
+        for param in self._params:
+            if param not in values:
+                if param not in self._defaults:
+                    return None
+                values[param] = self._defaults[param]
+        return [values[param] for param in self._params]
+
+    def _split_linear(
+        self,
+        expr: q.Expr,
+    ) -> tuple[Tag, bool, list[q.Expr], q.Expr] | None:
+        # `(op, call on left, new parameters, operand)` for `f(...) op x`.
+        if not isinstance(expr, q.BinaryOp):
+            return None
+        for call_on_left, call, operand in (
+            (True, expr.left, expr.right),
+            (False, expr.right, expr.left),
+        ):
+            args: list[q.Expr] | None = self._call_args(call)
+            if args is not None and all(
+                isinstance(node, PURE) for node in _walk(operand)
+            ):
+                return (expr.op, call_on_left, args, operand)
+        return None
+
+    def _find_linear(self, stmts: list[q.Stmt]) -> tuple[Tag, bool] | None:
+        for stmt in stmts:
+            if isinstance(stmt, q.If):
+                found: tuple[Tag, bool] | None = self._find_linear(
+                    [*stmt.body, *stmt.orelse],
+                )
+                if found is not None:
+                    return found
+            elif isinstance(stmt, q.Return) and stmt.value is not None:
+                values: list[q.Expr] = (
+                    [stmt.value.body, stmt.value.orelse]
+                    if isinstance(stmt.value, q.TernaryOp)
+                    else [stmt.value]
+                )
+                for value in values:
+                    linear: tuple[Tag, bool, list[q.Expr], q.Expr] | None = (
+                        self._split_linear(value)
+                    )
+                    if linear is not None:
+                        return linear[:2]
+        return None
+
+    def _block(self, stmts: list[q.Stmt], *, in_loop: bool) -> list[q.Stmt]:
+        block: list[q.Stmt] = []
+        for stmt in stmts:
+            if isinstance(stmt, q.Return):
+                block.extend(self._return(stmt, in_loop=in_loop))
+                # Anything after it, like the implicit return, is dead.
+                break
+            if isinstance(stmt, q.If):
+                block.append(
+                    q.If(
+                        stmt.test,
+                        self._block(stmt.body, in_loop=in_loop),
+                        self._block(stmt.orelse, in_loop=in_loop),
+                    ),
+                )
+            elif isinstance(stmt, q.For | q.While):
+                # `continue` in an inner loop would restart that loop.
+                block.append(
+                    replace(
+                        stmt,
+                        body=self._block(stmt.body, in_loop=True),
+                        orelse=self._block(stmt.orelse, in_loop=True),
+                    ),
+                )
+            else:
+                block.append(stmt)
+        return block
+
+    def _return(self, stmt: q.Return, *, in_loop: bool) -> list[q.Stmt]:
+        value: q.Expr | None = stmt.value
+        if in_loop or value is None:
+            return self._base(stmt)
+        if isinstance(value, q.TernaryOp):
+            body: list[q.Stmt] = self._return(
+                q.Return(value.body),
+                in_loop=False,
+            )
+            orelse: list[q.Stmt] = self._return(
+                q.Return(value.orelse),
+                in_loop=False,
+            )
+            return [q.If(value.test, body, orelse)]
+        args: list[q.Expr] | None = self._call_args(value)
+        if args is not None:
+            self._rewrites += 1
+            return [*self._rebind(args), q.Continue()]
+        linear: tuple[Tag, bool, list[q.Expr], q.Expr] | None = (
+            self._split_linear(value)
+        )
+        if linear is not None and linear[:2] == self._linear:
+            self._rewrites += 1
+            push: q.ExprStmt = q.ExprStmt(
+                q.Call(q.Attribute(q.Ident(PENDING), "append"), [linear[3]]),
+            )
+            return [push, *self._rebind(linear[2]), q.Continue()]
+        return self._base(stmt)
+
+    def _rebind(self, args: list[q.Expr]) -> list[q.Assign]:
+        changed: list[tuple[str, q.Expr]] = [
+            (param, arg)
+            for param, arg in zip(self._params, args, strict=True)
+            if arg != q.Ident(param)
+        ]
+        if not changed:
+            return []
+        if len(changed) == 1:
+            return [q.Assign([q.Ident(changed[0][0])], changed[0][1])]
+        # All at once, since new values may read the old parameters.
+        return [
+            q.Assign(
+                [q.Tuple([q.Ident(param) for param, _ in changed])],
+                q.Tuple([arg for _, arg in changed]),
+            ),
+        ]
+
+    def _base(self, stmt: q.Return) -> list[q.Stmt]:
+        if self._linear is None:
+            return [stmt]
+        op, call_on_left = self._linear
+        result: q.Ident = q.Ident(RESULT)
+        pop: q.Call = q.Call(q.Attribute(q.Ident(PENDING), "pop"))
+        return [
+            q.Assign([result], stmt.value or q.Constant(None)),
+            q.While(
+                q.Ident(PENDING),
+                [
+                    q.Assign(
+                        [result],
+                        q.BinaryOp(op, result, pop)
+                        if call_on_left
+                        else q.BinaryOp(op, pop, result),
+                    ),
+                ],
+                [],
+            ),
+            q.Return(result),
+        ]
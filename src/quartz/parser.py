@@ -4,14 +4,20 @@
 # IMPORTS
 ##############################
 
+import sys
+import threading
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import fields, is_dataclass, replace
 from typing import TYPE_CHECKING, Any, NoReturn
 
 import quartz.ast as q
 
-from .tokendef import Error, Tag, Token
+from .lexer import EXTENT_TABLE
+from .tokendef import TAG_IDS, TAGS, Error, Tag, Token
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator
 
 ##############################
 # SET CONSTANTS
@@ -52,6 +58,121 @@ COMPARISON_OPS: set[Tag] = {
     Tag.R_ANGLE_EQUAL,
 }
 
+UNARY_OPS: set[Tag] = {
+    Tag.MINUS,
+    Tag.PLUS,
+    Tag.TILDE,
+}
+
+# Tokens after a bare `yield`, which has no value.
+YIELD_ENDS: set[Tag] = {
+    Tag.ARROW,
+    Tag.COLON,
+    Tag.COMMA,
+    Tag.L_ANGLE_L_ANGLE_L_ANGLE,
+    Tag.PIPE_ARROW,
+    Tag.R_BRACE,
+    Tag.R_BRACKET,
+    Tag.R_PAREN,
+    Tag.TILDE_ARROW,
+    Tag.EOF,
+    Tag.FOR,
+    Tag.IF,
+    Tag.NEWLINE,
+    Tag.UNLESS,
+}
+
+##############################
+# BINDING POWERS
+##############################
+
+# Higher binding powers bind tighter.
+# Every infix operator is left-associative, except `^`.
+
+BOOL_OPS: set[Tag] = {
+    Tag.AND,
+    Tag.OR,
+}
+
+NOT_POWER: int = 3
+COMPARISON_POWER: int = 4
+UNARY_POWER: int = 11
+
+BINDING_POWERS: dict[Tag, int] = {
+    Tag.OR: 1,
+    Tag.AND: 2,
+    **dict.fromkeys(COMPARISON_OPS, COMPARISON_POWER),
+    Tag.PIPE: 5,
+    Tag.TILDE: 6,
+    Tag.AMPERSAND: 7,
+    Tag.L_ANGLE_L_ANGLE: 8,
+    Tag.R_ANGLE_R_ANGLE: 8,
+    Tag.MINUS: 9,
+    Tag.PLUS: 9,
+    Tag.ASTERISK: 10,
+    Tag.PERCENT: 10,
+    Tag.SLASH: 10,
+    Tag.SLASH_SLASH: 10,
+    Tag.CARET: 12,
+}
+
+##############################
+# KIND TABLES
+##############################
+
+# Hashing a `Tag` runs Python code,
+# so the hot path looks tokens up by their integer `kind` instead.
+
+
+def _kinds(tags: set[Tag]) -> frozenset[int]:
+    return frozenset(TAG_IDS[tag] for tag in tags)
+
+
+def _by_kind(
+    table: dict[Tag, Any],
+    default: Any = None,  # noqa: ANN401
+) -> list[Any]:
+    return [table.get(tag, default) for tag in TAGS]
+
+
+BOOL_KINDS: frozenset[int] = _kinds(BOOL_OPS)
+COMPARISON_KINDS: frozenset[int] = _kinds(COMPARISON_OPS)
+UNARY_KINDS: frozenset[int] = _kinds(UNARY_OPS)
+NOT_KIND: int = TAG_IDS[Tag.NOT]
+AWAIT_KIND: int = TAG_IDS[Tag.AWAIT]
+CARET_KIND: int = TAG_IDS[Tag.CARET]
+
+BINDING_POWER_TABLE: list[int] = _by_kind(BINDING_POWERS, -1)
+
+# Tokens that never count towards the end of a node.
+LAYOUT_KINDS: frozenset[int] = _kinds(
+    {Tag.DEDENT, Tag.EOF, Tag.INDENT, Tag.NEWLINE},
+)
+START_EXTENTS: list[int] = [start for start, _ in EXTENT_TABLE]
+END_EXTENTS: list[int] = [end for _, end in EXTENT_TABLE]
+
+# Holds the input of a `|>` tee while its stage runs,
+# or of `-> await (f, g)` while its stages start.
+TEE_TEMP: str = "__quartz_tee_{}"
+
+# Left-deep chains, like long `->` pipelines or `a + b + ...`,
+# are cut into segments about this many nodes deep (see `_Chain`),
+# so compiling them never nears the recursion limit here or in CPython.
+CHAIN_DEPTH: int = 32
+# Holds the value of a chain where it was cut.
+CHAIN_TEMP: str = "__quartz_chain_{}"
+# How deep each kind of `->`, `|>` and `~>` stage nests its input.
+ARROW_DEPTH: int = 2
+TEE_DEPTH: int = 4
+# Levels of nested brackets, operators and lambdas (see `_nest`),
+# like CPython's limit of 200 nested parentheses.
+MAX_NESTING: int = 200
+# Python frames parsing one level takes, at most.
+# The recursion limit is raised to fit them while parsing,
+# so `MAX_NESTING` levels hit `TooDeep` first (see `_RecursionLimit`).
+FRAMES_PER_LEVEL: int = 8
+RECURSION_LIMIT: int = MAX_NESTING * FRAMES_PER_LEVEL + 1000
+
 ##############################
 # ERROR DEFINITION
 ##############################
@@ -61,6 +182,127 @@ class _ParserError(Error):
     pass
 
 
+##############################
+# RECURSION LIMIT
+##############################
+
+
+class _RecursionLimit:
+    """*Raises the recursion limit while any parser runs*.
+
+    The limit is global, so the first parser in raises it,
+    and the last one out puts it back,
+    unless something else changed it meanwhile.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit: int = limit
+        self._lock: threading.Lock = threading.Lock()
+        self._parsers: int = 0
+        self._previous: int = 0
+        self._raised: int = 0
+
+    def __enter__(self) -> None:
+        with self._lock:
+            if not self._parsers:
+                self._previous = sys.getrecursionlimit()
+                self._raised = max(self._previous, self._limit)
+                sys.setrecursionlimit(self._raised)
+            self._parsers += 1
+
+    def __exit__(self, *exc_info: object) -> None:
+        with self._lock:
+            self._parsers -= 1
+            if not self._parsers and sys.getrecursionlimit() == self._raised:
+                sys.setrecursionlimit(self._previous)
+
+
+_PARSING: _RecursionLimit = _RecursionLimit(RECURSION_LIMIT)
+
+
+##############################
+# CHAINS
+##############################
+
+
+def _substitute(root: q.Expr, old: q.Expr, new: q.Expr) -> q.Expr:
+    # Copies the nodes from `root` down to the node `old`, with `new`
+    # in its place. A work stack finds it: the parser may already be
+    # deep in recursion.
+    path: list[tuple[Any, str, int]] = []
+    stack: list[tuple[Any, str, int, int]] = [(root, "", -1, 0)]
+    while stack:
+        node, name, index, depth = stack.pop()
+        del path[depth:]
+        path.append((node, name, index))
+        if node is old:
+            break
+        for child_field in fields(node):
+            value: Any = getattr(node, child_field.name)
+            if isinstance(value, list):
+                stack.extend(
+                    (item, child_field.name, i, depth + 1)
+                    for i, item in enumerate(value)
+                    if is_dataclass(item)
+                )
+            elif is_dataclass(value):
+                stack.append((value, child_field.name, -1, depth + 1))
+    expr: q.Expr = new
+    for (parent, _, _), (_, name, index) in zip(
+        reversed(path[:-1]),
+        reversed(path[1:]),
+        strict=True,
+    ):
+        if index < 0:
+            expr = replace(parent, **{name: expr})
+        else:
+            items: list[Any] = list(getattr(parent, name))
+            items[index] = expr
+            expr = replace(parent, **{name: items})
+    return expr
+
+
+class _Chain:
+    """*A left-deep expression, cut into segments as it grows*.
+
+    Each cut assigns the segment so far to a temporary,
+    which the next segment starts from.
+    `join` puts the assignments, in order, in a tuple
+    where the last segment starts,
+    so `a -> f -> g` cut after `f` is `g((t := f(a),)[-1])`.
+    The outermost node stays outermost,
+    so the chain can still be a target, or a tail call.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name: str = name
+        self._links: list[q.Expr] = []
+        self._leaf: q.Ident = q.Ident(name)
+
+    def cut(self, expr: q.Expr) -> q.Ident:
+        self._links.append(
+            q.NamedExpr(
+                q.Ident(self._name),
+                expr,
+                start=expr.start,
+                end=expr.end,
+            ),
+        )
+        self._leaf = q.Ident(self._name, start=expr.start, end=expr.end)
+        return self._leaf
+
+    def join(self, expr: q.Expr) -> q.Expr:
+        start: int = self._links[0].start
+        end: int = self._links[-1].end
+        links: q.Subscript = q.Subscript(
+            q.Tuple(self._links, start=start, end=end),
+            q.Constant(-1),
+            start=start,
+            end=end,
+        )
+        return _substitute(expr, self._leaf, links)
+
+
 ##############################
 # MAIN CLASS
 ##############################
@@ -69,97 +311,123 @@ class _ParserError(Error):
 class Parser:
     """*The Quartz Parser*."""
 
-    def __init__(self, tokens: list[Token]) -> None:
-        """*Parse a list of Quartz tokens*.
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        """*Parse a stream of Quartz tokens*.
+
+        Tokens are pulled one at a time,
+        so a lazy `Lexer.iter_tokens` is never materialized.
 
         Args:
-            tokens (list[Token]): *List of Quartz tokens*
+            tokens (Iterable[Token]): *Quartz tokens, e.g. a list*
 
         """
         self._i: int = 0
-
-        self._tokens: list[Token] = tokens
-        self._token: Token = self._tokens[self._i]
-        self._length: int = len(self._tokens)
-
-        self._parse_statements: dict[str | Tag, Callable[[], q.Stmt]] = {
-            "del": self._del,
-            "fn": self._function_definition,
-            "for": self._for,
-            "if": self._if,
-            "unless": self._if,
-            "until": self._while,
-            "while": self._while,
-            Tag.L_ANGLE_L_ANGLE_L_ANGLE: self._return,
-        }
-        self._keywords: set[str | Tag] = set(self._parse_statements.keys())
+        self._tees: int = 0
+        self._chains: int = 0
+        # How many expressions are being parsed, one inside another.
+        self._nesting: int = 0
+        # Where the last token that was not layout ended.
+        self._end: int = 0
+
+        self._tokens: Iterator[Token] = iter(tokens)
+        self._token: Token = next(self._tokens)
+        # Tokens after `self._token`, pulled in by lookahead.
+        self._lookahead: deque[Token] = deque()
+
+        self._parse_statements: list[Callable[[], q.Stmt] | None] = _by_kind(
+            {
+                Tag.ASYNC: self._function_definition,
+                Tag.AT_SIGN: self._decorated,
+                Tag.DEL: self._del,
+                Tag.FN: self._function_definition,
+                Tag.FOR: self._for,
+                Tag.FROM: self._import_from,
+                Tag.IF: self._if,
+                Tag.IMPORT: self._import,
+                Tag.UNLESS: self._if,
+                Tag.UNTIL: self._while,
+                Tag.WHILE: self._while,
+                Tag.L_ANGLE_L_ANGLE_L_ANGLE: self._return,
+            },
+        )
 
         self._simple_statements: set[Any] = {
             q.Assign,
             q.Delete,
             q.ExprStmt,
+            q.Import,
+            q.ImportFrom,
             q.Return,
         }
 
-        self._primary_dict: dict[Tag, Callable[[], q.Constant]] = {
-            Tag.ELLIPSIS: self._ellipsis,
-            Tag.FALSE: self._false,
-            Tag.FLOAT: self._float,
-            Tag.INTEGER: self._integer,
-            Tag.NONE: self._none,
-            Tag.STRING: self._string,
-            Tag.TRUE: self._true,
-        }
-        self._primary_dict_keys: set[Tag] = set(self._primary_dict.keys())
+        self._parse_primaries: list[Callable[[], q.Expr] | None] = _by_kind(
+            {
+                Tag.DOLLAR_L_BRACE: self._set,
+                Tag.ELLIPSIS: self._ellipsis,
+                Tag.FALSE: self._false,
+                Tag.FLOAT: self._float,
+                Tag.IDENT: self._ident,
+                Tag.INTEGER: self._integer,
+                Tag.L_BRACKET: self._list,
+                Tag.L_PAREN: self._tuple,
+                Tag.NONE: self._none,
+                Tag.PERCENT_L_BRACE: self._dict,
+                Tag.STRING: self._string,
+                Tag.TRUE: self._true,
+            },
+        )
 
-        self._program: q.Program = q.Program(self._statements())
+        with _PARSING:
+            statements: list[q.Stmt] = self._statements()
+        self._program: q.Program = q.Program(statements, self._token.source)
 
     ##########################
     # Helper Functions
     ##########################
 
     def _raise_error(self, message: str = "") -> NoReturn:
-        raise _ParserError(
-            self._token.ln,
-            self._token.col,
-            self._token.line,
-            message,
-        )
+        raise _ParserError(self._token.source, self._token.end, message)
+
+    def _peek(self, ahead: int) -> Token | None:
+        if not ahead:
+            return self._token
+        while len(self._lookahead) < ahead:
+            token: Token | None = next(self._tokens, None)
+            if token is None:
+                return None
+            self._lookahead.append(token)
+        return self._lookahead[ahead - 1]
 
     def _next(self, num: int = 1) -> Token:
-        if (next_i := self._i + num) >= self._length:
-            self._raise_error(f"No token found at index #{next_i}")
+        if self._peek(num) is None:
+            self._raise_error(f"No token found at index #{self._i + num}")
         past_token: Token = self._token
-        self._i: int = next_i
-        self._token: Token = self._tokens[self._i]
+        if past_token.kind not in LAYOUT_KINDS:
+            self._end = past_token.end + END_EXTENTS[past_token.kind]
+        self._i += num
+        for _ in range(num):
+            self._token: Token = self._lookahead.popleft()
         return past_token
 
-    def _check(self, *types: str | Tag, ahead: int = 0) -> bool:
-        i: int = self._i + ahead
-        if_ahead: bool = i < self._length
-        in_: bool = any(
-            typ in {self._tokens[i].tag, self._tokens[i].tok} for typ in types
-        )
-        return if_ahead and in_
+    def _start(self) -> int:
+        # Where the current token's text starts.
+        return self._token.start + START_EXTENTS[self._token.kind]
 
-    def _in(self, set_: set[Tag] | set[str | Tag], ahead: int = 0) -> bool:
-        i: int = self._i + ahead
-        if_ahead: bool = i < self._length
-        tag: bool = self._tokens[i].tag in set_
-        tok: bool = self._tokens[i].tok in set_
-        return if_ahead and (tag or tok)
+    def _check(self, *tags: Tag, ahead: int = 0) -> bool:
+        token: Token | None = self._peek(ahead)
+        return token is not None and token.tag in tags
 
-    def _match(self, type_: str | Tag) -> bool:
-        if type_ in {self._token.tag, self._token.tok}:
+    def _match(self, tag: Tag) -> bool:
+        if self._token.tag is tag:
             self._next()
             return True
         return False
 
-    def _expect(self, type_: str | Tag) -> Token:
-        if type_ in {self._token.tok, self._token.tag}:
+    def _expect(self, tag: Tag) -> Token:
+        if self._token.tag is tag:
             return self._next()
         return self._raise_error(
-            f"Expected {type_}, got {self._token.tok or self._token.tag}",
+            f"Expected {tag}, got {self._token.tok or self._token.tag}",
         )
 
     ##########################
@@ -192,14 +460,17 @@ class Parser:
         return stmt
 
     def _match_stmt(self) -> q.Stmt:
-        if self._in(self._keywords):
-            return self._parse_statements[self._token.tok or self._token.tag]()
+        parse_statement: Callable[[], q.Stmt] | None = self._parse_statements[
+            self._token.kind
+        ]
+        if parse_statement is not None:
+            return parse_statement()
         expr: q.Expr = self._expr()
         if self._match(Tag.EQUAL):
             return self._assign(expr)
         if self._check(Tag.L_ANGLE_L_ANGLE_L_ANGLE):
             return self._return(expr)
-        return q.ExprStmt(expr)
+        return q.ExprStmt(expr, start=expr.start, end=expr.end)
 
     ##############################
     # SIMPLE CASES
@@ -210,24 +481,67 @@ class Parser:
         while self._match(Tag.EQUAL):
             targets.append(self._expr())
         value: q.Expr = targets.pop()
-        return q.Assign(targets, value)
+        return q.Assign(targets, value, start=first.start, end=self._end)
 
     def _del(self) -> q.Delete:
-        self._expect("del")
+        start: int = self._start()
+        self._expect(Tag.DEL)
         targets: list[q.Expr] = [self._expr()]
         while self._match(Tag.COMMA):
             targets.append(self._expr())
-        return q.Delete(targets)
+        return q.Delete(targets, start=start, end=self._end)
+
+    def _import(self) -> q.Import:
+        start: int = self._start()
+        self._expect(Tag.IMPORT)
+        names: list[q.Alias] = [self._alias()]
+        while self._match(Tag.COMMA):
+            names.append(self._alias())
+        return q.Import(names, start=start, end=self._end)
+
+    def _import_from(self) -> q.ImportFrom:
+        start: int = self._start()
+        self._expect(Tag.FROM)
+        module: str = self._dotted_name()
+        self._expect(Tag.IMPORT)
+        names: list[q.Alias] = [self._alias(dotted=False)]
+        while self._match(Tag.COMMA):
+            names.append(self._alias(dotted=False))
+        return q.ImportFrom(module, names, start=start, end=self._end)
+
+    def _alias(self, *, dotted: bool = True) -> q.Alias:
+        start: int = self._start()
+        name: str = (
+            self._dotted_name() if dotted else self._expect(Tag.IDENT).tok
+        )
+        asname: str | None = (
+            self._expect(Tag.IDENT).tok if self._match(Tag.AS) else None
+        )
+        return q.Alias(name, asname, start=start, end=self._end)
+
+    def _dotted_name(self) -> str:
+        parts: list[str] = [self._expect(Tag.IDENT).tok]
+        while self._match(Tag.PERIOD):
+            parts.append(self._expect(Tag.IDENT).tok)
+        return ".".join(parts)
 
     def _return(self, expr: q.Expr | None = None) -> q.Return | q.If:
+        start: int = self._start() if expr is None else expr.start
         self._expect(Tag.L_ANGLE_L_ANGLE_L_ANGLE)
-        if not self._check("if", "unless"):
-            return q.Return(expr)
-        if_type: str = self._next().tok
+        return_stmt: q.Return = q.Return(expr, start=start, end=self._end)
+        if not self._check(Tag.IF, Tag.UNLESS):
+            return return_stmt
+        if_type: Tag = self._next().tag
         test: q.Expr = self._expr()
-        if if_type == "unless":
-            test = q.UnaryOp(Tag.NOT, test)
-        if_stmt: q.If = q.If(test, [q.Return(expr)], [])
+        if if_type == Tag.UNLESS:
+            test = q.UnaryOp(Tag.NOT, test, start=test.start, end=test.end)
+        if_stmt: q.If = q.If(
+            test,
+            [return_stmt],
+            [],
+            start=start,
+            end=self._end,
+        )
         self._match(Tag.NEWLINE)
         return if_stmt
 
@@ -236,23 +550,31 @@ class Parser:
     ##############################
 
     def _if(self) -> q.If:
-        if self._match("unless"):
-            test: q.UnaryOp = q.UnaryOp(Tag.NOT, self._expr())
+        start: int = self._start()
+        if self._match(Tag.UNLESS):
+            expr: q.Expr = self._expr()
+            test: q.UnaryOp = q.UnaryOp(
+                Tag.NOT,
+                expr,
+                start=expr.start,
+                end=expr.end,
+            )
             body: list[q.Stmt] = self._suite()
-            return q.If(test, body, [])
-        self._expect("if")
+            return q.If(test, body, [], start=start, end=self._end)
+        self._expect(Tag.IF)
         test: q.Expr = self._expr()
         body: list[q.Stmt] = self._suite()
         orelse: list[q.Stmt] = []
-        while self._check("else") and self._check("if", ahead=1):
+        while self._check(Tag.ELSE) and self._check(Tag.IF, ahead=1):
             self._next()
             orelse: list[q.Stmt] = [self._if()]
-        if self._match("else"):
+        if self._match(Tag.ELSE):
             orelse: list[q.Stmt] = self._suite()
-        return q.If(test, body, orelse)
+        return q.If(test, body, orelse, start=start, end=self._end)
 
     def _for(self) -> q.For:
-        self._expect("for")
+        start: int = self._start()
+        self._expect(Tag.FOR)
         target: q.Expr | None = None
         iter_: q.Expr = self._postfix()
         if self._match(Tag.IN):
@@ -260,25 +582,47 @@ class Parser:
             iter_: q.Expr = self._expr()
         body: list[q.Stmt] = self._suite()
         orelse: list[q.Stmt] = []
-        if self._match("else"):
+        if self._match(Tag.ELSE):
             orelse: list[q.Stmt] = self._suite()
-        return q.For(target or q.Ident("_"), iter_, body, orelse)
+        return q.For(
+            target or q.Ident("_"),
+            iter_,
+            body,
+            orelse,
+            start=start,
+            end=self._end,
+        )
 
     def _while(self) -> q.While:
-        word: str = self._next().tok
+        start: int = self._start()
+        word: Tag = self._next().tag
         test: q.Expr = self._expr()
         body: list[q.Stmt] = self._suite()
         orelse: list[q.Stmt] = []
-        if self._match("else"):
+        if self._match(Tag.ELSE):
             orelse: list[q.Stmt] = self._suite()
-        return q.While(
-            test if word == "while" else q.UnaryOp(Tag.NOT, test),
-            body,
-            orelse,
-        )
+        if word == Tag.UNTIL:
+            test = q.UnaryOp(Tag.NOT, test, start=test.start, end=test.end)
+        return q.While(test, body, orelse, start=start, end=self._end)
+
+    def _decorated(self) -> q.FunctionDefinition:
+        decorators: list[q.Expr] = []
+        while self._match(Tag.AT_SIGN):
+            decorators.append(self._expr())
+            self._expect(Tag.NEWLINE)
+        return self._function_definition(decorators)
 
-    def _function_definition(self) -> q.FunctionDefinition:
-        self._expect("fn")
+    def _function_definition(
+        self,
+        decorators: list[q.Expr] | None = None,
+    ) -> q.FunctionDefinition:
+        start: int = self._start()
+        definition: type[q.FunctionDefinition] = (
+            q.AsyncFunctionDefinition
+            if self._match(Tag.ASYNC)
+            else q.FunctionDefinition
+        )
+        self._expect(Tag.FN)
         name: str = self._expect(Tag.IDENT).tok
         self._expect(Tag.L_PAREN)
         args: q.Arguments = q.Arguments()
@@ -289,7 +633,15 @@ class Parser:
         if not self._check(Tag.NEWLINE):
             returns: q.Expr = self._type()
         body: list[q.Stmt] = self._suite()
-        return q.FunctionDefinition(name, args, body, returns)
+        return definition(
+            name,
+            args,
+            body,
+            returns,
+            decorators or [],
+            start=start,
+            end=self._end,
+        )
 
     ##############################
     # STATEMENT PARTS
@@ -297,6 +649,15 @@ class Parser:
 
     def _call_params(self) -> tuple[list[q.Expr], list[q.Keyword]]:
         lst: list[q.Expr] = [self._call_parameter()]
+        if self._check(Tag.FOR) and not isinstance(lst[0], q.Keyword):
+            # `f(x for x in xs)` needs no second pair of parentheses.
+            generators: list[q.Comprehension] = self._comprehensions()
+            lst[0] = q.GeneratorExp(
+                lst[0],
+                generators,
+                start=lst[0].start,
+                end=self._end,
+            )
         while self._match(Tag.COMMA) and not self._check(Tag.R_PAREN):
             lst.append(self._call_parameter())
         args: list[q.Expr] = [
@@ -309,7 +670,10 @@ class Parser:
 
     def _call_parameter(self) -> q.Expr:
         if self._check(Tag.IDENT) and self._check(Tag.EQUAL, ahead=1):
-            return q.Keyword(self._next(2).tok, self._expr())
+            start: int = self._start()
+            name: str = self._next(2).tok
+            value: q.Expr = self._expr()
+            return q.Keyword(name, value, start=start, end=self._end)
         return self._expr()
 
     def _def_params(self) -> q.Arguments:
@@ -339,16 +703,24 @@ class Parser:
         return (args, defaults)
 
     def _def_parameter(self) -> q.Arg:
+        start: int = self._start()
         arg: str = self._expect(Tag.IDENT).tok
         annotation: q.Expr | None = None
         if self._match(Tag.COLON):
             annotation: q.Expr = self._type()
-        return q.Arg(arg, annotation)
+        return q.Arg(arg, annotation, start=start, end=self._end)
 
     def _type(self) -> q.Expr:
+        start: int = self._start()
         typ: q.Expr = self._postfix()
         while self._match(Tag.PIPE):
-            typ: q.BinaryOp = q.BinaryOp(Tag.PIPE, typ, self._postfix())
+            typ: q.BinaryOp = q.BinaryOp(
+                Tag.PIPE,
+                typ,
+                self._postfix(),
+                start=start,
+                end=self._end,
+            )
         return typ
 
     ##############################
@@ -368,184 +740,392 @@ class Parser:
     # EXPRESSIONS
     ##############################
 
+    def _nest(self) -> None:
+        # Every `_expr` inside another counts, so a bracket is one level,
+        # as are a unary operator's and `^`'s operands (see `_operand`).
+        # The outermost expression is not nested in anything.
+        self._nesting += 1
+        if self._nesting > MAX_NESTING + 1:
+            self._raise_error("TooDeep: expression is nested too deeply")
+
     def _expr(self) -> q.Expr:
-        expr: q.Expr = self._base_expr()
-        if not self._check(Tag.ARROW):
-            return expr
-        return self._pipes(expr)
+        self._nest()
+        if self._check(Tag.IDENT) and self._check(Tag.COLON_EQUAL, ahead=1):
+            expr: q.Expr = self._named_expr()
+        else:
+            expr = self._base_expr()
+            if self._check(Tag.ARROW, Tag.PIPE_ARROW, Tag.TILDE_ARROW):
+                expr = self._pipes(expr)
+            if self._token.tag is Tag.COLON_EQUAL:
+                # Like in Python, `x.a := 1` and `xs[0] := 1` are errors.
+                self._raise_error("InvalidTarget: `:=` can only assign a name")
+        self._nesting -= 1
+        return expr
+
+    def _named_expr(self) -> q.NamedExpr:
+        # Binds looser than anything, so `n := xs -> len` names the pipe.
+        target: q.Ident = self._ident()
+        self._expect(Tag.COLON_EQUAL)
+        value: q.Expr = self._expr()
+        return q.NamedExpr(target, value, start=target.start, end=self._end)
 
     def _base_expr(self) -> q.Expr:
-        if self._check("fn"):
+        if self._check(Tag.FN):
             return self._lambda()
-        if self._check("match"):
+        if self._check(Tag.MATCH):
             return self._match_expr()
         if self._check(Tag.PIPE):
             return self._pipeline()
+        if self._check(Tag.YIELD):
+            return self._yield()
         return self._ternary()
 
     def _pipes(self, first: q.Expr) -> q.Expr:
         stage: q.Expr = first
-        while self._check(Tag.ARROW, Tag.PIPE_ARROW):
+        chain: _Chain | None = None
+        depth: int = 0
+        element_depth: int = 0
+        while self._check(Tag.ARROW, Tag.PIPE_ARROW, Tag.TILDE_ARROW):
             arrow_type: Tag = self._next().tag
             input_: q.Expr = stage
-            args: list[q.Expr] = []
-            if self._match(Tag.PERIOD):
-                stage = q.Attribute(stage, self._expect(Tag.IDENT).tok)
-                pf: q.Expr = self._postfix(stage)
+            if arrow_type == Tag.TILDE_ARROW:
+                # Consecutive `~>` stages fuse into one element expression,
+                # up to the depth of a chain segment.
+                if isinstance(stage, q.Stream) and element_depth < CHAIN_DEPTH:
+                    element: q.Expr = self._pipe_stage(stage.element)
+                    stage = q.Stream(
+                        stage.iterable,
+                        element,
+                        start=first.start,
+                        end=self._end,
+                    )
+                    element_depth += ARROW_DEPTH
+                    continue
+                stage = q.Stream(
+                    stage,
+                    self._pipe_stage(q.StreamItem()),
+                    start=first.start,
+                    end=self._end,
+                )
+                element_depth = ARROW_DEPTH
+                depth += 1
+            elif arrow_type == Tag.PIPE_ARROW:
+                stage = self._tee(input_)
+                depth += TEE_DEPTH
             else:
-                args.append(stage)
-                pf: q.Expr = self._postfix()
-            kws: list[q.Keyword] = []
-            if isinstance(pf, q.Call):
-                args.extend(arg for arg in pf.args)
-                kws: list[q.Keyword] = pf.keywords
-            stage = q.Call(
-                pf.func if isinstance(pf, q.Call) else pf,
-                args=args,
-                keywords=kws,
+                stage = self._stage(input_)
+                depth += ARROW_DEPTH
+            if depth >= CHAIN_DEPTH:
+                chain = chain or self._chain()
+                stage, depth = chain.cut(stage), 0
+        return stage if chain is None else chain.join(stage)
+
+    def _tee(self, input_: q.Expr) -> q.TernaryOp:
+        # `a |> f` is `(t if f(t := a) is None else t)`:
+        # the input is evaluated once and passed through untouched,
+        # and `is` never calls the stage result's `__bool__`.
+        temp: q.Ident = q.Ident(TEE_TEMP.format(self._tees))
+        self._tees += 1
+        named: q.NamedExpr = q.NamedExpr(
+            temp,
+            input_,
+            start=input_.start,
+            end=input_.end,
+        )
+        stage: q.Expr = self._stage(named)
+        return q.TernaryOp(
+            temp,
+            temp,
+            q.Comparison(
+                stage,
+                [Tag.IS],
+                [q.Constant(None)],
+                start=stage.start,
+                end=stage.end,
+            ),
+            start=stage.start,
+            end=stage.end,
+        )
+
+    def _chain(self) -> _Chain:
+        chain: _Chain = _Chain(CHAIN_TEMP.format(self._chains))
+        self._chains += 1
+        return chain
+
+    def _pipe_stage(self, input_: q.Expr) -> q.Call:
+        # A stage spans its input, unless that is the stream element.
+        start: int = input_.start if input_.start >= 0 else self._start()
+        args: list[q.Expr] = []
+        if self._match(Tag.PERIOD):
+            attribute = q.Attribute(
+                input_,
+                self._expect(Tag.IDENT).tok,
+                start=start,
+                end=self._end,
             )
-            if arrow_type == Tag.PIPE_ARROW:
-                stage: q.Subscript = q.Subscript(
-                    q.Tuple(
-                        [stage, input_],
-                    ),
-                    q.Constant(1),
-                )
-        return stage
+            pf: q.Expr = self._postfix(attribute)
+        else:
+            args.append(input_)
+            pf: q.Expr = self._postfix()
+        kws: list[q.Keyword] = []
+        if isinstance(pf, q.Call):
+            args.extend(arg for arg in pf.args)
+            kws: list[q.Keyword] = pf.keywords
+        return q.Call(
+            pf.func if isinstance(pf, q.Call) else pf,
+            args=args,
+            keywords=kws,
+            start=start,
+            end=self._end,
+        )
+
+    def _stage(self, input_: q.Expr) -> q.Expr:
+        # A `->` or `|>` stage, which may also yield or await.
+        if self._check(Tag.YIELD):
+            return self._yield_stage(input_)
+        if self._check(Tag.AWAIT):
+            return self._await_stage(input_)
+        return self._pipe_stage(input_)
+
+    def _await_stage(self, input_: q.Expr) -> q.Await:
+        # `a -> await f` is `await f(a)`, and `a -> await (f, g)`
+        # awaits `f(a)` and `g(a)` together, giving a list of results.
+        start: int = input_.start if input_.start >= 0 else self._start()
+        self._expect(Tag.AWAIT)
+        if not self._match(Tag.L_PAREN):
+            stage: q.Call = self._pipe_stage(input_)
+            return q.Await(stage, start=start, end=self._end)
+        temp: q.Ident = q.Ident(TEE_TEMP.format(self._tees))
+        self._tees += 1
+        stages: list[q.Expr] = [
+            self._pipe_stage(
+                q.NamedExpr(temp, input_, start=input_.start, end=input_.end),
+            ),
+        ]
+        while self._match(Tag.COMMA) and not self._check(Tag.R_PAREN):
+            stages.append(self._pipe_stage(temp))
+        self._expect(Tag.R_PAREN)
+        return q.Await(
+            q.Gather(stages, start=start, end=self._end),
+            start=start,
+            end=self._end,
+        )
+
+    def _yield_stage(self, input_: q.Expr) -> q.Yield | q.YieldFrom:
+        # `a -> yield` yields `a`, and `a -> yield from` each item of `a`.
+        self._expect(Tag.YIELD)
+        if self._match(Tag.FROM):
+            return q.YieldFrom(input_, start=input_.start, end=self._end)
+        return q.Yield(input_, start=input_.start, end=self._end)
+
+    def _yield(self) -> q.Yield | q.YieldFrom:
+        start: int = self._start()
+        self._expect(Tag.YIELD)
+        if self._match(Tag.FROM):
+            return q.YieldFrom(self._expr(), start=start, end=self._end)
+        value: q.Expr | None = (
+            None if self._check(*YIELD_ENDS) else self._expr()
+        )
+        return q.Yield(value, start=start, end=self._end)
 
     def _lambda(self) -> q.Lambda:
-        self._expect("fn")
+        start: int = self._start()
+        self._expect(Tag.FN)
         self._expect(Tag.L_PAREN)
         args: list[q.Arg] = []
         if not self._check(Tag.R_PAREN):
-            args.append(q.Arg(self._next().tok))
+            args.append(self._lambda_parameter())
             while self._match(Tag.COMMA) and not self._check(Tag.R_PAREN):
-                args.append(q.Arg(self._next().tok))
+                args.append(self._lambda_parameter())
         self._expect(Tag.R_PAREN)
         self._expect(Tag.EQUAL_ARROW)
-        return q.Lambda(q.Arguments(args=args), self._expr())
+        body: q.Expr = self._expr()
+        return q.Lambda(
+            q.Arguments(args=args),
+            body,
+            start=start,
+            end=self._end,
+        )
+
+    def _lambda_parameter(self) -> q.Arg:
+        start: int = self._start()
+        return q.Arg(self._next().tok, start=start, end=self._end)
 
     def _match_expr(self) -> q.Expr:
         return q.Expr()
 
-    def _pipeline(self) -> q.Expr:
-        return q.Expr()
+    def _pipeline(self) -> q.Parallel:
+        start: int = self._start()
+        self._expect(Tag.PIPE)
+        options: list[q.Keyword] = []
+        while not self._match(Tag.PIPE):
+            if options:
+                self._expect(Tag.COMMA)
+            option_start: int = self._start()
+            name: str = self._expect(Tag.IDENT).tok
+            self._expect(Tag.EQUAL)
+            # Not `_expr`, which would read the closing `|` as an operator.
+            value: q.Expr = self._postfix()
+            options.append(
+                q.Keyword(name, value, start=option_start, end=self._end),
+            )
+        iterable: q.Expr = self._ternary()
+        self._expect(Tag.TILDE_ARROW)
+        stages: list[q.Call] = [self._pipe_stage(q.StreamItem())]
+        while self._match(Tag.TILDE_ARROW):
+            stages.append(self._pipe_stage(q.StreamItem()))
+        return q.Parallel(
+            iterable,
+            stages,
+            options,
+            start=start,
+            end=self._end,
+        )
 
     def _ternary(self) -> q.Expr:
-        body: q.Expr = self._disjunction()
+        body: q.Expr = self._operation()
         if not self._check(Tag.L_ANGLE_MINUS_R_ANGLE):
             return body
         self._expect(Tag.L_ANGLE_MINUS_R_ANGLE)
         orelse: q.Expr = self._expr()
-        self._expect("if")
+        self._expect(Tag.IF)
         test: q.Expr = self._expr()
-        return q.TernaryOp(body, orelse, test)
-
-    def _disjunction(self) -> q.Expr:
-        expr: q.Expr = self._conjunction()
-        if not self._check(Tag.OR):
-            return expr
-        self._expect(Tag.OR)
-        values: list[q.Expr] = [expr, self._conjunction()]
-        while self._match(Tag.OR):
-            values.append(self._conjunction())
-        return q.BoolOp(Tag.OR, values)
-
-    def _conjunction(self) -> q.Expr:
-        expr: q.Expr = self._inversion()
-        if not self._check(Tag.AND):
-            return expr
-        self._expect(Tag.AND)
-        values: list[q.Expr] = [expr, self._inversion()]
-        while self._match(Tag.AND):
-            values.append(self._inversion())
-        return q.BoolOp(Tag.AND, values)
-
-    def _inversion(self) -> q.Expr:
-        if not self._check(Tag.NOT):
-            return self._comparison()
-        return q.UnaryOp(self._next().tag, self._inversion())
-
-    def _comparison(self) -> q.Expr:
-        expr: q.Expr = self._bitwise_or()
-        if not self._in(COMPARISON_OPS):
-            return expr
-        ops: list[Tag] = [self._next().tag]
-        comparators: list[q.Expr] = [self._bitwise_or()]
-        while self._in(COMPARISON_OPS):
-            ops.append(self._next().tag)
-            comparators.append(self._bitwise_or())
-        return q.Comparison(expr, ops, comparators)
-
-    def _bitwise_or(self) -> q.Expr:
-        expr: q.Expr = self._bitwise_xor()
-        while self._check(Tag.PIPE):
-            expr = q.BinaryOp(self._next().tag, expr, self._bitwise_xor())
-        return expr
-
-    def _bitwise_xor(self) -> q.Expr:
-        expr: q.Expr = self._bitwise_and()
-        while self._check(Tag.TILDE):
-            expr = q.BinaryOp(self._next().tag, expr, self._bitwise_and())
-        return expr
-
-    def _bitwise_and(self) -> q.Expr:
-        expr: q.Expr = self._bitwise_shift()
-        while self._check(Tag.AMPERSAND):
-            expr = q.BinaryOp(self._next().tag, expr, self._bitwise_shift())
-        return expr
-
-    def _bitwise_shift(self) -> q.Expr:
-        expr: q.Expr = self._sum()
-        while self._check(Tag.L_ANGLE_L_ANGLE, Tag.R_ANGLE_R_ANGLE):
-            expr = q.BinaryOp(self._next().tag, expr, self._sum())
-        return expr
-
-    def _sum(self) -> q.Expr:
-        expr: q.Expr = self._term()
-        while self._check(Tag.PLUS, Tag.MINUS):
-            expr = q.BinaryOp(self._next().tag, expr, self._term())
-        return expr
-
-    def _term(self) -> q.Expr:
-        expr: q.Expr = self._factor()
-        while self._check(
-            Tag.ASTERISK,
-            Tag.SLASH,
-            Tag.SLASH_SLASH,
-            Tag.PERCENT,
-        ):
-            expr = q.BinaryOp(self._next().tag, expr, self._factor())
-        return expr
-
-    def _factor(self) -> q.Expr:
-        if not self._check(Tag.PLUS, Tag.MINUS, Tag.TILDE):
-            return self._power()
-        return q.UnaryOp(self._next().tag, self._factor())
+        return q.TernaryOp(
+            body,
+            orelse,
+            test,
+            start=body.start,
+            end=self._end,
+        )
 
-    def _power(self) -> q.Expr:
-        expr: q.Expr = self._postfix()
-        while self._check(Tag.CARET):
-            expr = q.BinaryOp(self._next().tag, expr, self._factor())
+    def _operation(self, min_power: int = 0) -> q.Expr:
+        start: int = self._start()
+        kind: int = self._token.kind
+        if kind in UNARY_KINDS:
+            tag: Tag = self._next().tag
+            operand: q.Expr = self._operand(UNARY_POWER)
+            expr: q.Expr = q.UnaryOp(tag, operand, start=start, end=self._end)
+        elif kind == NOT_KIND and min_power <= NOT_POWER:
+            tag: Tag = self._next().tag
+            operand: q.Expr = self._operand(NOT_POWER)
+            expr: q.Expr = q.UnaryOp(tag, operand, start=start, end=self._end)
+        elif kind == AWAIT_KIND:
+            # Binds tighter than any operator, like in Python.
+            self._next()
+            operand: q.Expr = self._postfix()
+            expr: q.Expr = q.Await(operand, start=start, end=self._end)
+        else:
+            expr: q.Expr = self._postfix()
+        chain: _Chain | None = None
+        depth: int = 0
+        while (power := BINDING_POWER_TABLE[self._token.kind]) >= min_power:
+            kind: int = self._token.kind
+            tag: Tag = self._next().tag
+            if kind in BOOL_KINDS:
+                values: list[q.Expr] = [expr, self._operation(power + 1)]
+                while self._token.kind == kind:
+                    self._next()
+                    values.append(self._operation(power + 1))
+                expr = q.BoolOp(tag, values, start=start, end=self._end)
+            elif power == COMPARISON_POWER:
+                ops: list[Tag] = [tag]
+                comparators: list[q.Expr] = [self._operation(power + 1)]
+                while self._token.kind in COMPARISON_KINDS:
+                    ops.append(self._next().tag)
+                    comparators.append(self._operation(power + 1))
+                expr = q.Comparison(
+                    expr,
+                    ops,
+                    comparators,
+                    start=start,
+                    end=self._end,
+                )
+            else:
+                right: q.Expr = (
+                    self._operand(power)
+                    if kind == CARET_KIND
+                    else self._operation(power + 1)
+                )
+                expr = q.BinaryOp(tag, expr, right, start=start, end=self._end)
+            depth += 1
+            if depth >= CHAIN_DEPTH:
+                chain = chain or self._chain()
+                expr, depth = chain.cut(expr), 0
+        return expr if chain is None else chain.join(expr)
+
+    def _operand(self, power: int) -> q.Expr:
+        # Unary and `^` operands recurse without bound, so they nest.
+        self._nest()
+        expr: q.Expr = self._operation(power)
+        self._nesting -= 1
         return expr
 
     def _postfix(self, first: q.Expr | None = None) -> q.Expr:
+        start: int = self._start() if first is None else first.start
         expr: q.Expr = first or self._primary()
+        chain: _Chain | None = None
+        depth: int = 0
         while self._check(Tag.PERIOD, Tag.L_PAREN, Tag.L_BRACKET):
             if self._match(Tag.PERIOD):
-                expr = q.Attribute(expr, self._expect(Tag.IDENT).tok)
+                name: str = self._expect(Tag.IDENT).tok
+                expr = q.Attribute(expr, name, start=start, end=self._end)
             elif self._match(Tag.L_PAREN):
                 if self._match(Tag.R_PAREN):
-                    expr = q.Call(expr)
+                    expr = q.Call(expr, start=start, end=self._end)
                 else:
-                    expr = q.Call(expr, *self._call_params())
+                    args, keywords = self._call_params()
                     self._expect(Tag.R_PAREN)
+                    expr = q.Call(
+                        expr,
+                        args,
+                        keywords,
+                        start=start,
+                        end=self._end,
+                    )
             elif self._match(Tag.L_BRACKET):
-                expr = q.Subscript(expr, self._slice())
+                slice_: q.Expr = self._slice()
                 self._expect(Tag.R_BRACKET)
-        return expr
+                expr = q.Subscript(expr, slice_, start=start, end=self._end)
+            depth += 1
+            if depth >= CHAIN_DEPTH:
+                chain = chain or self._chain()
+                expr, depth = chain.cut(expr), 0
+        return expr if chain is None else chain.join(expr)
+
+    def _comprehensions(self) -> list[q.Comprehension]:
+        # `for target in iterable`, each followed by any `if`/`unless` tests.
+        generators: list[q.Comprehension] = []
+        while self._check(Tag.FOR):
+            start: int = self._start()
+            self._expect(Tag.FOR)
+            target: q.Expr = self._postfix()
+            self._expect(Tag.IN)
+            iter_: q.Expr = self._expr()
+            ifs: list[q.Expr] = []
+            while self._check(Tag.IF, Tag.UNLESS):
+                word: Tag = self._next().tag
+                test: q.Expr = self._expr()
+                if word == Tag.UNLESS:
+                    test = q.UnaryOp(
+                        Tag.NOT,
+                        test,
+                        start=test.start,
+                        end=test.end,
+                    )
+                ifs.append(test)
+            generators.append(
+                q.Comprehension(
+                    target,
+                    iter_,
+                    ifs,
+                    start=start,
+                    end=self._end,
+                ),
+            )
+        return generators
 
     def _slice(self) -> q.Expr:
+        start: int = self._start()
         lower: q.Expr | None = None
         upper: q.Expr | None = None
         step: q.Expr | None = None
@@ -560,93 +1140,124 @@ class Parser:
         if self._match(Tag.COLON):  # noqa: SIM102
             if not (self._check(Tag.COMMA, Tag.R_BRACKET)):
                 step: q.Expr = self._expr()
-        return q.Slice(lower, upper, step)
-
-    def _primary(self) -> q.Expr:  # noqa: PLR0911
-        if self._token.tag in self._primary_dict:
-            return self._primary_dict[self._token.tag]()
-        if self._check(Tag.IDENT):
-            return self._ident()
-        if self._match(Tag.L_PAREN):
-            return self._tuple()
-        if self._match(Tag.L_BRACKET):
-            return self._list()
-        if self._match(Tag.DOLLAR_L_BRACE):
-            return self._set()
-        if self._match(Tag.PERCENT_L_BRACE):
-            return self._dict()
+        return q.Slice(lower, upper, step, start=start, end=self._end)
+
+    def _primary(self) -> q.Expr:
+        parse_primary: Callable[[], q.Expr] | None = self._parse_primaries[
+            self._token.kind
+        ]
+        if parse_primary is not None:
+            return parse_primary()
         return self._raise_error(
             f"UnknownPrimary: {self._token.tag} {self._token.tok}",
         )
 
+    def _constant(self, value: Any) -> q.Constant:  # noqa: ANN401
+        # Consumes the token the constant was written as.
+        start: int = self._start()
+        self._next()
+        return q.Constant(value, start=start, end=self._end)
+
     def _ident(self) -> q.Ident:
-        return q.Ident(self._next().tok)
+        start: int = self._start()
+        return q.Ident(self._next().tok, start=start, end=self._end)
 
     def _integer(self) -> q.Constant:
-        return q.Constant(int(self._next().tok))
+        return self._constant(int(self._token.tok))
 
     def _float(self) -> q.Constant:
-        return q.Constant(float(self._next().tok))
+        return self._constant(float(self._token.tok))
 
     def _string(self) -> q.Constant:
-        return q.Constant(self._next().tok)
+        return self._constant(self._token.tok)
 
     def _true(self) -> q.Constant:
-        self._next()
-        return q.Constant(value=True)
+        return self._constant(value=True)
 
     def _false(self) -> q.Constant:
-        self._next()
-        return q.Constant(value=False)
+        return self._constant(value=False)
 
     def _none(self) -> q.Constant:
-        self._next()
-        return q.Constant()
+        return self._constant(None)
 
     def _ellipsis(self) -> q.Constant:
-        self._next()
-        return q.Constant(Ellipsis)
+        return self._constant(Ellipsis)
 
-    def _list(self) -> q.List:
+    def _list(self) -> q.List | q.ListComp:
+        start: int = self._start()
+        self._expect(Tag.L_BRACKET)
         if self._match(Tag.R_BRACKET):
-            return q.List()
+            return q.List(start=start, end=self._end)
         lst: list[q.Expr] = [self._expr()]
+        if self._check(Tag.FOR):
+            generators: list[q.Comprehension] = self._comprehensions()
+            self._expect(Tag.R_BRACKET)
+            return q.ListComp(lst[0], generators, start=start, end=self._end)
         while self._match(Tag.COMMA) and not self._check(Tag.R_BRACKET):
             lst.append(self._expr())
         self._expect(Tag.R_BRACKET)
-        return q.List(lst)
+        return q.List(lst, start=start, end=self._end)
 
     def _tuple(self) -> q.Expr:
+        start: int = self._start()
+        self._expect(Tag.L_PAREN)
         if self._match(Tag.R_PAREN):
-            return q.Tuple()
+            return q.Tuple(start=start, end=self._end)
         expr: q.Expr = self._expr()
+        if self._check(Tag.FOR):
+            generators: list[q.Comprehension] = self._comprehensions()
+            self._expect(Tag.R_PAREN)
+            return q.GeneratorExp(expr, generators, start=start, end=self._end)
         if self._match(Tag.R_PAREN):
             return expr
         lst: list[q.Expr] = [expr]
         while self._match(Tag.COMMA) and not self._check(Tag.R_PAREN):
             lst.append(self._expr())
         self._expect(Tag.R_PAREN)
-        return q.Tuple(lst)
+        return q.Tuple(lst, start=start, end=self._end)
 
-    def _set(self) -> q.Set:
+    def _set(self) -> q.Set | q.SetComp:
+        start: int = self._start()
+        self._expect(Tag.DOLLAR_L_BRACE)
         if self._match(Tag.R_BRACE):
-            return q.Set()
+            return q.Set(start=start, end=self._end)
         lst: list[q.Expr] = [self._expr()]
+        if self._check(Tag.FOR):
+            generators: list[q.Comprehension] = self._comprehensions()
+            self._expect(Tag.R_BRACE)
+            return q.SetComp(lst[0], generators, start=start, end=self._end)
         while self._match(Tag.COMMA) and not self._check(Tag.R_BRACE):
             lst.append(self._expr())
         self._expect(Tag.R_BRACE)
-        return q.Set(lst)
+        return q.Set(lst, start=start, end=self._end)
 
-    def _dict(self) -> q.Dict:
+    def _dict(self) -> q.Dict | q.DictComp:
+        start: int = self._start()
+        self._expect(Tag.PERCENT_L_BRACE)
         if self._match(Tag.R_BRACE):
-            return q.Dict()
+            return q.Dict(start=start, end=self._end)
         lst: list[tuple[q.Expr, q.Expr]] = []
         key: q.Expr = self._expr()
         self._expect(Tag.COLON)
         lst.append((key, self._expr()))
+        if self._check(Tag.FOR):
+            generators: list[q.Comprehension] = self._comprehensions()
+            self._expect(Tag.R_BRACE)
+            return q.DictComp(
+                key,
+                lst[0][1],
+                generators,
+                start=start,
+                end=self._end,
+            )
         while self._match(Tag.COMMA) and not self._check(Tag.R_BRACE):
             key: q.Expr = self._expr()
             self._expect(Tag.COLON)
             lst.append((key, self._expr()))
         self._expect(Tag.R_BRACE)
-        return q.Dict([pair[0] for pair in lst], [pair[1] for pair in lst])
+        return q.Dict(
+            [pair[0] for pair in lst],
+            [pair[1] for pair in lst],
+            start=start,
+            end=self._end,
+        )
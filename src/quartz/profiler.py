@@ -0,0 +1,98 @@
+"""*Per-phase instrumentation for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+from .cache import VERSION
+
+if TYPE_CHECKING:
+    from typing import Self
+
+##############################
+# PROFILER
+##############################
+
+
+class PhaseProfiler:
+    """*Records wall time and peak traced memory per phase*."""
+
+    def __init__(self) -> None:
+        """*Time phases and collect counts for a JSON report*.
+
+        Use it as a context manager, which traces memory allocations
+        with `tracemalloc` while it is open.
+        Tracing slows every phase down,
+        so only compare timings between profiled runs.
+        """
+        self._phases: list[dict[str, Any]] = []
+        self._counts: dict[str, int] = {}
+
+    def __enter__(self) -> "Self":
+        """*Start tracing allocations*."""
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """*Stop tracing allocations*."""
+        tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """*Measure the enclosed block as one phase*.
+
+        The peak includes memory still held from earlier phases.
+
+        Args:
+            name (str): *Phase name in the report*
+
+        Yields:
+            None: *Nothing*
+
+        """
+        tracemalloc.reset_peak()
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds: float = time.perf_counter() - start
+            peak: int = tracemalloc.get_traced_memory()[1]
+            self._phases.append(
+                {"phase": name, "seconds": seconds, "peak_bytes": peak},
+            )
+
+    def count(self, name: str, value: int) -> None:
+        """*Record a size, such as the number of tokens*.
+
+        Args:
+            name (str): *Count name in the report*
+            value (int): *Count*
+
+        """
+        self._counts[name] = value
+
+    def report(self, filename: str) -> dict[str, Any]:
+        """*Build the JSON-serializable report*.
+
+        Args:
+            filename (str): *Profiled file*
+
+        Returns:
+            dict[str, Any]: *Versions, counts and phases*
+
+        """
+        return {
+            "file": filename,
+            "quartz": VERSION,
+            "python": sys.version.split()[0],
+            **self._counts,
+            "phases": self._phases,
+            "total_seconds": sum(phase["seconds"] for phase in self._phases),
+        }
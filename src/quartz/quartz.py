@@ -5,22 +5,34 @@
 # IMPORTS
 ##############################
 import ast
+import json
 import sys
+from importlib.machinery import ModuleSpec
 from pathlib import Path
 from pprint import pprint
+from types import CodeType, ModuleType
 from typing import TYPE_CHECKING, Any, Literal
 
+from . import batch, build, cache, importer
+from .api import TOP_LEVEL_AWAIT, run_code
 from .astcompile import ASTCompile
 from .lexer import Lexer
+from .optimizer import DEFAULT_LEVEL, MAX_LEVEL, Optimizer
 from .parser import Parser
+from .profiler import PhaseProfiler
+from .repl import Repl
 
 if TYPE_CHECKING:
-    from types import CodeType
+    from collections.abc import Iterable, Iterator
 
     from .ast import Program
-    from .tokendef import Token
+    from .tokendef import Token, TokenStore
 
 NUM_OF_VALID_ARGS: Literal[2] = 2
+# Flags whose value may also be given as the next argument.
+VALUE_FLAGS: frozenset[str] = frozenset({"emit", "out", "jobs"})
+# Subcommands that compile whole trees without running them.
+CHECK_COMMANDS: frozenset[str] = frozenset({"check", "compile"})
 
 ##############################
 # ERROR & CLEAR TERMINAL
@@ -30,7 +42,9 @@ NUM_OF_VALID_ARGS: Literal[2] = 2
 class _NumberOfArgsError(Exception):
     def __init__(self) -> None:
         super().__init__(
-            "Usage: `quartz` `filename` [`flag`]",
+            "Usage: `quartz` [`filename`] [`flag`...]"
+            " | `quartz clean` [`path`] | `quartz build` `path` [`flag`...]"
+            " | `quartz check`|`compile` [`path`...] [`flag`...]",
         )
 
 
@@ -43,12 +57,19 @@ def _clear_terminal() -> None:
 ##############################
 
 
-def _quartz(program: str, filename: Path, *, debug: bool) -> None:
+def _compile(
+    program: str,
+    filename: Path,
+    *,
+    debug: bool,
+    optimize: int,
+) -> CodeType:
     if debug:
         print("File input:")
         print(program)
-    tokens: list[Token] = Lexer(program).get_tokens()
+    tokens: Iterable[Token] = Lexer(program, lazy=not debug).iter_tokens()
     if debug:
+        tokens = list(tokens)
         print("\n" + "Lexer:")
         pprint(tokens)
     prog: Program = Parser(tokens).get_program()
@@ -56,17 +77,208 @@ def _quartz(program: str, filename: Path, *, debug: bool) -> None:
         print("\n" + "Parser:")
         for stmt in prog.statements:
             pprint(stmt)
+    prog = Optimizer(prog, optimize).get_program()
+    if debug:
+        print("\n" + f"Optimizer (level {optimize}):")
+        for stmt in prog.statements:
+            pprint(stmt)
     module: ast.Module = ASTCompile(prog).get_module()
     if debug:
         print("\n" + "AST Compile:")
         print(ast.dump(module, indent=4))
-    ast.fix_missing_locations(module)
-    code: CodeType = compile(module, filename=filename, mode="exec")
+    return compile(
+        module,
+        filename=filename,
+        mode="exec",
+        flags=TOP_LEVEL_AWAIT,
+    )
+
+
+def _quartz(
+    program: str,
+    filename: Path,
+    *,
+    debug: bool,
+    use_cache: bool,
+    optimize: int,
+) -> None:
+    # Compiled with `TOP_LEVEL_AWAIT`, so kept apart from imports' entries.
+    code: CodeType | None = (
+        cache.load(filename, program, optimize=optimize, top_level_await=True)
+        if use_cache
+        else None
+    )
+    if code is None:
+        code = _compile(program, filename, debug=debug, optimize=optimize)
+        if use_cache:
+            cache.store(
+                filename,
+                program,
+                code,
+                optimize=optimize,
+                top_level_await=True,
+            )
     if debug:
         print("\n" + "Output:")
+    _run(code, filename, use_cache=use_cache, optimize=optimize)
+
+
+def _main_namespace(
+    directory: str,
+    *,
+    use_cache: bool,
+    optimize: int,
+) -> dict[str, Any]:
+    # Like Python scripts, a program can import modules beside it.
+    sys.path.insert(0, directory)
+    importer.install(use_cache=use_cache, optimize=optimize)
+    # A real `__main__` module lets worker processes unpickle
+    # the functions a program defines.
+    main_module: ModuleType = ModuleType("__main__")
+    # `multiprocessing` aliases them, so results find classes it defines.
+    sys.modules["__main__"] = sys.modules["__mp_main__"] = main_module
+    return main_module.__dict__
+
+
+def _run(
+    code: CodeType,
+    filename: Path,
+    *,
+    use_cache: bool,
+    optimize: int,
+) -> None:
+    namespace: dict[str, Any] = _main_namespace(
+        str(filename.resolve().parent),
+        use_cache=use_cache,
+        optimize=optimize,
+    )
+    namespace["__file__"] = str(filename)
+    # Named `__main__`, so spawned workers leave loading it to the loader.
+    namespace["__spec__"] = ModuleSpec(
+        "__main__",
+        importer.QuartzLoader(
+            "__main__",
+            str(filename),
+            use_cache=use_cache,
+            optimize=optimize,
+        ),
+        origin=str(filename),
+    )
+    run_code(code, namespace)
+
+
+def _repl(args: list[str]) -> None:
+    flags: dict[str, str] = _parse_flags(args)
+    optimize: int = _optimize(flags)
+    # `""` is the working directory, as in Python's REPL.
+    namespace: dict[str, Any] = _main_namespace(
+        "",
+        use_cache="no-cache" not in flags and cache.enabled(),
+        optimize=optimize,
+    )
+    Repl(namespace, optimize=optimize).interact()
+
+
+def _profile(program: str, filename: Path, optimize: int) -> dict[str, Any]:
+    # Every phase runs eagerly and uncached so it can be timed alone.
+    with PhaseProfiler() as profiler:
+        with profiler.phase("lex"):
+            tokens: TokenStore = Lexer(program).get_tokens()
+        with profiler.phase("parse"):
+            prog: Program = Parser(tokens).get_program()
+        with profiler.phase("optimize"):
+            prog = Optimizer(prog, optimize).get_program()
+        with profiler.phase("ast_compile"):
+            module: ast.Module = ASTCompile(prog).get_module()
+        with profiler.phase("compile"):
+            code: CodeType = compile(
+                module,
+                filename=filename,
+                mode="exec",
+                flags=TOP_LEVEL_AWAIT,
+            )
+        with profiler.phase("exec"):
+            _run(code, filename, use_cache=False, optimize=optimize)
+    profiler.count("optimize", optimize)
+    profiler.count("lines", program.count("\n") + 1)
+    profiler.count("tokens", len(tokens))
+    profiler.count("statements", len(prog.statements))
+    profiler.count("ast_nodes", sum(1 for _ in ast.walk(module)))
+    return profiler.report(str(filename))
 
-    custom_globals: dict[str, Any] = {}
-    exec(code, custom_globals)  # noqa: S102
+
+def _parse_flags(args: list[str]) -> dict[str, str]:
+    # `-flag` or `--flag`, optionally with `=value`.
+    flags: dict[str, str] = {}
+    remaining: Iterator[str] = iter(args)
+    for arg in remaining:
+        name, equals, value = arg.lstrip("-").partition("=")
+        if not equals and name in VALUE_FLAGS:
+            value = next(remaining, "")
+        flags[name] = value
+    return flags
+
+
+def _optimize(flags: dict[str, str]) -> int:
+    opt: str = flags.get("opt") or str(DEFAULT_LEVEL)
+    if not opt.isdigit() or int(opt) > MAX_LEVEL:
+        sys.exit(f"Error: -opt must be between 0 and {MAX_LEVEL}")
+    return int(opt)
+
+
+def _build(args: list[str]) -> None:
+    if not args or args[0].startswith("-"):
+        raise _NumberOfArgsError
+    root: Path = Path(args[0])
+    flags: dict[str, str] = _parse_flags(args[1:])
+    emit: str = flags.get("emit") or build.EMIT_FORMATS[0]
+    if emit not in build.EMIT_FORMATS:
+        formats: str = ", ".join(build.EMIT_FORMATS)
+        sys.exit(f"Error: -emit must be one of {formats}")
+    if not root.exists():
+        sys.exit(f"Error: File '{root}' not found")
+    out_dir: Path | None = Path(flags["out"]) if flags.get("out") else None
+    result: build.BuildResult = build.build(
+        root,
+        optimize=_optimize(flags),
+        out_dir=out_dir,
+    )
+    for path in result.written:
+        print(f"Wrote {path}")
+    print(f"Built {len(result.written)} file(s)")
+    if result.diagnostics:
+        print(
+            json.dumps(
+                [diagnostic._asdict() for diagnostic in result.diagnostics],
+                indent=4,
+            ),
+        )
+        sys.exit(1)
+
+
+def _check(command: str, args: list[str]) -> None:
+    # Paths come before the first flag, and default to here.
+    split: int = next(
+        (i for i, arg in enumerate(args) if arg.startswith("-")),
+        len(args),
+    )
+    roots: list[Path] = [Path(arg) for arg in args[:split]] or [Path()]
+    flags: dict[str, str] = _parse_flags(args[split:])
+    jobs: str = flags.get("jobs", "")
+    if jobs and (not jobs.isdigit() or int(jobs) < 1):
+        sys.exit("Error: -jobs must be a positive number")
+    for root in roots:
+        if not root.exists():
+            sys.exit(f"Error: File '{root}' not found")
+    report: dict[str, Any] = batch.check(
+        roots,
+        optimize=_optimize(flags),
+        write=command == "compile" and cache.enabled(),
+        jobs=int(jobs) if jobs else None,
+    )
+    print(json.dumps(report, indent=4))
+    if report[batch.FAILED]:
+        sys.exit(1)
 
 
 ##############################
@@ -79,7 +291,25 @@ def main(
 ) -> None:
     """*Use `quartz.py` in the command line*.
 
-    No interpreter mode yet.
+    Without a file, `quartz [-opt=N]` starts an interactive session
+    that compiles and runs one statement or block at a time.
+    A program that uses `await` outside any `async fn`
+    runs as a coroutine on an asyncio event loop.
+    Compiled code is cached in `__qrtzcache__` next to the file,
+    unless the `-no-cache` flag or `QUARTZ_NO_CACHE` is given.
+    `quartz clean [path]` deletes the cache.
+    `-profile-phases[=file]` writes per-phase timings, peak memory
+    and sizes as JSON to `file`, or to stderr.
+    `-opt=N` sets the optimization level, from 0 (none) to `MAX_LEVEL`.
+    `quartz build path [-emit=py] [-out=dir]` writes each program
+    as Python source, beside it or mirrored under `dir`,
+    skipping files already built from the same source;
+    files that fail, including any that await outside an `async fn`,
+    are printed as JSON, and it exits with 1.
+    `quartz check [path...] [-opt=N] [-jobs=N]` lexes, parses and
+    compiles every program without running it, over `N` processes,
+    and prints the results as JSON; `quartz compile` also fills
+    the cache. Either exits with 1 if any program has an error.
 
     Args:
         filename (str): *Path to Quartz file*
@@ -88,21 +318,50 @@ def main(
         _NumberOfArgsError: *Only takes two arguments*
 
     """
-    _clear_terminal()
-
     num_of_args: int = len(sys.argv)
-    if num_of_args < NUM_OF_VALID_ARGS:
-        raise _NumberOfArgsError
+    if not filename and (
+        num_of_args < NUM_OF_VALID_ARGS or sys.argv[1].startswith("-")
+    ):
+        _repl(sys.argv[1:])
+        return
+
+    if not filename and sys.argv[1] == "clean":
+        root: Path = (
+            Path(sys.argv[2]) if num_of_args > NUM_OF_VALID_ARGS else Path()
+        )
+        print(f"Removed {cache.clean(root)} cached file(s)")
+        return
+    if not filename and sys.argv[1] == "build":
+        _build(sys.argv[2:])
+        return
+    if not filename and sys.argv[1] in CHECK_COMMANDS:
+        _check(sys.argv[1], sys.argv[2:])
+        return
+
+    _clear_terminal()
 
     file: Path = Path(filename) if filename else Path(sys.argv[1])
-    debug: bool = (
-        bool(sys.argv[2] == "-debug")
-        if num_of_args > NUM_OF_VALID_ARGS
-        else False
-    )
+    flags: dict[str, str] = _parse_flags(sys.argv[2:])
+    debug: bool = "debug" in flags
+    use_cache: bool = not debug and "no-cache" not in flags and cache.enabled()
+    optimize: int = _optimize(flags)
     try:
         with Path.open(file, encoding="utf8") as f:
-            _quartz(f.read(), file, debug=debug)
+            program: str = f.read()
+        if "profile-phases" not in flags:
+            _quartz(
+                program,
+                file,
+                debug=debug,
+                use_cache=use_cache,
+                optimize=optimize,
+            )
+            return
+        report: str = json.dumps(_profile(program, file, optimize), indent=4)
+        if flags["profile-phases"]:
+            Path(flags["profile-phases"]).write_text(report + "\n")
+        else:
+            print(report, file=sys.stderr)
     except FileNotFoundError:
         sys.exit(
             f"Error: File '{sys.argv[1]}' not found",
@@ -0,0 +1,210 @@
+"""*The interactive interpreter for the Quartz programming language*."""
+
+##############################
+# IMPORTS
+##############################
+
+import ast
+import sys
+import traceback
+from contextlib import suppress
+from types import CodeType, TracebackType
+from typing import TYPE_CHECKING, Any
+
+from .api import TOP_LEVEL_AWAIT, run_code
+from .astcompile import ASTCompile
+from .cache import VERSION
+from .lexer import Lexer
+from .optimizer import DEFAULT_LEVEL, Optimizer
+from .parser import Parser
+from .tokendef import Error, Tag, TokenStore
+
+if TYPE_CHECKING:
+    from .ast import Program
+
+with suppress(ImportError):
+    # Line editing and history for `input`, where available.
+    import readline  # noqa: F401
+
+##############################
+# SET CONSTANTS
+##############################
+
+PS1: str = ">>> "
+PS2: str = "... "
+BANNER: str = (
+    "Quartz {version} on Python {python}\n"
+    "Enter a blank line to end a block, and Ctrl-D to exit."
+)
+FILENAME: str = "<stdin>"
+
+##############################
+# MAIN CLASS
+##############################
+
+
+class Repl:
+    """*A read-eval-print loop over one long-lived namespace*."""
+
+    def __init__(
+        self,
+        namespace: dict[str, Any] | None = None,
+        *,
+        optimize: int = DEFAULT_LEVEL,
+        filename: str = FILENAME,
+    ) -> None:
+        """*Run Quartz one statement or block at a time*.
+
+        Each entry is lexed, parsed and compiled on its own,
+        and run in the same namespace as every entry before it,
+        so the time an entry takes does not grow with the session.
+        An entry that awaits runs on a new asyncio event loop.
+
+        Args:
+            namespace (dict[str, Any] | None): *Globals, or a new dict*
+            optimize (int): *Optimization level*
+            filename (str): *Name used in tracebacks*
+
+        """
+        self._namespace: dict[str, Any] = (
+            {"__name__": "__main__"} if namespace is None else namespace
+        )
+        self._optimize: int = optimize
+        self._filename: str = filename
+        self._compiler: ASTCompile = ASTCompile()
+        # Lines of the entry being typed.
+        self._lines: list[str] = []
+
+    ##########################
+    # Main Functions
+    ##########################
+
+    def interact(self, banner: str | None = None) -> None:
+        """*Read entries from standard input until end of file*.
+
+        Args:
+            banner (str | None): *Printed first, or `BANNER` if `None`*
+
+        """
+        print(
+            BANNER.format(
+                version=VERSION,
+                python=sys.version.split()[0],
+            )
+            if banner is None
+            else banner,
+        )
+        more: bool = False
+        while True:
+            try:
+                line: str = input(PS2 if more else PS1)
+            except EOFError:
+                print()
+                return
+            except KeyboardInterrupt:
+                print("\nKeyboardInterrupt")
+                self.reset()
+                more = False
+                continue
+            more = self.push(line)
+
+    def push(self, line: str) -> bool:
+        """*Add a line to the entry, running the entry once it is whole*.
+
+        Errors are printed, not raised, and drop the entry.
+
+        Args:
+            line (str): *One line of input, without its newline*
+
+        Returns:
+            bool: *Whether the entry needs more lines*
+
+        """
+        self._lines.append(line)
+        if not any(map(str.strip, self._lines)):
+            self.reset()
+            return False
+        try:
+            code: CodeType | None = self.compile_entry(
+                "\n".join(self._lines),
+                final=not line.strip(),
+            )
+        except Error as error:
+            self.reset()
+            print(f"{type(error).__name__.lstrip('_')}: {error}")
+            return False
+        except SyntaxError as error:
+            # From CPython's compiler, e.g. `yield` outside a `fn`.
+            self.reset()
+            traceback.print_exception(type(error), error, None)
+            return False
+        if code is None:
+            return True
+        self.reset()
+        self.run(code)
+        return False
+
+    def reset(self) -> None:
+        """*Drop the lines of the entry being typed*."""
+        self._lines.clear()
+
+    def compile_entry(self, entry: str, *, final: bool) -> CodeType | None:
+        """*Compile one entry, unless it is still being typed*.
+
+        An entry with an `INDENT` is a block,
+        which the blank line that ends it closes with `DEDENT`s.
+        Any other entry is whole once it parses,
+        or still being typed while it only fails at its end,
+        like an unclosed bracket or a block header.
+        `final` entries are compiled no matter what.
+
+        Args:
+            entry (str): *Lines typed so far*
+            final (bool): *Whether the last line was blank*
+
+        Returns:
+            CodeType | None: *Code printing each expression's value,
+            or `None` if more lines are needed*
+
+        Raises:
+            Error: *If the entry is wrong, not just unfinished*
+
+        """
+        tokens: TokenStore = Lexer(entry).get_tokens()
+        if not final and any(token.tag is Tag.INDENT for token in tokens):
+            return None
+        try:
+            prog: Program = Parser(tokens).get_program()
+        except Error as error:
+            # Past the last line is only reached by unfinished entries.
+            if not final and error.offset > len(entry):
+                return None
+            raise
+        prog = Optimizer(prog, self._optimize).get_program()
+        module: ast.Module = self._compiler.compile_module(prog)
+        return compile(
+            ast.Interactive(module.body),
+            filename=self._filename,
+            mode="single",
+            flags=TOP_LEVEL_AWAIT,
+        )
+
+    def run(self, code: CodeType) -> None:
+        """*Run compiled code in the namespace, printing any traceback*.
+
+        Args:
+            code (CodeType): *An entry compiled by `compile_entry`*
+
+        """
+        try:
+            run_code(code, self._namespace)
+        except SystemExit:
+            raise
+        except BaseException as error:  # noqa: BLE001
+            # Leave out the frames that ran the entry, like Python's REPL.
+            tb: TracebackType | None = error.__traceback__
+            while tb is not None and (
+                tb.tb_frame.f_code.co_filename != self._filename
+            ):
+                tb = tb.tb_next
+            traceback.print_exception(type(error), error, tb)
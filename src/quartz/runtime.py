@@ -0,0 +1,450 @@
+"""*Runtime support for compiled Quartz programs*."""
+
+##############################
+# IMPORTS
+##############################
+
+import multiprocessing
+import os
+import sys
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache, update_wrapper
+from itertools import islice
+from operator import attrgetter
+from time import monotonic
+from typing import Any, Literal, NamedTuple
+
+##############################
+# SET CONSTANTS
+##############################
+
+EXECUTORS: tuple[str, ...] = ("process", "thread")
+# Chunks submitted ahead of the consumer, so memory stays bounded
+# even for an endless iterable.
+CHUNKS_IN_FLIGHT_PER_WORKER: int = 2
+DEFAULT_MEMO_SIZE: int = 128
+# Separates positional from keyword arguments in memo keys.
+KWARGS_MARK: object = object()
+
+##############################
+# PIPE STAGES
+##############################
+
+# Stages are plain classes rather than closures so that
+# process pools can pickle them.
+
+
+class Apply:
+    """*The pipe stage `~> func(*args, **kwargs)`*."""
+
+    __slots__ = ("args", "func", "kwargs")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        /,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """*Call `func` with the element as its first argument*.
+
+        Args:
+            func (Callable[..., Any]): *Stage function*
+            *args (Any): *Arguments after the element*
+            **kwargs (Any): *Keyword arguments*
+
+        """
+        self.func: Callable[..., Any] = func
+        self.args: tuple[Any, ...] = args
+        self.kwargs: dict[str, Any] = kwargs
+
+    def __call__(self, item: Any) -> Any:  # noqa: ANN401
+        """*Apply the stage to one element*."""
+        return self.func(item, *self.args, **self.kwargs)
+
+
+class CallMethod:
+    """*The pipe stage `~> .name(*args, **kwargs)`*."""
+
+    __slots__ = ("args", "kwargs", "name")
+
+    def __init__(
+        self,
+        name: str,
+        /,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """*Call the element's (possibly dotted) attribute `name`*.
+
+        Args:
+            name (str): *Attribute path, such as `"strip"` or `"a.b"`*
+            *args (Any): *Arguments*
+            **kwargs (Any): *Keyword arguments*
+
+        """
+        self.name: str = name
+        self.args: tuple[Any, ...] = args
+        self.kwargs: dict[str, Any] = kwargs
+
+    def __call__(self, item: Any) -> Any:  # noqa: ANN401
+        """*Apply the stage to one element*."""
+        return attrgetter(self.name)(item)(*self.args, **self.kwargs)
+
+
+class Chain:
+    """*Several pipe stages applied in order*."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self, *stages: Callable[[Any], Any]) -> None:
+        """*Feed each stage's result into the next*.
+
+        Args:
+            *stages (Callable[[Any], Any]): *Stages, first to last*
+
+        """
+        self.stages: tuple[Callable[[Any], Any], ...] = stages
+
+    def __call__(self, item: Any) -> Any:  # noqa: ANN401
+        """*Apply every stage to one element*."""
+        for stage in self.stages:
+            item = stage(item)
+        return item
+
+
+##############################
+# PARALLEL MAP
+##############################
+
+
+def _apply_chunk(
+    func: Callable[[Any], Any],
+    chunk: list[Any],
+) -> list[Any]:
+    return [func(item) for item in chunk]
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator: Iterator[Any] = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _pool(executor: str, workers: int) -> Executor:
+    if executor == "thread":
+        return ThreadPoolExecutor(workers)
+    # Pools use the platform's start method. Unless they fork,
+    # workers start without a Quartz `__main__`,
+    # which its loader then runs in each (see `QuartzLoader.init_worker`).
+    initializer: Callable[[], None] | None = None
+    if multiprocessing.get_start_method() != "fork":
+        spec: Any = getattr(sys.modules["__main__"], "__spec__", None)
+        initializer = getattr(spec and spec.loader, "init_worker", None)
+    return ProcessPoolExecutor(workers, initializer=initializer)
+
+
+def _ordered(
+    pool: Executor,
+    func: Callable[[Any], Any],
+    chunks: Iterator[list[Any]],
+    limit: int,
+) -> Iterator[Any]:
+    in_flight: deque[Future[list[Any]]] = deque(
+        pool.submit(_apply_chunk, func, chunk)
+        for chunk in islice(chunks, limit)
+    )
+    while in_flight:
+        results: list[Any] = in_flight.popleft().result()
+        # Refill before yielding, so workers stay busy meanwhile.
+        in_flight.extend(
+            pool.submit(_apply_chunk, func, chunk)
+            for chunk in islice(chunks, 1)
+        )
+        yield from results
+
+
+def _unordered(
+    pool: Executor,
+    func: Callable[[Any], Any],
+    chunks: Iterator[list[Any]],
+    limit: int,
+) -> Iterator[Any]:
+    in_flight: set[Future[list[Any]]] = {
+        pool.submit(_apply_chunk, func, chunk)
+        for chunk in islice(chunks, limit)
+    }
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        in_flight.update(
+            pool.submit(_apply_chunk, func, chunk)
+            for chunk in islice(chunks, len(done))
+        )
+        for future in done:
+            yield from future.result()
+
+
+def parallel_map(  # noqa: PLR0913
+    func: Callable[[Any], Any],
+    iterable: Iterable[Any],
+    *,
+    workers: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    executor: Literal["process", "thread"] = "thread",
+) -> Iterator[Any]:
+    """*Map `func` over `iterable` in a pool; the `|...|` pipeline*.
+
+    Nothing runs until the result is iterated.
+    At most `CHUNKS_IN_FLIGHT_PER_WORKER` chunks per worker
+    are taken from `iterable` ahead of the consumer,
+    so it may be endless.
+    The pool is shut down once the result is exhausted or closed,
+    cancelling chunks that have not started.
+
+    Process pools need `func` and the elements to be picklable,
+    so stage functions should be defined at module level.
+    Where workers are spawned rather than forked, as on macOS,
+    they run the program again first, like Python programs,
+    so a program's own work belongs under `if __name__ == "__main__"`.
+
+    Args:
+        func (Callable[[Any], Any]): *Stage applied to each element*
+        iterable (Iterable[Any]): *Elements*
+        workers (int | None): *Pool size, or one per core*
+        chunksize (int): *Elements sent to a worker at a time*
+        ordered (bool): *Keep input order, or yield results as they finish*
+        executor (Literal["process", "thread"]): *Kind of pool*
+
+    Yields:
+        Any: *`func(element)` for each element*
+
+    Raises:
+        ValueError: *Unknown `executor`, or `workers` or `chunksize`
+        below 1*
+
+    """
+    if executor not in EXECUTORS:
+        msg: str = f"Unknown executor {executor!r}"
+        raise ValueError(msg)
+    if chunksize < 1:
+        msg: str = f"chunksize must be at least 1, got {chunksize}"
+        raise ValueError(msg)
+    size: int = (os.cpu_count() or 1) if workers is None else workers
+    if size < 1:
+        msg: str = f"workers must be at least 1, got {size}"
+        raise ValueError(msg)
+    chunks: Iterator[list[Any]] = _chunks(iterable, chunksize)
+    limit: int = size * CHUNKS_IN_FLIGHT_PER_WORKER
+    with _pool(executor, size) as pool:
+        try:
+            yield from (_ordered if ordered else _unordered)(
+                pool,
+                func,
+                chunks,
+                limit,
+            )
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+##############################
+# AWAITED STAGES
+##############################
+
+
+async def gather(*stages: Awaitable[Any]) -> list[Any]:
+    """*Await the stages of `-> await (f, g, ...)` concurrently*.
+
+    Args:
+        *stages (Awaitable[Any]): *One awaitable per stage*
+
+    Returns:
+        list[Any]: *Their results, in stage order*
+
+    """
+    # Only imported here, since it doubles the cost of importing this.
+    import asyncio  # noqa: PLC0415
+
+    return await asyncio.gather(*stages)
+
+
+##############################
+# DECORATORS
+##############################
+
+
+def no_tail_calls(func: Callable[..., Any]) -> Callable[..., Any]:
+    """*Keep a `fn` recursive at optimization level 2*.
+
+    The optimizer leaves every decorated `fn` recursive,
+    since a decorator may rebind its name;
+    this one does nothing else.
+
+    Args:
+        func (Callable[..., Any]): *Function*
+
+    Returns:
+        Callable[..., Any]: *The same function*
+
+    """
+    return func
+
+
+##############################
+# MEMOIZATION
+##############################
+
+
+class MemoInfo(NamedTuple):
+    """*Statistics for a `Memoized` function, like `functools.lru_cache`'s*."""
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+class Memoized:
+    """*A function whose results are cached for `ttl` seconds*."""
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        maxsize: int | None,
+        ttl: float,
+    ) -> None:
+        """*Cache results by arguments, evicting the least recently used*.
+
+        Calling `func` happens outside the lock,
+        so recursive functions work,
+        and a result computed by two threads at once is cached once.
+
+        Args:
+            func (Callable[..., Any]): *Function with hashable arguments*
+            maxsize (int | None): *Most results kept, or `None` for all*
+            ttl (float): *Seconds a result stays fresh*
+
+        """
+        update_wrapper(self, func)
+        self._func: Callable[..., Any] = func
+        self._maxsize: int | None = maxsize
+        self._ttl: float = ttl
+        # Results and when they expire, least recently used first.
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        """*Return the cached result, calling the function on a miss*."""
+        key: Hashable = (
+            (*args, KWARGS_MARK, *kwargs.items()) if kwargs else args
+        )
+        with self._lock:
+            entry: tuple[Any, float] | None = self._entries.get(key)
+            if entry is not None and entry[1] > monotonic():
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            self._misses += 1
+        value: Any = self._func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (value, monotonic() + self._ttl)
+            self._entries.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._entries) > self._maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def __reduce__(self) -> str:
+        """*Pickle by name, like the function it replaces*.
+
+        So a `Memoized` function can be a stage of a process pool.
+
+        Returns:
+            str: *Qualified name of the function*
+
+        """
+        return self.__qualname__
+
+    def cache_info(self) -> MemoInfo:
+        """*Report hits, misses and the number of fresh results*.
+
+        Returns:
+            MemoInfo: *Current statistics*
+
+        """
+        now: float = monotonic()
+        with self._lock:
+            for key in [
+                key
+                for key, (_, expires) in self._entries.items()
+                if expires <= now
+            ]:
+                del self._entries[key]
+            return MemoInfo(
+                self._hits,
+                self._misses,
+                self._maxsize,
+                len(self._entries),
+            )
+
+    def cache_clear(self) -> None:
+        """*Drop every result and reset the statistics*."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+def memoize(
+    func: Callable[..., Any] | None = None,
+    /,
+    *,
+    maxsize: int | None = DEFAULT_MEMO_SIZE,
+    ttl: float | None = None,
+) -> Callable[..., Any]:
+    """*Cache a pure function's results; `@memoize` or `@memoize(...)`*.
+
+    Without a `ttl` this is `functools.lru_cache`,
+    whose lookups run in C.
+    Either way the function gains `cache_info()`,
+    reporting `hits`, `misses`, `maxsize` and `currsize`,
+    and `cache_clear()`.
+
+    Args:
+        func (Callable[..., Any] | None): *Function to cache,
+        or `None` to get a decorator*
+        maxsize (int | None): *Most results kept, or `None` for all*
+        ttl (float | None): *Seconds a result stays fresh,
+        or `None` for ever*
+
+    Returns:
+        Callable[..., Any]: *The cached function, or a decorator*
+
+    Raises:
+        ValueError: *Negative `maxsize`, or `ttl` not above 0*
+
+    """
+    if maxsize is not None and maxsize < 0:
+        msg: str = f"maxsize must not be negative, got {maxsize}"
+        raise ValueError(msg)
+    if ttl is not None and ttl <= 0:
+        msg: str = f"ttl must be above 0, got {ttl}"
+        raise ValueError(msg)
+    if func is None:
+        return lambda func: memoize(func, maxsize=maxsize, ttl=ttl)
+    if ttl is None:
+        return lru_cache(maxsize)(func)
+    return Memoized(func, maxsize, ttl)
@@ -4,6 +4,9 @@
 # IMPORTS
 ##############################
 
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
 from enum import Enum
 from textwrap import dedent
 from typing import NamedTuple
@@ -24,32 +27,45 @@ class Tag(Enum):
     AMPERSAND_EQUAL = "&="
     ARROW = "->"
     ARROW_EQUAL = "->="
+    AS = "as"
     ASTERISK = "*"
     ASTERISK_EQUAL = "*="
+    ASYNC = "async"
     AT_SIGN = "@"
+    AWAIT = "await"
     BANG_EQUAL = "!="
+    BREAK = "break"
     CARET = "^"
     CARET_EQUAL = "^="
+    CASE = "case"
+    CLASS = "class"
     COLON = ":"
     COLON_EQUAL = ":="
     COMMA = ","
+    CONTINUE = "continue"
     DEDENT = "DEDENT"
+    DEL = "del"
     DOCSTRING = "DOCSTRING"
     DOLLAR_L_BRACE = "${"
     ELLIPSIS = "..."
+    ELSE = "else"
     EOF = "EOF"
     EQUAL = "="
     EQUAL_ARROW = "=>"
     EQUAL_EQUAL = "=="
     FALSE = "False"
     FLOAT = "FLOAT"
+    FN = "fn"
+    FOR = "for"
+    FROM = "from"
     IDENT = "IDENTIFIER"
+    IF = "if"
+    IMPORT = "import"
     IN = "in"
     INDENT = "INDENT"
     INTEGER = "INTEGER"
     IS = "is"
     IS_NOT = "is not"
-    KEYWORD = "KEYWORD"
     L_ANGLE = "<"
     L_ANGLE_EQUAL = "<="
     L_ANGLE_L_ANGLE = "<<"
@@ -59,6 +75,7 @@ class Tag(Enum):
     L_BRACE = "{"
     L_BRACKET = "["
     L_PAREN = "("
+    MATCH = "match"
     MINUS = "-"
     MINUS_EQUAL = "-="
     NEWLINE = "NEWLINE"
@@ -75,6 +92,7 @@ class Tag(Enum):
     PIPE_EQUAL = "|="
     PLUS = "+"
     PLUS_EQUAL = "+="
+    RAISE = "raise"
     R_ANGLE = ">"
     R_ANGLE_EQUAL = ">="
     R_ANGLE_R_ANGLE = ">>"
@@ -91,6 +109,106 @@ class Tag(Enum):
     TILDE_ARROW = "~>"
     TILDE_EQUAL = "~="
     TRUE = "True"
+    UNLESS = "unless"
+    UNTIL = "until"
+    WHILE = "while"
+    YIELD = "yield"
+
+
+# Tags by their integer id, and vice versa.
+TAGS: tuple[Tag, ...] = tuple(Tag)
+TAG_IDS: dict[Tag, int] = {tag: i for i, tag in enumerate(TAGS)}
+
+##############################
+# SOURCE
+##############################
+
+
+class Source:
+    """*A Quartz program and the offsets where its lines start*.
+
+    The line table is only built once a position is asked for.
+    """
+
+    __slots__ = ("_ascii", "_line_starts", "program")
+
+    def __init__(self, program: str) -> None:
+        """*Wrap a Quartz program*.
+
+        Args:
+            program (str): *File input*
+
+        """
+        self.program: str = program
+        self._line_starts: array[int] | None = None
+        # Whether columns in characters and in UTF-8 bytes agree.
+        self._ascii: bool = program.isascii()
+
+    def __repr__(self) -> str:
+        """*Keep the program out of token reprs*."""
+        return f"Source(<{len(self.program)} characters>)"
+
+    def _get_line_starts(self) -> "array[int]":
+        if self._line_starts is None:
+            self._line_starts = array("i", [0])
+            i: int = self.program.find("\n")
+            while i != -1:
+                self._line_starts.append(i + 1)
+                i = self.program.find("\n", i + 1)
+        return self._line_starts
+
+    def locate(self, offset: int) -> tuple[int, int]:
+        """*Find the line and column of an offset*.
+
+        Args:
+            offset (int): *Index into the program*
+
+        Returns:
+            tuple[int, int]: *Line and column, both starting at 1*
+
+        """
+        line_starts: array[int] = self._get_line_starts()
+        ln: int = bisect_right(line_starts, offset)
+        return (ln, offset - line_starts[ln - 1] + 1)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """*Find an offset as Python AST positions count it*.
+
+        Args:
+            offset (int): *Index into the program*
+
+        Returns:
+            tuple[int, int]: *Line from 1, and UTF-8 byte column from 0*
+
+        """
+        line_starts: array[int] = self._line_starts or self._get_line_starts()
+        ln: int = bisect_right(line_starts, offset)
+        col: int = offset - line_starts[ln - 1]
+        if self._ascii:
+            return (ln, col)
+        return (ln, len(self.program[offset - col : offset].encode()))
+
+    def line(self, offset: int) -> str:
+        """*Return the line containing an offset, with spaces as `·`*.
+
+        The end of the program counts as part of the last line.
+
+        Args:
+            offset (int): *Index into the program*
+
+        Returns:
+            str: *Source line*
+
+        """
+        line_starts: array[int] = self._get_line_starts()
+        i: int = bisect_right(line_starts, offset) - 1
+        if offset >= len(self.program) and i > 0:
+            i -= 1
+        start: int = line_starts[i]
+        end: int = self.program.find("\n", start)
+        if end == -1:
+            end = len(self.program)
+        return self.program[start:end].replace(" ", "·")
 
 
 ##############################
@@ -99,13 +217,140 @@ class Tag(Enum):
 
 
 class Token(NamedTuple):
-    """A Quartz token."""
+    """A Quartz token.
+
+    `tok` is `source.program[start:end]`,
+    and the token is positioned at `end`.
+    """
 
     tag: Tag
     tok: str
-    ln: int
-    col: int
-    line: str
+    start: int
+    end: int
+    source: Source
+    # `TAG_IDS[tag]`, for cheap table lookups.
+    kind: int
+
+    def __repr__(self) -> str:
+        """*Show the token with its position*."""
+        return f"Token({self.tag}, {self.tok!r}, ln={self.ln}, col={self.col})"
+
+    @property
+    def ln(self) -> int:
+        """*Line number*."""
+        return self.source.locate(self.end)[0]
+
+    @property
+    def col(self) -> int:
+        """*Column number*."""
+        return self.source.locate(self.end)[1]
+
+    @property
+    def line(self) -> str:
+        """*Source line, with spaces as `·`*."""
+        return self.source.line(self.end)
+
+
+class TokenStore:
+    """*Compact storage for the tokens of one `Source`*.
+
+    Tokens are kept in parallel `array("i")` columns
+    and are only built into `Token`s when read.
+    """
+
+    __slots__ = ("_ends", "_starts", "_tags", "source")
+
+    def __init__(self, source: Source) -> None:
+        """*Create an empty store*.
+
+        Args:
+            source (Source): *Program the tokens point into*
+
+        """
+        self.source: Source = source
+        self._tags: array[int] = array("i")
+        self._starts: array[int] = array("i")
+        self._ends: array[int] = array("i")
+
+    def __len__(self) -> int:
+        """*Return the number of tokens*."""
+        return len(self._tags)
+
+    def __getitem__(self, index: int) -> Token:
+        """*Build the token at an index*."""
+        start: int = self._starts[index]
+        end: int = self._ends[index]
+        kind: int = self._tags[index]
+        return Token(
+            TAGS[kind],
+            self.source.program[start:end],
+            start,
+            end,
+            self.source,
+            kind,
+        )
+
+    def __delitem__(self, index: int | slice) -> None:
+        """*Remove tokens*."""
+        del self._tags[index]
+        del self._starts[index]
+        del self._ends[index]
+
+    def __iter__(self) -> Iterator[Token]:
+        """*Build every token in order*."""
+        program: str = self.source.program
+        for kind, start, end in zip(
+            self._tags,
+            self._starts,
+            self._ends,
+            strict=True,
+        ):
+            yield Token(
+                TAGS[kind],
+                program[start:end],
+                start,
+                end,
+                self.source,
+                kind,
+            )
+
+    def append(self, tag: Tag, start: int, end: int) -> None:
+        """*Add a token*.
+
+        Args:
+            tag (Tag): *Token tag*
+            start (int): *Start of `tok` in the program*
+            end (int): *End of `tok`, where the token is positioned*
+
+        """
+        self._tags.append(TAG_IDS[tag])
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def appenders(self) -> tuple[Callable[[int], None], ...]:
+        """*Get the appends of each column, for adding tokens in bulk*.
+
+        A scanner calls them in turn for each token,
+        with `TAG_IDS[tag]`, `start` and `end`,
+        so neither a method call nor a `Tag` hash happens per token.
+
+        Returns:
+            tuple[Callable[[int], None], ...]: *Kind, start and end appends*
+
+        """
+        return self._tags.append, self._starts.append, self._ends.append
+
+    def kind(self, index: int) -> int:
+        """*Get the kind of the token at an index, without building it*.
+
+        Args:
+            index (int): *Token index*
+
+        Returns:
+            int: *`TAG_IDS[tag]` of the token's tag*
+
+        """
+        return self._tags[index]
 
 
 ##############################
@@ -118,12 +363,24 @@ class Error(Exception):
 
     def __init__(
         self,
-        ln: int,
-        col: int,
-        line: str,
+        source: Source,
+        offset: int,
         message: str = "",
     ) -> None:
-        """Raise an Error."""
+        """Raise an Error.
+
+        The line and caret are only rendered here,
+        so tokens never need to carry them.
+        `offset`, its line and column and the bare message are kept,
+        e.g. for the REPL to tell an unfinished entry from a wrong one,
+        or to report errors as JSON.
+        """
+        self.offset: int = offset
+        ln, col = source.locate(offset)
+        self.ln: int = ln
+        self.col: int = col
+        self.message: str = dedent(message)
+        line: str = source.line(offset)
         pointer: str = " " * col
         pointer: str = pointer[:-2] + "^"
         super().__init__(
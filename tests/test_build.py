@@ -0,0 +1,78 @@
+"""*Tests for ahead-of-time builds of Quartz programs*."""
+
+##############################
+# IMPORTS
+##############################
+
+import subprocess
+import sys
+from pathlib import Path
+
+from quartz.build import TOP_LEVEL_AWAIT_MESSAGE, BuildResult, build
+
+##############################
+# BUILD
+##############################
+
+
+def _tree(root: Path) -> None:
+    (root / "pkg").mkdir()
+    (root / "good.qrtz").write_text("1 -> print\n", encoding="utf8")
+    (root / "pkg" / "bad.qrtz").write_text("x = (\n", encoding="utf8")
+    (root / "pkg" / "later.qrtz").write_text("2 -> print\n", encoding="utf8")
+
+
+def test_build_skips_failing_files(tmp_path: Path) -> None:
+    """*A file that fails to parse is reported, and the rest still built*."""
+    _tree(tmp_path)
+    result: BuildResult = build(tmp_path, optimize=1)
+    assert result.written == [
+        tmp_path / "good.py",
+        tmp_path / "pkg" / "later.py",
+    ]
+    assert not (tmp_path / "pkg" / "bad.py").exists()
+    [diagnostic] = result.diagnostics
+    assert diagnostic.path == str(tmp_path / "pkg" / "bad.qrtz")
+    assert diagnostic.error == "ParserError"
+    assert diagnostic.line is not None
+
+
+def test_build_compiles_before_writing(tmp_path: Path) -> None:
+    """*A program CPython rejects is reported, not written*."""
+    (tmp_path / "y.qrtz").write_text("yield 1\n", encoding="utf8")
+    result: BuildResult = build(tmp_path, optimize=1)
+    assert result.written == []
+    assert not (tmp_path / "y.py").exists()
+    [diagnostic] = result.diagnostics
+    assert diagnostic.error == "SyntaxError"
+    assert diagnostic.message == "'yield' outside function"
+    assert diagnostic.line == 1
+
+
+def test_build_rejects_top_level_await(tmp_path: Path) -> None:
+    """*A program that only runs as a main program is not built*."""
+    (tmp_path / "m.qrtz").write_text(
+        "async fn f()\n    1 <<<\n\nprint(await f())\n",
+        encoding="utf8",
+    )
+    result: BuildResult = build(tmp_path, optimize=1)
+    assert not (tmp_path / "m.py").exists()
+    [diagnostic] = result.diagnostics
+    assert diagnostic.message == TOP_LEVEL_AWAIT_MESSAGE
+    assert diagnostic.line == 4  # noqa: PLR2004
+
+
+def test_build_command_fails_on_a_bad_file(tmp_path: Path) -> None:
+    """*`quartz build` reports the failure and exits with status 1*."""
+    _tree(tmp_path)
+    process: subprocess.CompletedProcess[str] = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "quartz", "build", str(tmp_path)],
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=60,
+    )
+    assert process.returncode == 1
+    assert "Built 2 file(s)" in process.stdout
+    assert '"error": "ParserError"' in process.stdout
+    assert (tmp_path / "pkg" / "later.py").exists()
@@ -0,0 +1,97 @@
+"""*Tests for the compiled-code cache*."""
+
+##############################
+# IMPORTS
+##############################
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from quartz import cache
+
+##############################
+# SET CONSTANTS
+##############################
+
+# Awaits at the top level, so it only runs as a main program.
+MAIN: str = """
+import asyncio
+
+await asyncio.sleep(0)
+answer = 42
+"""
+
+PLAIN: str = """
+answer = 42
+"""
+
+IMPORT: str = """
+import sys
+
+from quartz import importer
+
+sys.path.insert(0, ".")
+importer.install()
+import amod
+
+print(amod.answer)
+"""
+
+##############################
+# MAIN PROGRAMS AND MODULES
+##############################
+
+
+def _python(path: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(  # noqa: S603
+        [sys.executable, *args],
+        cwd=path,
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=60,
+    )
+
+
+@pytest.mark.parametrize(
+    "command",
+    [["amod.qrtz"], ["compile", "amod.qrtz"]],
+)
+def test_main_program_code_is_not_imported(
+    tmp_path: Path,
+    command: list[str],
+) -> None:
+    """*Importing never runs code cached for `quartz amod.qrtz`*."""
+    (tmp_path / "amod.qrtz").write_text(MAIN, encoding="utf8")
+    assert _python(tmp_path, "-m", "quartz", *command).returncode == 0
+    [entry] = (tmp_path / cache.CACHE_DIR).iterdir()
+    assert entry.name.endswith(cache.TOP_LEVEL_AWAIT_TAG + cache.CACHE_SUFFIX)
+    # Like in Python, only a main program can await at the top level.
+    process: subprocess.CompletedProcess[str] = _python(
+        tmp_path,
+        "-c",
+        IMPORT,
+    )
+    assert process.returncode == 1
+    assert "'await' outside function" in process.stderr
+
+
+def test_run_then_import(tmp_path: Path) -> None:
+    """*A program run as `__main__` can be imported afterwards*."""
+    (tmp_path / "amod.qrtz").write_text(PLAIN, encoding="utf8")
+    assert _python(tmp_path, "-m", "quartz", "amod.qrtz").returncode == 0
+    process: subprocess.CompletedProcess[str] = _python(
+        tmp_path,
+        "-c",
+        IMPORT,
+    )
+    assert process.stdout == "42\n"
+    # One entry for each way it was compiled.
+    tags: set[bool] = {
+        entry.name.endswith(cache.TOP_LEVEL_AWAIT_TAG + cache.CACHE_SUFFIX)
+        for entry in (tmp_path / cache.CACHE_DIR).iterdir()
+    }
+    assert tags == {True, False}
@@ -0,0 +1,66 @@
+"""*Tests for decorated `fn`s and the `memoize` helper*."""
+
+##############################
+# IMPORTS
+##############################
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from quartz.api import run
+from quartz.runtime import DEFAULT_MEMO_SIZE, MemoInfo, memoize
+
+##############################
+# SET CONSTANTS
+##############################
+
+SOURCE: Path = Path(__file__).parent / "decorator_test.qrtz"
+
+##############################
+# DECORATORS
+##############################
+
+
+@pytest.fixture(scope="module")
+def namespace() -> dict[str, Any]:
+    """*Run `decorator_test.qrtz` once for every test here*."""
+    return run(SOURCE.read_text(encoding="utf8"), filename=str(SOURCE))
+
+
+def test_memoize_decorates_fn(namespace: dict[str, Any]) -> None:
+    """*`@memoize` on a recursive `fn` computes each result once*."""
+    assert namespace["fib"](30) == 832040  # noqa: PLR2004
+    info: MemoInfo = namespace["fib"].cache_info()
+    assert info.misses == 31  # noqa: PLR2004
+
+
+def test_memoize_with_arguments_evicts(namespace: dict[str, Any]) -> None:
+    """*`@memoize(maxsize=2, ttl=60)` keeps the two most recent results*."""
+    assert namespace["calls"] == [1, 2, 3]
+    assert namespace["square"].cache_info() == MemoInfo(2, 3, 2, 2)
+
+
+def test_decorators_stack(namespace: dict[str, Any]) -> None:
+    """*Decorators apply bottom up: `inc` is memoized, then applied twice*."""
+    assert namespace["inc"](1) == 3  # noqa: PLR2004
+    assert namespace["inc"].__name__ == "wrapper"
+
+
+def test_no_tail_calls_keeps_fn(namespace: dict[str, Any]) -> None:
+    """*`@no_tail_calls` returns the `fn` it decorates unchanged*."""
+    assert namespace["countdown"](10) == 0
+    assert namespace["countdown"].__name__ == "countdown"
+
+
+def test_ttl_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    """*A result past its `ttl` is computed again*."""
+    now: list[float] = [0.0]
+    monkeypatch.setattr("quartz.runtime.monotonic", lambda: now[0])
+    double: Any = memoize(lambda x: 2 * x, ttl=1)
+    double(1)
+    double(1)
+    now[0] = 2.0
+    double(1)
+    assert double.cache_info() == MemoInfo(1, 2, DEFAULT_MEMO_SIZE, 1)
@@ -0,0 +1,135 @@
+"""*Tests for the Quartz AST optimizer*."""
+
+##############################
+# IMPORTS
+##############################
+
+import inspect
+import tracemalloc
+from typing import Any
+
+import pytest
+
+import quartz.ast as q
+from quartz.api import run
+from quartz.lexer import Lexer
+from quartz.optimizer import Optimizer
+from quartz.parser import Parser
+
+##############################
+# SET CONSTANTS
+##############################
+
+# More than folding anything small takes, far less than the huge cases.
+MAX_FOLD_MEMORY: int = 1_000_000
+
+##############################
+# HELPERS
+##############################
+
+
+def _value(source: str) -> q.Expr:
+    # The optimized value of `x = source`.
+    program: q.Program = Parser(
+        Lexer(f"x = {source}\n").get_tokens(),
+    ).get_program()
+    stmt: q.Stmt = Optimizer(program).get_program().statements[0]
+    assert isinstance(stmt, q.Assign)
+    return stmt.value
+
+
+##############################
+# CONSTANT FOLDING
+##############################
+
+
+@pytest.mark.parametrize(
+    ("source", "value"),
+    [
+        ('"ab" * 3', "ababab"),
+        ('3 * "ab"', "ababab"),
+        ("2 ^ 10", 1024),
+        ("1 << 8", 256),
+    ],
+)
+def test_small_results_fold(source: str, value: object) -> None:
+    """*Operations with small results become constants*."""
+    assert _value(source) == q.Constant(value)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        # The inner `10 ^ 8` folds, then the repeat would be ~190 MB.
+        '10 ^ 8 * "ab"',
+        '"ab" * 10 ^ 8',
+        # Formatting pads to ~95 MB.
+        '"%0100000000d" % 1',
+        '"%s" % 1',
+    ],
+)
+def test_huge_results_are_left_for_runtime(source: str) -> None:
+    """*Nothing big, or unbounded, is computed at compile time*."""
+    tracemalloc.start()
+    try:
+        value: q.Expr = _value(source)
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert isinstance(value, q.BinaryOp)
+    assert peak < MAX_FOLD_MEMORY
+
+
+##############################
+# TAIL CALLS
+##############################
+
+COUNTDOWN: str = """
+fn countdown(n)
+    0 <<< if n == 0
+    countdown(n - 1) <<<
+"""
+
+
+@pytest.mark.parametrize(
+    ("decorator", "loops"),
+    [("", True), ("@no_tail_calls\n", False)],
+)
+def test_decorators_keep_fns_recursive(decorator: str, *, loops: bool) -> None:
+    """*Only an undecorated `fn` is turned into a loop*."""
+    program: q.Program = Parser(
+        Lexer(decorator + COUNTDOWN.lstrip()).get_tokens(),
+    ).get_program()
+    fn: q.Stmt = Optimizer(program, 2).get_program().statements[0]
+    assert isinstance(fn, q.FunctionDefinition)
+    assert isinstance(fn.body[0], q.While) == loops
+
+
+##############################
+# GENERATORS
+##############################
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "if False\n        yield\n    1 <<<",
+        "while False\n        yield 1",
+        "(yield) <-> 0 if False",
+        "False and (yield)",
+    ],
+)
+def test_dead_yields_keep_generators(body: str) -> None:
+    """*A `fn` stays a generator when its only `yield` is dead code*."""
+    namespace: dict[str, Any] = run(f"fn gen()\n    {body}\n", {}, optimize=2)
+    assert inspect.isgeneratorfunction(namespace["gen"])
+
+
+def test_dead_code_without_yields_folds() -> None:
+    """*Dead code is still dropped when it holds no `yield`*."""
+    program: q.Program = Parser(
+        Lexer("fn f()\n    if False\n        g()\n    1 <<<\n").get_tokens(),
+    ).get_program()
+    fn: q.Stmt = Optimizer(program, 2).get_program().statements[0]
+    assert isinstance(fn, q.FunctionDefinition)
+    assert not any(isinstance(stmt, q.If) for stmt in fn.body)
@@ -0,0 +1,245 @@
+"""*Tests for the Quartz parser*."""
+
+##############################
+# IMPORTS
+##############################
+
+import sys
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+import quartz.ast as q
+from quartz.api import compile_source, run
+from quartz.lexer import Lexer
+from quartz.parser import MAX_NESTING, Parser
+from quartz.tokendef import Error, Tag
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+##############################
+# SET CONSTANTS
+##############################
+
+# CPython's, too low for `MAX_NESTING` levels on its own.
+DEFAULT_RECURSION_LIMIT: int = 1000
+
+##############################
+# NESTING
+##############################
+
+BRACKETS: list[tuple[str, str]] = [("(", ")"), ("[", "]"), ("f(", ")")]
+
+
+@pytest.mark.parametrize(("opening", "closing"), BRACKETS)
+def test_brackets_nest_as_deep_as_python(opening: str, closing: str) -> None:
+    """*`MAX_NESTING` brackets compile, like 200 parentheses in CPython*."""
+    source: str = f"x = {opening * MAX_NESTING}1{closing * MAX_NESTING}\n"
+    compile_source(source)
+    compile(source.replace("f(", "("), "<nesting>", "exec")
+
+
+def test_recursion_limit_is_restored() -> None:
+    """*Parsing raises the recursion limit only while it runs*."""
+    limit: int = sys.getrecursionlimit()
+    sys.setrecursionlimit(DEFAULT_RECURSION_LIMIT)
+    try:
+        compile_source(f"x = {'(' * MAX_NESTING}1{')' * MAX_NESTING}\n")
+        with pytest.raises(Error, match="TooDeep"):
+            compile_source(f"x = {'(' * (MAX_NESTING + 1)}\n")
+        assert sys.getrecursionlimit() == DEFAULT_RECURSION_LIMIT
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+@pytest.mark.parametrize(("opening", "closing"), BRACKETS)
+def test_one_more_bracket_is_too_deep(opening: str, closing: str) -> None:
+    """*A bracket past `MAX_NESTING` is an error, not a `RecursionError`*."""
+    depth: int = MAX_NESTING + 1
+    with pytest.raises(Error, match="TooDeep"):
+        compile_source(f"x = {opening * depth}1{closing * depth}\n")
+
+
+##############################
+# COMPREHENSIONS
+##############################
+
+
+def _value(source: str) -> q.Expr:
+    # The parsed value of `x = source`.
+    program: q.Program = Parser(
+        Lexer(f"x = {source}\n").get_tokens(),
+    ).get_program()
+    stmt: q.Stmt = program.statements[0]
+    assert isinstance(stmt, q.Assign)
+    return stmt.value
+
+
+def _run(source: str) -> dict[str, Any]:
+    return run(source.lstrip(), {})
+
+
+XS: q.Comprehension = q.Comprehension(q.Ident("x"), q.Ident("xs"))
+
+
+@pytest.mark.parametrize(
+    ("source", "node"),
+    [
+        ("[x for x in xs]", q.ListComp(q.Ident("x"), [XS])),
+        ("${x for x in xs}", q.SetComp(q.Ident("x"), [XS])),
+        (
+            "%{x: 1 for x in xs}",
+            q.DictComp(q.Ident("x"), q.Constant(1), [XS]),
+        ),
+        ("(x for x in xs)", q.GeneratorExp(q.Ident("x"), [XS])),
+        (
+            "f(x for x in xs)",
+            q.Call(q.Ident("f"), [q.GeneratorExp(q.Ident("x"), [XS])]),
+        ),
+    ],
+)
+def test_brackets_parse_comprehensions(source: str, node: q.Expr) -> None:
+    """*Brackets around `for` make the comprehension of their kind*."""
+    assert _value(source) == node
+
+
+def test_comprehension_clauses_nest() -> None:
+    """*Every `for` is a clause, holding the `if`s and `unless`es after it*."""
+    value: q.Expr = _value("[y for x in xs if x unless y for y in x if y]")
+    assert isinstance(value, q.ListComp)
+    outer, inner = value.generators
+    assert outer.iter_ == q.Ident("xs")
+    assert outer.ifs == [q.Ident("x"), q.UnaryOp(Tag.NOT, q.Ident("y"))]
+    assert inner.iter_ == q.Ident("x")
+    assert inner.ifs == [q.Ident("y")]
+
+
+def test_comprehensions_run() -> None:
+    """*Each form gives what the same Python comprehension does*."""
+    namespace: dict[str, Any] = _run("""
+pairs = [(x, y) for x in range(4) if x for y in range(x) unless y == 1]
+rests = ${x % 3 for x in range(10)}
+squares = %{x: x * x for x in range(4) if x != 2}
+total = sum(x for x in range(5))
+""")
+    assert namespace["pairs"] == [
+        (x, y) for x in range(4) if x for y in range(x) if y != 1
+    ]
+    assert namespace["rests"] == {0, 1, 2}
+    assert namespace["squares"] == {0: 0, 1: 1, 3: 9}
+    assert namespace["total"] == 10  # noqa: PLR2004
+
+
+def test_comprehension_iterables_with_named_exprs() -> None:
+    """*Iterables lowered to `:=`, like a tee's, are assigned beforehand*."""
+    namespace: dict[str, Any] = _run("""
+# CPython rejects these unless the iterables are hoisted out.
+firsts = [x for x in range(3) |> len -> list]
+seconds = [(x, y) for x in range(3) for y in range(x) |> len -> list]
+""")
+    assert namespace["firsts"] == [0, 1, 2]
+    assert namespace["seconds"] == [(1, 0), (2, 0), (2, 1)]
+
+
+##############################
+# YIELD
+##############################
+
+
+@pytest.mark.parametrize(
+    ("line", "expr"),
+    [
+        ("xs -> yield", q.Yield(q.Ident("xs"))),
+        ("xs -> yield from", q.YieldFrom(q.Ident("xs"))),
+        ("yield from xs", q.YieldFrom(q.Ident("xs"))),
+        ("yield", q.Yield()),
+    ],
+)
+def test_yields_parse(line: str, expr: q.Expr) -> None:
+    """*`yield` is an expression, and a pipeline stage*."""
+    program: q.Program = Parser(
+        Lexer(f"fn f(xs)\n    {line}\n").get_tokens(),
+    ).get_program()
+    fn: q.Stmt = program.statements[0]
+    assert isinstance(fn, q.FunctionDefinition)
+    assert fn.body == [q.ExprStmt(expr)]
+
+
+def test_yield_stages_stream_lazily() -> None:
+    """*Each stage produces only what the next one takes*."""
+    namespace: dict[str, Any] = _run("""
+from itertools import count
+
+produced = []
+
+fn numbers()
+    for n in count()
+        produced.append(n)
+        n -> yield
+
+fn squares(xs)
+    for x in xs
+        x * x -> yield
+
+fn both(xs)
+    xs -> yield from
+    xs |> yield -> len -> yield
+""")
+    squares: Iterator[int] = namespace["squares"](namespace["numbers"]())
+    assert list(islice(squares, 4)) == [0, 1, 4, 9]
+    assert namespace["produced"] == [0, 1, 2, 3]
+    assert list(namespace["both"]("ab")) == ["a", "b", "ab", 2]
+
+
+##############################
+# NAMED EXPRESSIONS
+##############################
+
+
+def test_named_expr_in_conditions() -> None:
+    """*`if` and `while` take `:=` without parentheses*."""
+    source: str = "if n := f()\n    g(n)\nwhile m := f()\n    g(m)\n"
+    program: q.Program = Parser(Lexer(source).get_tokens()).get_program()
+    call: q.Call = q.Call(q.Ident("f"), [])
+    tests: list[q.Expr] = [
+        stmt.test
+        for stmt in program.statements
+        if isinstance(stmt, q.If | q.While)
+    ]
+    assert tests == [
+        q.NamedExpr(q.Ident("n"), call),
+        q.NamedExpr(q.Ident("m"), call),
+    ]
+
+
+def test_named_expr_names_the_whole_pipe() -> None:
+    """*`:=` binds looser than anything, even `->`*."""
+    assert _value("(n := xs -> len) > 1") == q.Comparison(
+        q.NamedExpr(q.Ident("n"), q.Call(q.Ident("len"), [q.Ident("xs")])),
+        [Tag.R_ANGLE],
+        [q.Constant(1)],
+    )
+
+
+@pytest.mark.parametrize("target", ["x.a", "xs[0]", "1", "xs -> f"])
+def test_named_expr_needs_a_name(target: str) -> None:
+    """*Only a name can be the target of `:=`*."""
+    with pytest.raises(Error, match="InvalidTarget"):
+        _value(f"({target} := 1)")
+
+
+def test_named_exprs_run() -> None:
+    """*Names bound by `:=` are visible after the expression*."""
+    namespace: dict[str, Any] = _run("""
+chunks = []
+lines = iter(["a", "b", ""])
+while line := next(lines)
+    chunks.append(line)
+
+big = (top := [3, 9, 4] -> max) > 5
+""")
+    assert namespace["chunks"] == ["a", "b"]
+    assert namespace["top"] == 9  # noqa: PLR2004
+    assert namespace["big"] is True
@@ -0,0 +1,116 @@
+"""*Tests for the runtime support of compiled Quartz programs*."""
+
+##############################
+# IMPORTS
+##############################
+
+import subprocess
+import sys
+from collections.abc import Iterator
+from itertools import count, islice
+from pathlib import Path
+
+import pytest
+
+from quartz.runtime import CHUNKS_IN_FLIGHT_PER_WORKER, parallel_map
+
+##############################
+# SET CONSTANTS
+##############################
+
+# Runs the CLI the way macOS and Windows start processes by default.
+SPAWN_CLI: str = """
+import multiprocessing
+import sys
+
+multiprocessing.set_start_method("spawn")
+sys.argv = ["quartz", sys.argv[1], "-no-cache"]
+from quartz.quartz import main
+
+main()
+"""
+
+PROGRAM: str = """
+fn square(n)
+    n * n <<<
+
+if __name__ == "__main__"
+    |workers=2| [1, 2, 3] ~> square -> list -> print
+    |workers=2, executor="process"| [4, 5] ~> square -> list -> print
+"""
+
+# Starts a pool again in every spawned worker, unless they refuse to.
+UNGUARDED: str = """
+fn square(n)
+    n * n <<<
+
+|workers=2, executor="process"| [4, 5] ~> square -> list -> print
+"""
+
+##############################
+# PARALLEL MAP
+##############################
+
+
+def _run_spawned(path: Path) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SPAWN_CLI, str(path)],
+        cwd=path.parent,
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_parallel_pipeline_under_spawn(tmp_path: Path) -> None:
+    """*`|...|` works when the default start method is spawn*."""
+    path: Path = tmp_path / "spawned.qrtz"
+    path.write_text(PROGRAM, encoding="utf8")
+    output: str = _run_spawned(path).stdout
+    assert "[1, 4, 9]" in output
+    assert "[16, 25]" in output
+
+
+def test_unguarded_process_pool_under_spawn(tmp_path: Path) -> None:
+    """*Workers that run the program again cannot start pools of their own*."""
+    path: Path = tmp_path / "unguarded.qrtz"
+    path.write_text(UNGUARDED, encoding="utf8")
+    process: subprocess.CompletedProcess[str] = _run_spawned(path)
+    assert process.returncode != 0
+    assert "bootstrapping phase" in process.stderr
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_map_is_lazy(executor: str, *, ordered: bool) -> None:
+    """*An endless iterable is only read a bounded way ahead*."""
+    taken: list[int] = []
+
+    def elements() -> Iterator[int]:
+        for element in count():
+            taken.append(element)
+            yield element
+
+    results: Iterator[int] = parallel_map(
+        abs,
+        elements(),
+        workers=2,
+        chunksize=3,
+        ordered=ordered,
+        executor=executor,
+    )
+    first: list[int] = list(islice(results, 10))
+    results.close()
+    if ordered:
+        assert first == list(range(10))
+    # The 4 chunks consumed, then the chunks in flight,
+    # and as many again refilled while finished ones are yielded.
+    in_flight: int = 2 * CHUNKS_IN_FLIGHT_PER_WORKER
+    assert len(taken) <= (4 + 2 * in_flight) * 3
+
+
+def test_parallel_map_checks_workers() -> None:
+    """*A pool needs at least one worker*."""
+    with pytest.raises(ValueError, match="workers"):
+        next(parallel_map(abs, [1], workers=0))